@@ -0,0 +1,290 @@
+"""
+Workout analytics over the logged sets, without Streamlit.
+
+calculate_analytics(logs) computes the dashboard dict from the full log,
+column-wise on typed arrays (log_columns), so multi-year histories take
+milliseconds.
+WorkoutAggregate keeps the same numbers as running state (totals,
+per-exercise counters, reps per day, the current streak), so a new set is
+added in O(1) and result() returns the same dict without a rescan.
+"""
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# datetime64[D] ka din 0 (1970-01-01) as a date ordinal
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+def parse_timestamp(ts):
+    if not ts:
+        return None
+    try:
+        return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except Exception:
+        return None
+
+# Workout log, column-wise: ek typed array per field, log order (newest first)
+LogColumns = namedtuple(
+    "LogColumns",
+    [
+        "exercises",             # exercise names in order of first appearance
+        "exercise_codes",        # (n,) index into 'exercises'
+        "total_reps",            # (n,) int64, left + right
+        "duration",              # (n,) float64, 0 when missing
+        "duration_total",        # sum of the durations, added in log order
+        "intensity_hundredths",  # (n,) int64, reps/sec rounded to 2 decimals, x100
+        "day",                   # (n,) int64 date ordinal of the timestamp, -1 when missing/invalid
+    ]
+)
+
+def log_columns(logs):
+    """Loads workout logs straight into LogColumns (no per-log dicts or DataFrame rows)."""
+    total_reps = (np.array([log.get("reps_left", 0) for log in logs], dtype=np.int64)
+                  + np.array([log.get("reps_right", 0) for log in logs], dtype=np.int64))
+    raw_duration = [log.get("duration") for log in logs]
+    duration_or_nan = np.array(raw_duration, dtype=np.float64)
+    missing = np.isnan(duration_or_nan)
+    # Totals mein missing duration 0, intensity mein 1 (purane loop jaisa)
+    duration = np.where(missing, 0.0, duration_or_nan)
+    intensity = total_reps / np.maximum(np.where(missing, 1.0, duration_or_nan), 1.0)
+    codes, exercises = pd.factorize(np.array([log.get("exercise", "Unknown") for log in logs], dtype=object))
+    day = day_ordinals([log.get("timestamp", "") for log in logs])
+    return LogColumns(
+        exercises=list(exercises),
+        exercise_codes=codes,
+        total_reps=total_reps,
+        duration=duration,
+        duration_total=sum(0 if value is None else value for value in raw_duration),
+        intensity_hundredths=round_scaled(intensity, 2),
+        day=day,
+    )
+
+def day_ordinals(timestamps):
+    """
+    ISO timestamps -> int64 date ordinals in each timestamp's own offset
+    (same day as parse_timestamp(ts).date()), -1 when missing or invalid.
+    """
+    # datetime.fromisoformat C mein hai (pd.to_datetime se kai guna tez) aur parse_timestamp ka exact reference.
+    # Sab valid hon to ek hi pass; warna per-timestamp fallback
+    try:
+        return np.array([datetime.fromisoformat(ts.replace("Z", "+00:00")).toordinal() for ts in timestamps],
+                        dtype=np.int64)
+    except (AttributeError, TypeError, ValueError):
+        return np.array([_day_ordinal(ts) for ts in timestamps], dtype=np.int64)
+
+def _day_ordinal(ts):
+    parsed = parse_timestamp(ts)
+    return parsed.toordinal() if parsed else -1
+
+def exercise_totals(columns):
+    """Per exercise (in 'columns.exercises' order): sessions, total reps, total duration."""
+    k = len(columns.exercises)
+    sessions = np.bincount(columns.exercise_codes, minlength=k)
+    reps = np.bincount(columns.exercise_codes, weights=columns.total_reps, minlength=k).astype(np.int64)
+    # bincount weights ko input order mein jodta hai, Python ke sum() jaisa
+    duration = np.bincount(columns.exercise_codes, weights=columns.duration, minlength=k)
+    return sessions, reps, duration
+
+def daily_totals(columns):
+    """Sorted active day ordinals and the reps logged on each."""
+    valid = columns.day >= 0
+    days, index = np.unique(columns.day[valid], return_inverse=True)
+    reps = np.bincount(index, weights=columns.total_reps[valid], minlength=len(days)).astype(np.int64)
+    return days, reps
+
+def calculate_analytics(logs):
+    """
+    Dashboard analytics of the full workout log, computed column-wise:
+    totals, average intensity, per-exercise summary, reps per day and the
+    current streak (consecutive active days ending at the latest one).
+    """
+    if not logs:
+        return None
+    columns = log_columns(logs)
+    total_sessions = len(logs)
+
+    sessions, reps, duration = exercise_totals(columns)
+    if isinstance(columns.duration_total, int):
+        # Saari durations int (ya missing) thi: purane loop ki tarah column bhi int64
+        duration = duration.astype(np.int64)
+    summary_df = pd.DataFrame({
+        "Exercise": columns.exercises,
+        "Sessions": sessions,
+        "Total Reps": reps,
+        "Total Duration (s)": [round(value, 1) for value in duration.tolist()],
+        "Avg Reps / Session": [
+            round(r / max(n, 1), 1) for r, n in zip(reps.tolist(), sessions.tolist())
+        ]
+    }).sort_values(by="Total Reps", ascending=False)
+
+    days, daily_reps = daily_totals(columns)
+    trend_df = pd.DataFrame({
+        "Date": ordinals_to_iso(days),
+        "Total Reps": daily_reps
+    }) if len(days) else pd.DataFrame()
+
+    return {
+        "total_sessions": total_sessions,
+        "total_reps_all": int(columns.total_reps.sum()),
+        "total_duration": columns.duration_total,
+        "avg_intensity": round(int(columns.intensity_hundredths.sum()) / 100 / total_sessions, 2),
+        "streak": trailing_streak(days),
+        "summary_df": summary_df,
+        "trend_df": trend_df
+    }
+
+def ordinals_to_iso(days):
+    """Date ordinals -> 'YYYY-MM-DD' strings."""
+    return (np.asarray(days, dtype=np.int64) - _EPOCH_ORDINAL).astype("datetime64[D]").astype(str).tolist()
+
+def round_scaled(values, decimals):
+    """
+    round(v, decimals) * 10**decimals as int64 for a whole array, matching
+    Python's round(). np.round scales first, so values close to a .5 tie can
+    land on the other side; those few are rounded with round() itself.
+    """
+    scale = 10 ** decimals
+    scaled = values * scale
+    result = np.round(scaled)
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    if near_tie.any():
+        result[near_tie] = [round(round(v, decimals) * scale) for v in values[near_tie].tolist()]
+    return result.astype(np.int64)
+
+def trailing_streak(days):
+    """Length of the run of consecutive days that ends at the last of the sorted unique day ordinals."""
+    if len(days) == 0:
+        return 0
+    gaps = np.diff(days)
+    broken = np.flatnonzero(gaps != 1)
+    return int(len(days) - (broken[-1] + 1 if len(broken) else 0))
+
+
+class WorkoutAggregate:
+    """
+    Incremental calculate_analytics(). add(log) takes a set the way the app
+    inserts it (at the front of the newest-first log); from_logs() builds the
+    aggregate from an existing log in one pass. result() builds the two small
+    DataFrames from the per-exercise and per-day maps only, so its cost does
+    not grow with the number of sets.
+    """
+
+    def __init__(self):
+        self.total_sessions = 0
+        self.total_reps_all = 0
+        self.total_duration = 0
+        # Har set ki intensity 2 decimals tak rounded hai; integer hundredths mein jodne se
+        # sum add ke order par depend nahi karta
+        self.intensity_hundredths = 0
+        self.exercise_summary = {}
+        self.daily_reps = {}
+        self.last_day = None
+        self.streak = 0
+        # Exercise ki log mein pehli position: summary_df ki row order (aur ties) wahi rahe
+        self._first_position = {}
+        self._front = 0
+
+    @classmethod
+    def from_logs(cls, logs):
+        """Aggregate of an existing (newest-first) log, built column-wise in one pass."""
+        aggregate = cls()
+        if not logs:
+            return aggregate
+        columns = log_columns(logs)
+        aggregate.total_sessions = len(logs)
+        aggregate.total_reps_all = int(columns.total_reps.sum())
+        aggregate.total_duration = columns.duration_total
+        aggregate.intensity_hundredths = int(columns.intensity_hundredths.sum())
+
+        sessions, reps, duration = exercise_totals(columns)
+        # Int durations int hi rahein (Python sum jaisa), taaki add() ke baad bhi dtype na badle
+        duration_type = int if isinstance(columns.duration_total, int) else float
+        for position, ex in enumerate(columns.exercises):
+            aggregate.exercise_summary[ex] = {
+                "sessions": int(sessions[position]), "reps": int(reps[position]),
+                "duration": duration_type(duration[position])
+            }
+            # 'exercises' pehli appearance ke order mein hai; add() iske aage (negative) position deta hai
+            aggregate._first_position[ex] = position
+
+        days, daily_reps = daily_totals(columns)
+        aggregate.daily_reps = {date.fromordinal(day): reps for day, reps in zip(days.tolist(), daily_reps.tolist())}
+        if len(days):
+            aggregate.last_day = date.fromordinal(int(days[-1]))
+            aggregate.streak = trailing_streak(days)
+        return aggregate
+
+    def add(self, log):
+        self._front -= 1
+        self._add(log, self._front)
+
+    def _add(self, log, position):
+        total_reps = log.get("reps_left", 0) + log.get("reps_right", 0)
+        duration = log.get("duration", 0)
+        self.total_sessions += 1
+        self.total_reps_all += total_reps
+        self.total_duration += duration
+        self.intensity_hundredths += round(round(total_reps / max(log.get("duration", 1), 1), 2) * 100)
+
+        ex = log.get("exercise", "Unknown")
+        summary = self.exercise_summary.get(ex)
+        if summary is None:
+            summary = self.exercise_summary[ex] = {"sessions": 0, "reps": 0, "duration": 0}
+            self._first_position[ex] = position
+        else:
+            self._first_position[ex] = min(self._first_position[ex], position)
+        summary["sessions"] += 1
+        summary["reps"] += total_reps
+        summary["duration"] += duration
+
+        ts = parse_timestamp(log.get("timestamp", ""))
+        if ts:
+            day = ts.date()
+            if day not in self.daily_reps:
+                self.daily_reps[day] = 0
+                self._add_day(day)
+            self.daily_reps[day] += total_reps
+
+    def _add_day(self, day):
+        # Streak = sabse naye active din par khatam hone wale lagataar din
+        if self.last_day is None or day > self.last_day:
+            self.streak = self.streak + 1 if self.last_day is not None and (day - self.last_day).days == 1 else 1
+            self.last_day = day
+        elif day == self.last_day - timedelta(days=self.streak):
+            # Purana (backfilled) din jo streak ke theek pehle aata hai, use aage tak jodo
+            self.streak += 1
+            while self.last_day - timedelta(days=self.streak) in self.daily_reps:
+                self.streak += 1
+
+    def result(self):
+        """Same dict as calculate_analytics() on the same logs (None when empty)."""
+        if not self.total_sessions:
+            return None
+        exercises = sorted(self.exercise_summary, key=self._first_position.__getitem__)
+        summary_df = pd.DataFrame([
+            {
+                "Exercise": ex,
+                "Sessions": data["sessions"],
+                "Total Reps": data["reps"],
+                "Total Duration (s)": round(data["duration"], 1),
+                "Avg Reps / Session": round(data["reps"] / max(data["sessions"], 1), 1)
+            }
+            for ex, data in ((ex, self.exercise_summary[ex]) for ex in exercises)
+        ]).sort_values(by="Total Reps", ascending=False)
+
+        trend_df = pd.DataFrame([
+            {"Date": day.isoformat(), "Total Reps": reps}
+            for day, reps in sorted(self.daily_reps.items())
+        ])
+
+        return {
+            "total_sessions": self.total_sessions,
+            "total_reps_all": self.total_reps_all,
+            "total_duration": self.total_duration,
+            "avg_intensity": round(self.intensity_hundredths / 100 / self.total_sessions, 2),
+            "streak": self.streak,
+            "summary_df": summary_df,
+            "trend_df": trend_df
+        }
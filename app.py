@@ -1,17 +1,29 @@
-import cv2
 import mediapipe as mp
 import streamlit as st
 import time
-from utils import calculate_angle
-import streamlit.components.v1 as components
+from utils import calculate_angles, array_to_landmark_list
+from pipeline import create_pipeline
+from exercises import EXERCISE_NAMES, get_exercise
+from rep_counter import RepCounter, EVENT_SET_COMPLETE
+from recording import LandmarkRecorder
+from live_session import LiveSession, reap_idle
+from live_view import StatsPanel, render_perf_markdown, PreviewEncoder, PREVIEW_FORMATS, pose_overlay, push_overlay
+from perf import FrameTimer
+from pose_pool import PosePool, PoolFull
+from pose_backends import create_pose_backend
+from governor import QualityGovernor
+from speech import SpeechChannel, push_speech, speech_component
+from analytics import WorkoutAggregate, parse_timestamp
+from frame_sources import (
+    CAMERA_SOURCES, FRAME_SOURCES, SOURCE_WEBCAM, SOURCE_WEBRTC, SOURCE_FILE,
+    CaptureConfig, create_frame_source, webrtc_camera
+)
 import json
 import gc # Memory fix ke liye
 import os
 import io
 import csv
 from datetime import datetime, timezone
-from collections import defaultdict
-import pandas as pd
 from openai import OpenAI
 from supabase import create_client
 
@@ -22,36 +34,15 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# --- Voice Assistant (TTS) Function ---
-def speak(text, lang, voice_name):
-    # JavaScript mein quotes (') se problem ho sakti hai, isliye unhe hata dein
-    text = text.replace("'", "").replace('"', '')
-    speech_js = f"""
-        <script>
-            const text = "{text}";
-            const lang = "{lang}";
-            const voiceName = "{voice_name}";
-
-            function doSpeak() {{
-                const utter = new SpeechSynthesisUtterance(text);
-                utter.lang = lang;
-                if (voiceName) {{
-                    const voices = window.speechSynthesis.getVoices();
-                    const selectedVoice = voices.find(v => v.name === voiceName);
-                    if (selectedVoice) {{
-                        utter.voice = selectedVoice;
-                    }} else {{
-                        console.warn(`Voice '{{voiceName}}' not found.`);
-                    }}
-                }}
-                window.speechSynthesis.speak(utter);
-            }}
-            // Voices load hone ka wait karein
-            if (window.speechSynthesis.getVoices().length > 0) {{ doSpeak(); }}
-            else {{ window.speechSynthesis.onvoiceschanged = doSpeak; }}
-        </script>
-    """
-    components.html(speech_js, height=0, width=0)
+def config_int(name, default):
+    """Integer setting from Streamlit secrets ya environment variable."""
+    value = st.secrets.get(name) or os.getenv(name)
+    return int(value) if value else default
+
+def config_flag(name):
+    """On/off setting from Streamlit secrets ya environment variable ("1", "true", "yes", "on")."""
+    value = st.secrets.get(name) or os.getenv(name)
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
 
 # --- AI Models ko Cache Karein (Memory Fix) ---
 @st.cache_resource
@@ -69,22 +60,33 @@ def load_models():
     local_model = bundled_model if os.path.exists(bundled_model) else cache_model
     os.environ["MEDIAPIPE_MODEL_PATH"] = os.path.dirname(local_model)
 
-    if not os.path.exists(local_model):
+    # "solutions" (legacy Pose) ya "tasks" (PoseLandmarker, LIVE_STREAM)
+    backend = st.secrets.get("POSE_BACKEND") or os.getenv("POSE_BACKEND") or "solutions"
+
+    if backend == "solutions" and not os.path.exists(local_model):
         st.error(
             "Pose model not found. Expected at ./models/pose_landmark_lite.tflite "
             "or ~/.mediapipe/modules/pose_landmark/pose_landmark_lite.tflite."
         )
         st.stop()
 
+    def make_pose():
+        return create_pose_backend(backend, model_complexity=0)
+
+    # Har webcam session pool se apna Pose leta hai (tracking state users mein mix nahi hota)
+    def make_pool(first_pose):
+        return PosePool(
+            make_pose,
+            size=config_int("POSE_POOL_SIZE", min(4, os.cpu_count() or 1)),
+            max_waiting=config_int("POSE_POOL_MAX_WAITING", 8),
+            initial=[first_pose]
+        )
+
     try:
         # Try normal initialization first
-        pose = mp_pose.Pose(
-            model_complexity=0,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+        pose = make_pose()
         st.info("✅ MediaPipe pose model loaded successfully from local cache.")
-        return mp_pose, pose, mp_drawing
+        return mp_pose, make_pool(pose), mp_drawing
 
     except Exception as first_err:
         # If initialization failed (often due to download blocked), try to detect
@@ -119,12 +121,8 @@ def load_models():
 
         # If a cache path exists, try a second time (MediaPipe may find the file now)
         try:
-            pose = mp_pose.Pose(
-                model_complexity=0,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5
-            )
-            return mp_pose, pose, mp_drawing
+            pose = make_pose()
+            return mp_pose, make_pool(pose), mp_drawing
         except Exception as second_err:
             st.error(
                 f"MediaPipe still failed to initialize after checking cache paths:\n{second_err}\n" 
@@ -133,13 +131,16 @@ def load_models():
             st.stop()
 
 # Models ko load karein (cached)
-mp_pose, pose, mp_drawing = load_models()
+mp_pose, pose_pool, mp_drawing = load_models()
 
 # --- Session State Initialization ---
 def _init_default_states():
     default_states = {
         'voice_enabled': True, 'voice_lang': 'hi-IN', 'voice_name': 'Google हिन्दी',
-        'workout_log': [], 'rep_counter_left': 0, 'rep_counter_right': 0, 'set_counter': 1,
+        'speech': SpeechChannel(),
+        'workout_log': [], 'workout_log_version': 0, 'analytics_cache': None,
+        'workout_aggregate': WorkoutAggregate(),
+        'rep_counter_left': 0, 'rep_counter_right': 0, 'set_counter': 1,
         'stage_left': 'down', 'stage_right': 'down', 'stage': 'down',
         'feedback': 'Start your workout!', 'last_spoken_feedback': '',
         'start_time': 0, 'webcam_started': False,
@@ -163,7 +164,28 @@ def _init_default_states():
         'profile_experience_level': 'Beginner',
         'profile_loaded': False,
         'supabase': None,
-        'use_supabase_auth': False
+        'use_supabase_auth': False,
+        'frame_source': SOURCE_WEBCAM,
+        'video_file_path': '',
+        'camera_resolution': '640x480',
+        'camera_fps': 30,
+        'camera_mjpg': True,
+        'camera_drain': True,
+        'pipelined_mode': False,
+        'idle_gating': True,
+        'adaptive_quality': True,
+        'target_fps': 20,
+        'inference_stride': 1,
+        'smooth_landmarks': True,
+        'client_overlay': False,
+        'preview_width': 640,
+        'preview_format': 'JPEG',
+        'preview_quality': 70,
+        'preview_fps': 15,
+        'record_landmarks': False,
+        'show_perf_panel': False,
+        'live_session': None,
+        'live_notice': None
     }
     for key, value in default_states.items():
         if key not in st.session_state:
@@ -172,18 +194,33 @@ def _init_default_states():
 _init_default_states()
 
 # --- Helper functions (Speak, Reset, TTS) ---
-def safe_speak(text):
+def safe_speak(text, interrupt=False):
+    # Sirf queue mein daalta hai; bolna ek hi persistent speech component karta hai
     if st.session_state.voice_enabled:
-        speak(text, st.session_state.voice_lang, st.session_state.voice_name)
+        st.session_state.speech.say(
+            text, st.session_state.voice_lang, st.session_state.voice_name, interrupt=interrupt
+        )
+
+def render_speech(feed_placeholder):
+    """Sends anything still pending (no debounce) plus recent utterances to a speech feed."""
+    speech = st.session_state.speech
+    now = time.time()
+    speech.drain(now, force=True)
+    if speech.feed(now)["utterances"]:
+        push_speech(feed_placeholder, speech, now)
+
+def flush_speech(feed_placeholder):
+    """Sends a pending utterance once its debounce is over (no push otherwise)."""
+    speech = st.session_state.speech
+    now = time.time()
+    if speech.drain(now):
+        push_speech(feed_placeholder, speech, now)
 
 def reset_states(exercise_choice):
     st.session_state.rep_counter_left = 0
     st.session_state.rep_counter_right = 0
     # Set counter ko reset nahi karenge, taaki woh badhta rahe
-    if exercise_choice in ['Squats', 'Push-ups', 'Lunges', 'Jumping Jacks', 'High Knees']:
-        initial_stage = 'up'
-    else: 
-        initial_stage = 'down'
+    initial_stage = get_exercise(exercise_choice).start_stage
     st.session_state.stage_left = initial_stage
     st.session_state.stage_right = initial_stage
     st.session_state.stage = initial_stage
@@ -193,6 +230,404 @@ def reset_states(exercise_choice):
     st.session_state.start_time = time.time()
     st.session_state.workout_complete_feedback_given = False # Naya set shuru, feedback reset
 
+def counter_from_session(exercise_spec, side_choice):
+    # Chal rahe set ko session state se resume karein (rerun ke baad bhi count na tute)
+    counter = RepCounter(
+        exercise_spec, side_choice,
+        target_reps=st.session_state.target_reps,
+        set_number=st.session_state.set_counter
+    )
+    return counter.restore(
+        st.session_state.rep_counter_left, st.session_state.rep_counter_right,
+        st.session_state.stage_left, st.session_state.stage_right, st.session_state.stage,
+        st.session_state.feedback, st.session_state.workout_complete_feedback_given
+    )
+
+def capture_config_from_session():
+    width, height = (int(v) for v in st.session_state.camera_resolution.split("x"))
+    return CaptureConfig(
+        width=width,
+        height=height,
+        fps=st.session_state.camera_fps,
+        fourcc="MJPG" if st.session_state.camera_mjpg else None,
+        buffer_size=1,
+        drain=st.session_state.camera_drain
+    )
+
+POSE_QUEUE_TIMEOUT_S = 120
+
+def checkout_pose(status_placeholder):
+    """
+    Pose pool se is session ke liye ek Pose leta hai. Sab slots busy hon to
+    queue position dikhate hue wait karta hai. Returns None if the queue is
+    full or the wait times out (reason in st.session_state.live_notice).
+    """
+    try:
+        ticket = pose_pool.enqueue()
+    except PoolFull:
+        st.session_state.live_notice = "Server abhi full hai, sab coach slots busy hain. Thodi der baad Start karein."
+        return None
+    deadline = time.time() + POSE_QUEUE_TIMEOUT_S
+    try:
+        while True:
+            pose = ticket.wait(timeout=1.0)
+            if pose is not None:
+                status_placeholder.empty()
+                return pose
+            if time.time() > deadline:
+                ticket.cancel()
+                st.session_state.live_notice = "Queue mein bahut der ho gayi. Dobara Start karein."
+                return None
+            # Har second placeholder update hota hai, isliye Stop/rerun yahaan bhi kaam karta hai
+            status_placeholder.info(f"⏳ Sab coach slots busy hain. Queue mein aapka number: {ticket.position}")
+    except BaseException:
+        ticket.cancel()
+        raise
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings")
+
+def start_landmark_recording(exercise_choice, side_choice):
+    os.makedirs(RECORDINGS_DIR, exist_ok=True)
+    now = datetime.now(timezone.utc)
+    user_tag = st.session_state.user["localId"][:8] if st.session_state.user else "guest"
+    file_name = f"{now.strftime('%Y%m%dT%H%M%SZ')}_{user_tag}_{exercise_choice.replace(' ', '-')}.lmk"
+    return LandmarkRecorder(os.path.join(RECORDINGS_DIR, file_name), {
+        "exercise": exercise_choice,
+        "side": side_choice,
+        "target_reps": st.session_state.target_reps,
+        "set_number": st.session_state.set_counter,
+        "started_at": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        # Har naya raw model output record hota hai (stride/idle gate mein sirf inferred frames)
+        "raw": True,
+        "stride": st.session_state.inference_stride,
+        "smooth_landmarks": st.session_state.smooth_landmarks,
+        "idle_gating": st.session_state.idle_gating,
+    })
+
+def sync_counter_to_session(counter):
+    st.session_state.rep_counter_left = counter.reps_left
+    st.session_state.rep_counter_right = counter.reps_right
+    st.session_state.stage_left = counter.stage_left
+    st.session_state.stage_right = counter.stage_right
+    st.session_state.stage = counter.stage
+    st.session_state.feedback = counter.feedback
+    st.session_state.workout_complete_feedback_given = counter.complete_announced
+
+# --- Live coach (fragment) ---
+# Live loop frames ke chhote batches mein chalta hai: har batch live_coach fragment ka ek run
+# (run_every). Batches ke beech baaki tabs/widgets ke reruns ko mauka milta hai, aur camera,
+# Pose, pipeline LiveSession mein session state ke andar agle batch tak chalte rehte hain.
+LIVE_BATCH_S = 1.0
+LIVE_RERUN_EVERY_S = 0.25
+# Itni der koi batch nahi chala (tab band ho gaya) to session band, Pose pool mein wapas
+LIVE_IDLE_TIMEOUT_S = 60
+
+def start_webcam(exercise_choice):
+    st.session_state.webcam_started = True
+    # Check karein ki set counter reset karna hai ya nahi
+    if st.session_state.set_counter > st.session_state.target_sets:
+        st.session_state.set_counter = 1
+    reset_states(exercise_choice)
+    # Full rerun taaki live fragment run_every ke saath register ho
+    st.rerun()
+
+def stop_webcam(exercise_choice, side_choice):
+    st.session_state.webcam_started = False
+    close_live_session()
+    if st.session_state.start_time != 0:
+        # Stop logic
+        final_reps_left = st.session_state.rep_counter_left
+        final_reps_right = st.session_state.rep_counter_right
+        final_duration = time.time() - st.session_state.start_time
+        timestamp_now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        if final_reps_left > 0 or final_reps_right > 0:
+            log_data = {
+                "exercise": exercise_choice,
+                "side": side_choice,
+                "reps_left": final_reps_left,
+                "reps_right": final_reps_right,
+                "duration": final_duration,
+                "set_number": st.session_state.set_counter, # Set number ko log karein
+                "target_reps": st.session_state.target_reps, # Target ko log karein
+                "timestamp": timestamp_now
+            }
+
+            save_success = save_workout_log_supabase(log_data)
+
+            if save_success:
+                # Log ko lokal list mein bhi add karein (taaki UI turant update ho)
+                add_workout_log(log_data)
+                log_text = f"Set {st.session_state.set_counter} complete! Left: {final_reps_left}, Right: {final_reps_right} reps."
+                st.success(log_text)
+                safe_speak(log_text)
+
+                # NAYA: Set logic
+                if st.session_state.set_counter < st.session_state.target_sets:
+                    st.session_state.set_counter += 1
+                    st.info(f"Get ready for Set {st.session_state.set_counter}!")
+                    safe_speak(f"Get ready for Set {st.session_state.set_counter}!")
+                else:
+                    st.balloons()
+                    st.success("Workout Complete! Excellent job!")
+                    safe_speak("Workout Complete! Excellent job!")
+                    st.session_state.set_counter = 1 # Workout poora, reset
+
+            else:
+                st.error("Workout log save nahi hua (Database Error).")
+                safe_speak("Failed to log workout.")
+        else:
+            st.warning("Koi rep detect nahi hua. Workout log nahi hua.")
+            safe_speak("No reps detected. Workout not logged.")
+
+        st.session_state.start_time = 0
+    # Full rerun: sidebar workout log update aur live fragment ka run_every band
+    st.rerun()
+
+def abort_webcam(notice):
+    """Session shuru/chalu nahi reh saka: message agle run mein dikhta hai (fragment rerun use mita deta)."""
+    st.session_state.webcam_started = False
+    st.session_state.live_notice = notice
+    close_live_session()
+    st.rerun()
+
+def close_live_session():
+    session = st.session_state.live_session
+    st.session_state.live_session = None
+    if session is not None:
+        session.close()
+        gc.collect() # Ek baar aur saaf karein
+
+def open_live_session(exercise_spec, exercise_choice, side_choice, webrtc_ctx, status_placeholder):
+    """
+    Pool se Pose leke camera, pipeline aur recorder kholta hai. Returns the
+    LiveSession, or None (with st.session_state.live_notice set) if no Pose
+    slot or camera was available.
+    """
+    pose = checkout_pose(status_placeholder)
+    if pose is None:
+        return None
+    # Lease milte hi session: setup ke beech rerun/stop/error par bhi close() sab band karta hai
+    session = LiveSession(pose_pool, pose)
+    try:
+        session.cap = create_frame_source(
+            st.session_state.frame_source,
+            webrtc_ctx=webrtc_ctx,
+            path=st.session_state.video_file_path,
+            capture_config=capture_config_from_session()
+        )
+        if not session.cap.isOpened():
+            st.session_state.live_notice = "Webcam nahi chala. Permissions check karein."
+            session.close()
+            return None
+        # Driver ne asal mein kya diya (requested settings ignore bhi ho sakti hain)
+        if hasattr(session.cap, "describe"):
+            session.description = session.cap.describe()
+        # Rep logic RepCounter mein chalta hai; session state sirf change par sync hota hai
+        session.counter = counter_from_session(exercise_spec, side_choice)
+        session.synced_version = session.counter.version
+        # Har frame ke stages ka timing ring buffer mein (panel ho ya na ho)
+        session.frame_timer = FrameTimer()
+        session.preview = PreviewEncoder(
+            max_width=st.session_state.preview_width,
+            fmt=st.session_state.preview_format,
+            quality=st.session_state.preview_quality,
+            max_fps=st.session_state.preview_fps
+        )
+        session.client_overlay = st.session_state.client_overlay and st.session_state.frame_source == SOURCE_WEBRTC
+        session.recorder = start_landmark_recording(exercise_choice, side_choice) if st.session_state.record_landmarks else None
+        session.pipeline = create_pipeline(
+            session.cap, pose,
+            threaded=st.session_state.pipelined_mode,
+            idle_gating=st.session_state.idle_gating,
+            governor=QualityGovernor(st.session_state.target_fps) if st.session_state.adaptive_quality else None,
+            stride=st.session_state.inference_stride,
+            smoothing=st.session_state.smooth_landmarks,
+            # Smoothing/extrapolation se pehle ka model output (replay khud process karta hai)
+            recorder=session.recorder
+        )
+        # start() alag se, taaki threads chalne se pehle pipeline close() tak pahunch jaye
+        session.pipeline.start()
+    except BaseException:
+        session.close()
+        raise
+    return session
+
+def run_live_batch(session, exercise_spec, speech_feed, stats_placeholder, video_placeholder, perf_placeholder):
+    """
+    Live loop ka ek batch: LIVE_BATCH_S tak frames process karke lautta hai,
+    taaki fragment ka agla run (ya koi aur rerun) aa sake. Returns False
+    once the frame source has ended.
+    """
+    # Exercise spec session start par resolve hota hai (per-frame if/elif nahi)
+    joint_triples = exercise_spec.joint_triples
+    counter = session.counter
+    pipeline = session.pipeline
+    preview = session.preview
+    frame_timer = session.frame_timer
+    client_overlay = session.client_overlay
+    start_time = st.session_state.start_time
+    target_sets = st.session_state.target_sets
+    workout_done = st.session_state.set_counter > target_sets
+    voice_enabled = st.session_state.voice_enabled
+    last_spoken_feedback = st.session_state.last_spoken_feedback
+    speech = st.session_state.speech
+    show_perf_panel = st.session_state.show_perf_panel
+    render_speech(speech_feed)
+
+    if session.description:
+        st.caption(session.description)
+    if client_overlay:
+        # Component har run mein ek hi baar (stable key, iframe batches ke beech mount rehta hai); har frame sirf feed
+        with video_placeholder.container():
+            pose_overlay()
+            overlay_feed = st.empty()
+    # Stats ka layout har batch mein ek hi baar banta hai
+    stats_panel = StatsPanel(stats_placeholder)
+
+    batch_end = time.time() + LIVE_BATCH_S
+    while time.time() < batch_end:
+        packet = pipeline.next_packet()
+        if packet is None:
+            return False
+        session.touch()
+
+        frame_timer.start_frame()
+        frame_timer.add("capture", packet.capture_ms)
+        frame_timer.add("inference", packet.inference_ms)
+        elapsed_time = time.time() - start_time
+        results = packet.results
+        image_bgr = packet.image
+        # Pipeline (33, 4) array deta hai (stride mode mein extrapolated), saare angles ek call mein
+        landmarks = packet.landmarks
+
+        try:
+            # Check karein ki workout poora ho gaya hai ya nahi
+            if workout_done:
+                if counter.announce_complete():
+                    counter.set_feedback("Workout Complete! Stop the webcam.")
+                    safe_speak(counter.feedback, interrupt=True)
+                # Workout poora: landmarks draw honge lekin rep logic skip
+
+            elif landmarks is not None:
+                # Rep Counting Logic (Target ke saath)
+                event = counter.update(calculate_angles(landmarks, joint_triples))
+                if event is not None and event.kind == EVENT_SET_COMPLETE:
+                    safe_speak(event.message, interrupt=True)
+        except Exception:
+            counter.set_feedback("Poora shareer camera mein dikhayein!")
+        frame_timer.mark("logic")
+
+        # Preview frame rate cap: jo frame browser ko nahi jaayega uspar draw bhi nahi
+        send_preview = preview.due(time.time())
+
+        # Draw landmarks (browser-side skeleton mode mein server par drawing nahi)
+        if send_preview and not client_overlay and landmarks is not None:
+            pose_landmarks = array_to_landmark_list(landmarks) if packet.extrapolated else results.pose_landmarks
+            mp_drawing.draw_landmarks(
+                image_bgr, pose_landmarks, mp_pose.POSE_CONNECTIONS,
+                mp_drawing.DrawingSpec(color=(245,117,66), thickness=2, circle_radius=2),
+                mp_drawing.DrawingSpec(color=(245,66,230), thickness=2, circle_radius=2)
+            )
+        frame_timer.mark("draw")
+
+        # Session state ko sirf tab likhein jab counter mein kuch badla ho
+        if counter.version != session.synced_version:
+            sync_counter_to_session(counter)
+            session.synced_version = counter.version
+
+        # Voice Assistant Logic
+        if voice_enabled and counter.feedback != last_spoken_feedback:
+            last_spoken_feedback = counter.feedback
+            st.session_state.last_spoken_feedback = last_spoken_feedback
+            safe_speak(last_spoken_feedback)
+        # Debounce ke baad hi speech feed update hota hai (har frame nahi)
+        if speech.due(time.time()):
+            flush_speech(speech_feed)
+
+        # Frontend UI: Stats Dikhayein
+        # Sirf badle hue values bhejein (throttled), poora HTML block har frame nahi
+        stats_panel.update(
+            time.time(), counter.reps_left, counter.reps_right, elapsed_time,
+            counter.target_reps, counter.set_number, target_sets, counter.feedback
+        )
+
+        if send_preview and client_overlay:
+            # Sirf compact landmarks + stats (~1 KB), browser khud draw karta hai
+            push_overlay(overlay_feed, landmarks, counter.reps_left, counter.reps_right, counter.feedback)
+            preview.mark_sent(time.time())
+        elif send_preview:
+            # Chhota JPEG/WebP bytes bhejein, full-size raw frame nahi
+            video_placeholder.image(preview.encode(image_bgr, time.time()), width='stretch')
+        frame_timer.mark("ui")
+        # Frame buffers reuse hote hain, isliye har frame gc.collect() ki zaroorat nahi
+        frame_timer.end_frame()
+
+        # Performance panel ~2 baar per second update hota hai, har frame nahi
+        if show_perf_panel and time.time() - session.last_perf_render > 0.5:
+            session.last_perf_render = time.time()
+            perf_placeholder.markdown(
+                render_perf_markdown(
+                    frame_timer.summary(), pipeline.dropped_frames,
+                    pipeline.skipped_inferences, pipeline.quality,
+                    None if client_overlay else preview.kbps(time.time())
+                )
+            )
+    # Is batch mein jo bhi bola gaya, woh ab bhej dein (fragment run mein page wala feed nahi chalta)
+    render_speech(speech_feed)
+    return True
+
+def live_coach(exercise_spec, exercise_choice, side_choice):
+    """
+    Live Coach tab. Start/Stop, the browser camera widget, the feeds and
+    the placeholders all live inside this fragment (a fragment cannot write
+    outside its own container). While the webcam runs, app.py registers it
+    with run_every so each run processes one batch of frames.
+    """
+    # Band tab ke sessions ka Pose wapas (Streamlit session close par koi hook nahi)
+    reap_idle(LIVE_IDLE_TIMEOUT_S)
+    if st.session_state.live_notice:
+        st.error(st.session_state.live_notice)
+        st.session_state.live_notice = None
+    if st.button("Start / Stop Webcam", key="start_stop_button", use_container_width=True, type="primary"):
+        if st.session_state.webcam_started:
+            stop_webcam(exercise_choice, side_choice)
+        else:
+            start_webcam(exercise_choice)
+
+    # Browser camera widget har run par render hona chahiye (WebRTC connection isi se chalta hai)
+    webrtc_ctx = webrtc_camera() if st.session_state.frame_source == SOURCE_WEBRTC else None
+
+    # --- Speech feed, Stats aur Video ke liye Placeholders (Frontend UI) ---
+    speech_feed = st.empty()
+    stats_placeholder = st.empty()
+    video_placeholder = st.empty()
+    perf_placeholder = st.empty()
+    if not st.session_state.webcam_started:
+        close_live_session()
+        return
+
+    session = st.session_state.live_session
+    if session is not None and session.closed:
+        # Reaper ne band kar diya (tab der tak background mein tha)
+        st.session_state.live_session = None
+        abort_webcam("Live session idle hone par band ho gaya. Dobara Start karein.")
+    if session is None:
+        # Pehle pool se Pose lein; camera tabhi khulta hai jab slot mil jaye
+        session = open_live_session(exercise_spec, exercise_choice, side_choice, webrtc_ctx, video_placeholder)
+        if session is None:
+            abort_webcam(st.session_state.live_notice)
+        st.session_state.live_session = session
+
+    try:
+        running = run_live_batch(session, exercise_spec, speech_feed, stats_placeholder, video_placeholder, perf_placeholder)
+    except Exception as e:
+        # Error par session band (Pose pool mein wapas); rerun/stop (BaseException) par session agle batch mein chalta hai
+        abort_webcam(f"Live session error: {e}")
+    if not running:
+        # Camera/file khatam: set wahin stop, jaise Stop dabaya ho
+        stop_webcam(exercise_choice, side_choice)
+
 VOICE_OPTIONS = {
     'hi-IN': {
         'Hindi (Male - Default)': 'Google हिन्दी',
@@ -323,86 +758,38 @@ def load_user_profile_supabase():
 # --- END OF NEW DATABASE LOGIC ---
 # -----------------------------------------------------------------
 
-def parse_timestamp(ts):
-    if not ts:
-        return None
-    try:
-        return datetime.fromisoformat(ts.replace("Z", "+00:00"))
-    except Exception:
-        return None
-
 def safe_index(options, value, default=0):
     try:
         return options.index(value)
     except ValueError:
         return default
 
-def calculate_analytics(logs):
-    if not logs:
-        return None
-    parsed_logs = []
-    for log in logs:
-        ts = parse_timestamp(log.get("timestamp", ""))
-        total_reps = log.get("reps_left", 0) + log.get("reps_right", 0)
-        parsed_logs.append({
-            **log,
-            "timestamp_dt": ts,
-            "total_reps": total_reps,
-            "intensity": round(total_reps / max(log.get("duration", 1), 1), 2)
-        })
-
-    total_sessions = len(parsed_logs)
-    total_reps_all = sum(item["total_reps"] for item in parsed_logs)
-    total_duration = sum(item.get("duration", 0) for item in parsed_logs)
-    avg_intensity = round(sum(item["intensity"] for item in parsed_logs) / total_sessions, 2)
-
-    exercise_summary = defaultdict(lambda: {"sessions": 0, "reps": 0, "duration": 0})
-    daily_reps = defaultdict(int)
-    for item in parsed_logs:
-        ex = item.get("exercise", "Unknown")
-        exercise_summary[ex]["sessions"] += 1
-        exercise_summary[ex]["reps"] += item["total_reps"]
-        exercise_summary[ex]["duration"] += item.get("duration", 0)
-        if item["timestamp_dt"]:
-            day_key = item["timestamp_dt"].date().isoformat()
-            daily_reps[day_key] += item["total_reps"]
-
-    active_days = sorted(daily_reps.keys())
-    streak = 0
-    if active_days:
-        day_objs = [datetime.fromisoformat(d).date() for d in active_days]
-        streak = 1
-        for i in range(len(day_objs) - 1, 0, -1):
-            if (day_objs[i] - day_objs[i-1]).days == 1:
-                streak += 1
-            else:
-                break
-
-    summary_df = pd.DataFrame([
-        {
-            "Exercise": ex,
-            "Sessions": data["sessions"],
-            "Total Reps": data["reps"],
-            "Total Duration (s)": round(data["duration"], 1),
-            "Avg Reps / Session": round(data["reps"] / max(data["sessions"], 1), 1)
-        }
-        for ex, data in exercise_summary.items()
-    ]).sort_values(by="Total Reps", ascending=False)
-
-    trend_df = pd.DataFrame([
-        {"Date": day, "Total Reps": reps}
-        for day, reps in sorted(daily_reps.items())
-    ])
-
-    return {
-        "total_sessions": total_sessions,
-        "total_reps_all": total_reps_all,
-        "total_duration": total_duration,
-        "avg_intensity": avg_intensity,
-        "streak": streak,
-        "summary_df": summary_df,
-        "trend_df": trend_df
-    }
+def session_analytics():
+    """
+    Analytics dict of the logged-in user's workout log, memoized in session
+    state on (user id, log version). Reruns that did not change the log get
+    the cached dict back; after a change it comes from the incremental
+    WorkoutAggregate, not a rescan of the log.
+    """
+    user = st.session_state.user
+    key = (user["localId"] if user else None, st.session_state.workout_log_version)
+    cached = st.session_state.analytics_cache
+    if cached is None or cached[0] != key:
+        cached = (key, st.session_state.workout_aggregate.result())
+        st.session_state.analytics_cache = cached
+    return cached[1]
+
+def set_workout_log(logs):
+    """Replaces the whole workout log (login/logout); analytics are recomputed once."""
+    st.session_state.workout_log = logs
+    st.session_state.workout_aggregate = WorkoutAggregate.from_logs(logs)
+    st.session_state.workout_log_version += 1
+
+def add_workout_log(log_data):
+    # Naya set sabse upar; aggregate O(1) mein update, poora log dobara nahi padhna
+    st.session_state.workout_log.insert(0, log_data)
+    st.session_state.workout_aggregate.add(log_data)
+    st.session_state.workout_log_version += 1
 
 def suggest_targets(goal_focus, current_reps, current_sets, analytics):
     reps, sets_ = current_reps, current_sets
@@ -455,7 +842,8 @@ def generate_ai_insights(analytics, logs, goal_focus):
         insights.append("AI Insight: Intensity balanced hai. Isi pattern ko next 1 week maintain karo.")
 
     if logs:
-        top = calculate_analytics(logs)["summary_df"].iloc[0]["Exercise"]
+        # summary_df pehle se 'Total Reps' par sorted hai, poora analytics dobara nahi
+        top = analytics["summary_df"].iloc[0]["Exercise"]
         insights.append(f"AI Insight: Aapka best-performing movement **{top}** hai. Isko anchor exercise rakho.")
 
     if goal_focus == "Strength":
@@ -640,6 +1028,218 @@ def get_training_blueprint(experience_level):
     }
 
 
+# --- Analytics / Planner tabs (fragments) ---
+# Inke widgets sirf apna fragment rerun karte hain, poora app nahi.
+# 'analytics' pichle full run se aata hai; workout log badalne par full rerun hota hai.
+@st.fragment
+def analytics_tab(analytics):
+    st.subheader("Performance Intelligence Dashboard")
+    if not analytics:
+        st.info("Abhi analytics dikhane ke liye workout data nahi hai. 2-3 sets complete karein.")
+    else:
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Total Sessions", analytics["total_sessions"])
+        c2.metric("Total Reps", analytics["total_reps_all"])
+        c3.metric("Workout Time", f"{int(analytics['total_duration'] // 60)} min")
+        c4.metric("Current Streak", f"{analytics['streak']} day(s)")
+        st.caption(f"Estimated Intensity Score: **{analytics['avg_intensity']} reps/sec**")
+        st.dataframe(analytics["summary_df"], use_container_width=True, hide_index=True)
+        if not analytics["trend_df"].empty:
+            st.line_chart(analytics["trend_df"].set_index("Date")["Total Reps"], use_container_width=True)
+        csv_data = logs_to_csv(st.session_state.workout_log)
+        st.download_button(
+            "⬇️ Download Workout Data (CSV)",
+            data=csv_data,
+            file_name="workout_logs.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+        st.markdown("### 🤖 AI Performance Insights")
+        for msg in generate_ai_insights(analytics, st.session_state.workout_log, st.session_state.goal_focus):
+            st.markdown(f"<div class='smart-card'>{msg}</div>", unsafe_allow_html=True)
+
+@st.fragment
+def planner_tab(analytics):
+    # Fragment apne bahar ke placeholder mein nahi likh sakta, isliye apna feed (component wahi page wala)
+    planner_speech = st.empty()
+    if st.session_state.webcam_started:
+        st.caption("Webcam chal raha hai: yahan ke changes webcam stop hone par apply honge.")
+    st.subheader("Adaptive Training Plan")
+    recommended_reps, recommended_sets = suggest_targets(
+        st.session_state.goal_focus,
+        st.session_state.target_reps,
+        st.session_state.target_sets,
+        analytics
+    )
+    st.info(
+        f"Goal: **{st.session_state.goal_focus}**\n\n"
+        f"AI Recommendation → Next target: **{recommended_sets} sets × {recommended_reps} reps**"
+    )
+    if st.button("Apply Recommended Target", use_container_width=True):
+        st.session_state.target_reps = recommended_reps
+        st.session_state.target_sets = recommended_sets
+        # Sidebar ke target inputs fragment ke bahar hain, unke liye full rerun
+        st.rerun(scope="app")
+
+    st.markdown("### Form & Progress Suggestions")
+    if analytics:
+        top_exercise = analytics["summary_df"].iloc[0]["Exercise"]
+        st.success(f"Strongest pattern: **{top_exercise}** — isko weekly priority rakho.")
+        if analytics["streak"] < 3:
+            st.warning("Consistency low hai. 3-day streak challenge start karo for momentum.")
+        else:
+            st.success("Great consistency! Progressive overload safely continue karo.")
+    st.markdown(
+        """
+        - Warmup 5-7 min before session.
+        - Har rep me full range of motion maintain karo.
+        - 48h recovery rule follow karo same muscle group ke liye.
+        - Har week ek measurable metric improve karo (reps / form / control).
+        """
+    )
+
+    st.markdown("### 🗓️ Smart Weekly Program Generator")
+    weekly_plan = generate_weekly_plan(st.session_state.goal_focus, st.session_state.challenge_mode)
+    for day, plan in weekly_plan.items():
+        st.markdown(f"<div class='smart-card'><strong>{day}</strong><br>{plan}</div>", unsafe_allow_html=True)
+
+    st.markdown("### 🧬 Body Type + Goal Based Smart Nutrition Engine")
+    col_a, col_b, col_c = st.columns(3)
+    with col_a:
+        age = st.number_input("Age", min_value=14, max_value=75, value=st.session_state.profile_age)
+        gender_options = ["Male", "Female"]
+        gender = st.selectbox("Gender", gender_options, index=safe_index(gender_options, st.session_state.profile_gender))
+        level_options = ["Beginner", "Intermediate", "Pro / Advanced Athlete"]
+        experience_level = st.selectbox("Level", level_options, index=safe_index(level_options, st.session_state.profile_experience_level))
+    with col_b:
+        height_cm = st.number_input("Height (cm)", min_value=130, max_value=220, value=st.session_state.profile_height_cm)
+        weight_kg = st.number_input("Weight (kg)", min_value=35, max_value=180, value=st.session_state.profile_weight_kg)
+        body_type_options = ["Mota/High Body Fat", "Patla/Lean-Skinny", "Average"]
+        body_type = st.selectbox("Body Type", body_type_options, index=safe_index(body_type_options, st.session_state.profile_body_type))
+    with col_c:
+        activity_options = ["Sedentary", "Lightly Active", "Moderately Active", "Very Active", "Athlete"]
+        activity_level = st.selectbox("Activity", activity_options, index=safe_index(activity_options, st.session_state.profile_activity_level))
+        goal_options = ["Fat Loss (Mota se Fit/Patla)", "Muscle Gain (Patla se Mota/Fit)", "Body Recomposition (Fat kam + Muscle up)"]
+        goal_type = st.selectbox(
+            "Transformation Goal",
+            goal_options,
+            index=safe_index(goal_options, st.session_state.profile_goal_type)
+        )
+        diet_options = ["Vegetarian", "Vegan", "Non-Vegetarian"]
+        diet_type = st.selectbox("Diet Preference", diet_options, index=safe_index(diet_options, st.session_state.profile_diet_type))
+
+    st.session_state.profile_age = age
+    st.session_state.profile_gender = gender
+    st.session_state.profile_height_cm = height_cm
+    st.session_state.profile_weight_kg = weight_kg
+    st.session_state.profile_body_type = body_type
+    st.session_state.profile_activity_level = activity_level
+    st.session_state.profile_goal_type = goal_type
+    st.session_state.profile_diet_type = diet_type
+    st.session_state.profile_experience_level = experience_level
+
+    if st.button("💾 Save Profile for Next Login", use_container_width=True):
+        profile_payload = {
+            "age": age,
+            "gender": gender,
+            "height_cm": height_cm,
+            "weight_kg": weight_kg,
+            "body_type": body_type,
+            "activity_level": activity_level,
+            "goal_type": goal_type,
+            "diet_type": diet_type,
+            "experience_level": experience_level,
+            "updated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        }
+        saved = save_user_profile_supabase(profile_payload)
+        if saved:
+            st.success("Profile saved. Next login me auto-load ho jayega.")
+
+    calorie_data = calculate_calories_and_macros(age, gender, height_cm, weight_kg, activity_level, goal_type)
+    meal_plan, level_tip, goal_tip = get_diet_recommendations(diet_type, goal_type, experience_level)
+    blueprint = get_training_blueprint(experience_level)
+
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("BMR", f"{calorie_data['bmr']} kcal")
+    m2.metric("TDEE", f"{calorie_data['tdee']} kcal")
+    m3.metric("Target Calories/Day", f"{calorie_data['target_calories']} kcal")
+    m4.metric("Body Type", body_type)
+    st.caption(
+        f"Daily Macros → Protein: **{calorie_data['protein_g']}g**, Carbs: **{calorie_data['carbs_g']}g**, Fats: **{calorie_data['fats_g']}g**"
+    )
+
+    st.markdown(
+        f"""
+        <div class='smart-card'>
+        <strong>Training Blueprint ({experience_level})</strong><br>
+        Split: {blueprint['split']}<br>
+        Weekly Volume: {blueprint['volume']}<br>
+        Intensity: {blueprint['intensity']}<br>
+        Progression: {blueprint['progression']}
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+    st.markdown(
+        f"<div class='smart-card'><strong>{goal_tip}</strong><br>{level_tip}</div>",
+        unsafe_allow_html=True
+    )
+
+    meal_col1, meal_col2 = st.columns(2)
+    with meal_col1:
+        st.markdown("#### Meal Suggestions")
+        st.write(f"**Breakfast:** {', '.join(meal_plan['breakfast'])}")
+        st.write(f"**Lunch:** {', '.join(meal_plan['lunch'])}")
+    with meal_col2:
+        st.markdown("#### Snacks & Dinner")
+        st.write(f"**Snacks:** {', '.join(meal_plan['snacks'])}")
+        st.write(f"**Dinner:** {', '.join(meal_plan['dinner'])}")
+
+    if st.button("🔊 Speak Nutrition & Plan Summary", use_container_width=True):
+        summary_text = (
+            f"Your target calories are {calorie_data['target_calories']} per day. "
+            f"Protein {calorie_data['protein_g']} grams, carbs {calorie_data['carbs_g']} grams, fats {calorie_data['fats_g']} grams. "
+            f"Goal is {goal_type}. Diet preference is {diet_type}."
+        )
+        safe_speak(summary_text)
+
+    st.markdown("### 💬 Ask AI Coach")
+    if st.session_state.use_real_ai:
+        st.caption("Real AI mode ON. `OPENAI_API_KEY` ko Streamlit secrets ya environment variable me set karein.")
+    st.session_state.ai_auto_voice = st.checkbox("Auto-speak AI replies", value=st.session_state.ai_auto_voice)
+    user_query = st.text_input("Ask about form, progression, recovery, diet...", key="ai_query")
+    if st.button("Get AI Coach Reply", use_container_width=True):
+        response = None
+        if st.session_state.use_real_ai:
+            response, err = get_real_ai_response(
+                user_query=user_query,
+                analytics=analytics,
+                goal_focus=st.session_state.goal_focus,
+                calorie_data=calorie_data,
+                diet_type=diet_type,
+                experience_level=experience_level
+            )
+            if err:
+                st.warning(f"Real AI unavailable ({err}). Fallback coach answer shown.")
+        if not response:
+            response = ai_coach_reply(user_query, analytics, st.session_state.goal_focus)
+        st.session_state.ai_last_reply = response
+        st.session_state.ai_chat_history.insert(0, {"q": user_query, "a": response})
+        if st.session_state.ai_auto_voice:
+            safe_speak(response)
+
+    if st.button("🔊 Speak Last AI Reply", use_container_width=True) and st.session_state.ai_last_reply:
+        safe_speak(st.session_state.ai_last_reply, interrupt=True)
+
+    if st.session_state.ai_chat_history:
+        for chat in st.session_state.ai_chat_history[:5]:
+            st.markdown(
+                f"<div class='smart-card'><strong>You:</strong> {chat['q']}<br><strong>Coach:</strong> {chat['a']}</div>",
+                unsafe_allow_html=True
+            )
+
+    render_speech(planner_speech)
+
 # --- Main App ---
 st.markdown(
     """
@@ -763,6 +1363,12 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+# Speech component har run mein sirf yahin, ek baar (stable key), taaki iframe session bhar mount rahe;
+# naye utterances neeche wale feed (aur planner fragment ke feed) se jaate hain
+speech_component()
+speech_placeholder = st.empty()
+render_speech(speech_placeholder)
+
 # --- Deployment Logic (Supabase only) ---
 # Credentials are read silently from .streamlit/secrets.toml.
 # No login-screen configuration sidebar is shown.
@@ -797,7 +1403,7 @@ if st.session_state.page == 'Login':
             unsafe_allow_html=True
         )
         c1, c2, c3 = st.columns(3)
-        c1.metric("Exercises", "7")
+        c1.metric("Exercises", str(len(EXERCISE_NAMES)))
         c2.metric("Storage", "Supabase")
         c3.metric("Coach", "AI + Voice")
 
@@ -852,7 +1458,7 @@ if st.session_state.page == 'Login':
                                 "localId": user_obj.id,
                                 "idToken": session_obj.access_token if session_obj else ""
                             }
-                            st.session_state.workout_log = load_workout_logs_supabase()
+                            set_workout_log(load_workout_logs_supabase())
                             profile = load_user_profile_supabase()
 
                             if profile:
@@ -883,7 +1489,7 @@ elif st.session_state.page == 'Coach':
     
     exercise_choice = st.sidebar.selectbox(
         "Exercise chunein:",
-        ("Bicep Curls", "Squats", "Push-ups", "Overhead Press", "Lunges", "Jumping Jacks", "High Knees"),
+        EXERCISE_NAMES,
         key="exercise_choice"
     )
 
@@ -905,17 +1511,10 @@ elif st.session_state.page == 'Coach':
     st.session_state.target_sets = st.sidebar.number_input("Target Number of Sets", min_value=1, value=st.session_state.target_sets)
     st.sidebar.divider()
 
-    # Smart label logic
-    if exercise_choice in ["Bicep Curls", "Push-ups", "Overhead Press"]:
-        side_label = "Kaunsa haath track karein?"
-    elif exercise_choice in ["Squats", "Lunges", "High Knees"]:
-        side_label = "Kaunsa pair track karein?"
-    else: # Jumping Jacks
-        side_label = "Tracking:"
-    
-    side_options = ("Left", "Right", "Both")
-    if exercise_choice in ["Jumping Jacks"]:
-        side_options = ("Both",) 
+    # Smart label logic (registry se)
+    exercise_spec = get_exercise(exercise_choice)
+    side_label = exercise_spec.side_label
+    side_options = exercise_spec.side_options
         
     side_choice = st.sidebar.selectbox(
         side_label,
@@ -946,6 +1545,133 @@ elif st.session_state.page == 'Coach':
     selected_voice_friendly = st.sidebar.selectbox("Assistant Voice (Male/Female):", available_voices.keys(), index=default_voice_index)
     st.session_state.voice_name = available_voices[selected_voice_friendly]
     
+    st.sidebar.divider()
+
+    # Live loop performance settings
+    st.sidebar.title("⚙️ Performance")
+    # File/Synthetic sirf developers ke liye: hosted server par file path FFmpeg tak nahi jaana chahiye
+    source_options = FRAME_SOURCES if config_flag("DEV_FRAME_SOURCES") else CAMERA_SOURCES
+    if st.session_state.frame_source not in source_options:
+        st.session_state.frame_source = SOURCE_WEBCAM
+    st.session_state.frame_source = st.sidebar.selectbox(
+        "Camera source",
+        options=source_options,
+        index=source_options.index(st.session_state.frame_source),
+        help="Hosted app ke liye 'Browser camera (WebRTC)' chunein; server webcam sirf local run par kaam karta hai.",
+        disabled=st.session_state.webcam_started
+    )
+    if st.session_state.frame_source == SOURCE_WEBCAM:
+        with st.sidebar.expander("Webcam settings"):
+            resolutions = ["320x240", "640x480", "1280x720"]
+            st.session_state.camera_resolution = st.selectbox(
+                "Resolution", options=resolutions,
+                index=resolutions.index(st.session_state.camera_resolution),
+                disabled=st.session_state.webcam_started
+            )
+            st.session_state.camera_fps = st.selectbox(
+                "Camera FPS", options=[15, 30, 60],
+                index=[15, 30, 60].index(st.session_state.camera_fps),
+                disabled=st.session_state.webcam_started
+            )
+            st.session_state.camera_mjpg = st.checkbox(
+                "MJPG format", value=st.session_state.camera_mjpg,
+                help="Zyadatar webcams MJPG mein hi full FPS dete hain (raw YUYV slow hota hai).",
+                disabled=st.session_state.webcam_started
+            )
+            st.session_state.camera_drain = st.checkbox(
+                "Always use freshest frame", value=st.session_state.camera_drain,
+                help="Driver buffer mein pade purane frames skip karta hai, taaki feedback late na lage.",
+                disabled=st.session_state.webcam_started
+            )
+    if st.session_state.frame_source == SOURCE_FILE:
+        st.session_state.video_file_path = st.sidebar.text_input(
+            "Video file path",
+            value=st.session_state.video_file_path,
+            disabled=st.session_state.webcam_started
+        )
+    st.session_state.pipelined_mode = st.sidebar.checkbox(
+        "Pipelined capture (low latency)",
+        value=st.session_state.pipelined_mode,
+        help="Camera capture aur pose inference alag threads par chalte hain; UI sirf latest frame dikhata hai.",
+        disabled=st.session_state.webcam_started
+    )
+    st.session_state.idle_gating = st.sidebar.checkbox(
+        "Skip pose model when idle",
+        value=st.session_state.idle_gating,
+        help="Frame mein movement na ho (ya koi na dikhe) to model kam baar chalta hai aur pichla result reuse hota hai.",
+        disabled=st.session_state.webcam_started
+    )
+    st.session_state.adaptive_quality = st.sidebar.checkbox(
+        "Adaptive quality",
+        value=st.session_state.adaptive_quality,
+        help="Machine ki speed dekh kar model input resolution aur complexity (0/1/2) apne aap upar-neeche hoti hai.",
+        disabled=st.session_state.webcam_started
+    )
+    st.session_state.target_fps = st.sidebar.slider(
+        "Target FPS",
+        min_value=10, max_value=30,
+        value=st.session_state.target_fps,
+        disabled=st.session_state.webcam_started or not st.session_state.adaptive_quality
+    )
+    st.session_state.inference_stride = st.sidebar.select_slider(
+        "Inference stride",
+        options=[1, 2, 3, 4],
+        value=st.session_state.inference_stride,
+        help="Pose model har Nth frame par chalta hai; beech ke frames ke landmarks extrapolate hote hain (slow CPU ke liye).",
+        disabled=st.session_state.webcam_started
+    )
+    st.session_state.smooth_landmarks = st.sidebar.checkbox(
+        "Smooth landmarks",
+        value=st.session_state.smooth_landmarks,
+        help="One-Euro filter landmark jitter hatata hai, taaki threshold ke paas double count na ho.",
+        disabled=st.session_state.webcam_started
+    )
+    st.session_state.record_landmarks = st.sidebar.checkbox(
+        "Record landmarks (replay/debug)",
+        value=st.session_state.record_landmarks,
+        help="Har frame ke 33 landmarks recordings/ folder mein save hote hain (video nahi).",
+        disabled=st.session_state.webcam_started
+    )
+    # Overlay browser ke camera par draw hota hai, isliye landmarks bhi usi camera (WebRTC) ke hone chahiye
+    overlay_available = st.session_state.frame_source == SOURCE_WEBRTC
+    st.session_state.client_overlay = st.sidebar.checkbox(
+        "Browser-side skeleton",
+        value=st.session_state.client_overlay and overlay_available,
+        help="Server sirf landmarks bhejta hai; browser apne camera preview par skeleton khud draw karta hai (video frames nahi jaate). Sirf 'Browser camera (WebRTC)' source ke saath.",
+        disabled=st.session_state.webcam_started or not overlay_available
+    ) and overlay_available
+    with st.sidebar.expander("Video preview"):
+        st.session_state.preview_width = st.selectbox(
+            "Preview width",
+            options=[320, 480, 640, 960, None],
+            index=[320, 480, 640, 960, None].index(st.session_state.preview_width),
+            format_func=lambda w: "Full" if w is None else f"{w}px",
+            disabled=st.session_state.webcam_started
+        )
+        st.session_state.preview_format = st.selectbox(
+            "Format",
+            options=list(PREVIEW_FORMATS),
+            index=list(PREVIEW_FORMATS).index(st.session_state.preview_format),
+            help="WebP chhota hai par encode mein zyada CPU leta hai.",
+            disabled=st.session_state.webcam_started
+        )
+        st.session_state.preview_quality = st.slider(
+            "Quality", min_value=30, max_value=95,
+            value=st.session_state.preview_quality,
+            disabled=st.session_state.webcam_started
+        )
+        st.session_state.preview_fps = st.slider(
+            "Preview FPS", min_value=5, max_value=30,
+            value=st.session_state.preview_fps,
+            help="Browser ko kitne frames/sec bhejne hain. Rep counting har frame par hoti rehti hai.",
+            disabled=st.session_state.webcam_started
+        )
+    st.session_state.show_perf_panel = st.sidebar.checkbox(
+        "Show performance panel",
+        value=st.session_state.show_perf_panel,
+        help="Live FPS, dropped frames aur capture/inference/logic/draw/UI latency dikhata hai (video ke neeche)."
+    )
+
     st.sidebar.divider()
     
     # --- Workout Log (Sidebar) ---
@@ -972,7 +1698,7 @@ elif st.session_state.page == 'Coach':
                 pass
         st.session_state.user = None
         st.session_state.auth = None
-        st.session_state.workout_log = []
+        set_workout_log([])
         st.session_state.set_counter = 1 # Logout par set counter reset
         st.success("Logged out successfully!")
         safe_speak("Logged out successfully!")
@@ -981,480 +1707,20 @@ elif st.session_state.page == 'Coach':
 
     # --- Main App Interface (Coach) ---
     st.caption(f"Aapne chuna hai: **{exercise_choice} ({side_choice})**.")
-    analytics = calculate_analytics(st.session_state.workout_log)
+    analytics = session_analytics()
     tab_live, tab_analytics, tab_plan = st.tabs(["🎥 Live Coach", "📈 Advanced Analytics", "🧠 AI Training Planner"])
 
-    with tab_live:
-        if st.button("Start / Stop Webcam", key="start_stop_button", use_container_width=True, type="primary"):
-            st.session_state.webcam_started = not st.session_state.webcam_started
-            
-            if st.session_state.webcam_started:
-                # Check karein ki set counter reset karna hai ya nahi
-                if st.session_state.set_counter > st.session_state.target_sets:
-                    st.session_state.set_counter = 1
-                reset_states(exercise_choice)
-            
-            elif not st.session_state.webcam_started and st.session_state.start_time != 0:
-                # Stop logic
-                final_reps_left = st.session_state.rep_counter_left
-                final_reps_right = st.session_state.rep_counter_right
-                final_duration = time.time() - st.session_state.start_time
-                timestamp_now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-                
-                if final_reps_left > 0 or final_reps_right > 0:
-                    log_data = {
-                        "exercise": exercise_choice,
-                        "side": side_choice,
-                        "reps_left": final_reps_left,
-                        "reps_right": final_reps_right,
-                        "duration": final_duration,
-                        "set_number": st.session_state.set_counter, # Set number ko log karein
-                        "target_reps": st.session_state.target_reps, # Target ko log karein
-                        "timestamp": timestamp_now
-                    }
-                    
-                    save_success = save_workout_log_supabase(log_data)
-                    
-                    if save_success:
-                        # Log ko lokal list mein bhi add karein (taaki UI turant update ho)
-                        st.session_state.workout_log.insert(0, log_data)
-                        log_text = f"Set {st.session_state.set_counter} complete! Left: {final_reps_left}, Right: {final_reps_right} reps."
-                        st.success(log_text)
-                        safe_speak(log_text)
-                        
-                        # NAYA: Set logic
-                        if st.session_state.set_counter < st.session_state.target_sets:
-                            st.session_state.set_counter += 1
-                            st.info(f"Get ready for Set {st.session_state.set_counter}!")
-                            safe_speak(f"Get ready for Set {st.session_state.set_counter}!")
-                        else:
-                            st.balloons()
-                            st.success("Workout Complete! Excellent job!")
-                            safe_speak("Workout Complete! Excellent job!")
-                            st.session_state.set_counter = 1 # Workout poora, reset
-                            
-                    else:
-                        st.error("Workout log save nahi hua (Database Error).")
-                        safe_speak("Failed to log workout.")
-                else:
-                    st.warning("Koi rep detect nahi hua. Workout log nahi hua.")
-                    safe_speak("No reps detected. Workout not logged.")
-                
-                st.session_state.start_time = 0
-                st.rerun()
-
     with tab_analytics:
-        st.subheader("Performance Intelligence Dashboard")
-        if not analytics:
-            st.info("Abhi analytics dikhane ke liye workout data nahi hai. 2-3 sets complete karein.")
-        else:
-            c1, c2, c3, c4 = st.columns(4)
-            c1.metric("Total Sessions", analytics["total_sessions"])
-            c2.metric("Total Reps", analytics["total_reps_all"])
-            c3.metric("Workout Time", f"{int(analytics['total_duration'] // 60)} min")
-            c4.metric("Current Streak", f"{analytics['streak']} day(s)")
-            st.caption(f"Estimated Intensity Score: **{analytics['avg_intensity']} reps/sec**")
-            st.dataframe(analytics["summary_df"], use_container_width=True, hide_index=True)
-            if not analytics["trend_df"].empty:
-                st.line_chart(analytics["trend_df"].set_index("Date")["Total Reps"], use_container_width=True)
-            csv_data = logs_to_csv(st.session_state.workout_log)
-            st.download_button(
-                "⬇️ Download Workout Data (CSV)",
-                data=csv_data,
-                file_name="workout_logs.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
-            st.markdown("### 🤖 AI Performance Insights")
-            for msg in generate_ai_insights(analytics, st.session_state.workout_log, st.session_state.goal_focus):
-                st.markdown(f"<div class='smart-card'>{msg}</div>", unsafe_allow_html=True)
+        analytics_tab(analytics)
 
     with tab_plan:
-        st.subheader("Adaptive Training Plan")
-        recommended_reps, recommended_sets = suggest_targets(
-            st.session_state.goal_focus,
-            st.session_state.target_reps,
-            st.session_state.target_sets,
-            analytics
-        )
-        st.info(
-            f"Goal: **{st.session_state.goal_focus}**\n\n"
-            f"AI Recommendation → Next target: **{recommended_sets} sets × {recommended_reps} reps**"
-        )
-        if st.button("Apply Recommended Target", use_container_width=True):
-            st.session_state.target_reps = recommended_reps
-            st.session_state.target_sets = recommended_sets
-            st.success("Recommended targets applied to sidebar settings.")
-
-        st.markdown("### Form & Progress Suggestions")
-        if analytics:
-            top_exercise = analytics["summary_df"].iloc[0]["Exercise"]
-            st.success(f"Strongest pattern: **{top_exercise}** — isko weekly priority rakho.")
-            if analytics["streak"] < 3:
-                st.warning("Consistency low hai. 3-day streak challenge start karo for momentum.")
-            else:
-                st.success("Great consistency! Progressive overload safely continue karo.")
-        st.markdown(
-            """
-            - Warmup 5-7 min before session.
-            - Har rep me full range of motion maintain karo.
-            - 48h recovery rule follow karo same muscle group ke liye.
-            - Har week ek measurable metric improve karo (reps / form / control).
-            """
-        )
-
-        st.markdown("### 🗓️ Smart Weekly Program Generator")
-        weekly_plan = generate_weekly_plan(st.session_state.goal_focus, st.session_state.challenge_mode)
-        for day, plan in weekly_plan.items():
-            st.markdown(f"<div class='smart-card'><strong>{day}</strong><br>{plan}</div>", unsafe_allow_html=True)
-
-        st.markdown("### 🧬 Body Type + Goal Based Smart Nutrition Engine")
-        col_a, col_b, col_c = st.columns(3)
-        with col_a:
-            age = st.number_input("Age", min_value=14, max_value=75, value=st.session_state.profile_age)
-            gender_options = ["Male", "Female"]
-            gender = st.selectbox("Gender", gender_options, index=safe_index(gender_options, st.session_state.profile_gender))
-            level_options = ["Beginner", "Intermediate", "Pro / Advanced Athlete"]
-            experience_level = st.selectbox("Level", level_options, index=safe_index(level_options, st.session_state.profile_experience_level))
-        with col_b:
-            height_cm = st.number_input("Height (cm)", min_value=130, max_value=220, value=st.session_state.profile_height_cm)
-            weight_kg = st.number_input("Weight (kg)", min_value=35, max_value=180, value=st.session_state.profile_weight_kg)
-            body_type_options = ["Mota/High Body Fat", "Patla/Lean-Skinny", "Average"]
-            body_type = st.selectbox("Body Type", body_type_options, index=safe_index(body_type_options, st.session_state.profile_body_type))
-        with col_c:
-            activity_options = ["Sedentary", "Lightly Active", "Moderately Active", "Very Active", "Athlete"]
-            activity_level = st.selectbox("Activity", activity_options, index=safe_index(activity_options, st.session_state.profile_activity_level))
-            goal_options = ["Fat Loss (Mota se Fit/Patla)", "Muscle Gain (Patla se Mota/Fit)", "Body Recomposition (Fat kam + Muscle up)"]
-            goal_type = st.selectbox(
-                "Transformation Goal",
-                goal_options,
-                index=safe_index(goal_options, st.session_state.profile_goal_type)
-            )
-            diet_options = ["Vegetarian", "Vegan", "Non-Vegetarian"]
-            diet_type = st.selectbox("Diet Preference", diet_options, index=safe_index(diet_options, st.session_state.profile_diet_type))
-
-        st.session_state.profile_age = age
-        st.session_state.profile_gender = gender
-        st.session_state.profile_height_cm = height_cm
-        st.session_state.profile_weight_kg = weight_kg
-        st.session_state.profile_body_type = body_type
-        st.session_state.profile_activity_level = activity_level
-        st.session_state.profile_goal_type = goal_type
-        st.session_state.profile_diet_type = diet_type
-        st.session_state.profile_experience_level = experience_level
-
-        if st.button("💾 Save Profile for Next Login", use_container_width=True):
-            profile_payload = {
-                "age": age,
-                "gender": gender,
-                "height_cm": height_cm,
-                "weight_kg": weight_kg,
-                "body_type": body_type,
-                "activity_level": activity_level,
-                "goal_type": goal_type,
-                "diet_type": diet_type,
-                "experience_level": experience_level,
-                "updated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-            }
-            saved = save_user_profile_supabase(profile_payload)
-            if saved:
-                st.success("Profile saved. Next login me auto-load ho jayega.")
-
-        calorie_data = calculate_calories_and_macros(age, gender, height_cm, weight_kg, activity_level, goal_type)
-        meal_plan, level_tip, goal_tip = get_diet_recommendations(diet_type, goal_type, experience_level)
-        blueprint = get_training_blueprint(experience_level)
-
-        m1, m2, m3, m4 = st.columns(4)
-        m1.metric("BMR", f"{calorie_data['bmr']} kcal")
-        m2.metric("TDEE", f"{calorie_data['tdee']} kcal")
-        m3.metric("Target Calories/Day", f"{calorie_data['target_calories']} kcal")
-        m4.metric("Body Type", body_type)
-        st.caption(
-            f"Daily Macros → Protein: **{calorie_data['protein_g']}g**, Carbs: **{calorie_data['carbs_g']}g**, Fats: **{calorie_data['fats_g']}g**"
-        )
+        planner_tab(analytics)
 
-        st.markdown(
-            f"""
-            <div class='smart-card'>
-            <strong>Training Blueprint ({experience_level})</strong><br>
-            Split: {blueprint['split']}<br>
-            Weekly Volume: {blueprint['volume']}<br>
-            Intensity: {blueprint['intensity']}<br>
-            Progression: {blueprint['progression']}
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-        st.markdown(
-            f"<div class='smart-card'><strong>{goal_tip}</strong><br>{level_tip}</div>",
-            unsafe_allow_html=True
+    # Live tab sabse baad bharta hai: full run mein uska batch baaki tabs render hone ke baad chalta hai
+    with tab_live:
+        st.fragment(live_coach, run_every=LIVE_RERUN_EVERY_S if st.session_state.webcam_started else None)(
+            exercise_spec, exercise_choice, side_choice
         )
 
-        meal_col1, meal_col2 = st.columns(2)
-        with meal_col1:
-            st.markdown("#### Meal Suggestions")
-            st.write(f"**Breakfast:** {', '.join(meal_plan['breakfast'])}")
-            st.write(f"**Lunch:** {', '.join(meal_plan['lunch'])}")
-        with meal_col2:
-            st.markdown("#### Snacks & Dinner")
-            st.write(f"**Snacks:** {', '.join(meal_plan['snacks'])}")
-            st.write(f"**Dinner:** {', '.join(meal_plan['dinner'])}")
-
-        if st.button("🔊 Speak Nutrition & Plan Summary", use_container_width=True):
-            summary_text = (
-                f"Your target calories are {calorie_data['target_calories']} per day. "
-                f"Protein {calorie_data['protein_g']} grams, carbs {calorie_data['carbs_g']} grams, fats {calorie_data['fats_g']} grams. "
-                f"Goal is {goal_type}. Diet preference is {diet_type}."
-            )
-            safe_speak(summary_text)
-
-        st.markdown("### 💬 Ask AI Coach")
-        if st.session_state.use_real_ai:
-            st.caption("Real AI mode ON. `OPENAI_API_KEY` ko Streamlit secrets ya environment variable me set karein.")
-        st.session_state.ai_auto_voice = st.checkbox("Auto-speak AI replies", value=st.session_state.ai_auto_voice)
-        user_query = st.text_input("Ask about form, progression, recovery, diet...", key="ai_query")
-        if st.button("Get AI Coach Reply", use_container_width=True):
-            response = None
-            if st.session_state.use_real_ai:
-                response, err = get_real_ai_response(
-                    user_query=user_query,
-                    analytics=analytics,
-                    goal_focus=st.session_state.goal_focus,
-                    calorie_data=calorie_data,
-                    diet_type=diet_type,
-                    experience_level=experience_level
-                )
-                if err:
-                    st.warning(f"Real AI unavailable ({err}). Fallback coach answer shown.")
-            if not response:
-                response = ai_coach_reply(user_query, analytics, st.session_state.goal_focus)
-            st.session_state.ai_last_reply = response
-            st.session_state.ai_chat_history.insert(0, {"q": user_query, "a": response})
-            if st.session_state.ai_auto_voice:
-                safe_speak(response)
-
-        if st.button("🔊 Speak Last AI Reply", use_container_width=True) and st.session_state.ai_last_reply:
-            safe_speak(st.session_state.ai_last_reply)
-
-        if st.session_state.ai_chat_history:
-            for chat in st.session_state.ai_chat_history[:5]:
-                st.markdown(
-                    f"<div class='smart-card'><strong>You:</strong> {chat['q']}<br><strong>Coach:</strong> {chat['a']}</div>",
-                    unsafe_allow_html=True
-                )
-
-    # --- Stats aur Video ke liye Placeholders (Frontend UI) ---
-    stats_placeholder = st.empty()
-    video_placeholder = st.empty()
-
-    # --- Main Backend Loop ---
-    if st.session_state.webcam_started:
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
-            st.error("Webcam nahi chala. Permissions check karein.")
-        else:
-            while st.session_state.webcam_started:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-
-                elapsed_time = time.time() - st.session_state.start_time
-                image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                image_rgb.flags.writeable = False
-                results = pose.process(image_rgb) # Model yahaan run ho raha hai
-                image_rgb.flags.writeable = True
-                image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
-                
-                angle_l, angle_r = 0, 0
-                feedback_msg = st.session_state.feedback 
-                
-                try:
-                    # Check karein ki workout poora ho gaya hai ya nahi
-                    if st.session_state.set_counter > st.session_state.target_sets:
-                        if not st.session_state.workout_complete_feedback_given:
-                            st.session_state.feedback = "Workout Complete! Stop the webcam."
-                            safe_speak(st.session_state.feedback)
-                            st.session_state.workout_complete_feedback_given = True
-                        
-                        # Landmarks draw karein lekin logic skip kar dein
-                        if results.pose_landmarks:
-                            mp_drawing.draw_landmarks(
-                                image_bgr, results.pose_landmarks, mp_pose.POSE_CONNECTIONS,
-                                mp_drawing.DrawingSpec(color=(245,117,66), thickness=2, circle_radius=2),
-                                mp_drawing.DrawingSpec(color=(245,66,230), thickness=2, circle_radius=2)
-                            )
-                    
-                    elif results.pose_landmarks:
-                        landmarks = results.pose_landmarks.landmark
-                        
-                        # (Exercise logic mein koi change nahi)
-                        if exercise_choice in ["Bicep Curls", "Push-ups", "Overhead Press"]:
-                            shoulder_l = [landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x, landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-                            elbow_l = [landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].x, landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].y]
-                            wrist_l = [landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].x, landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].y]
-                            angle_l = calculate_angle(shoulder_l, elbow_l, wrist_l)
-                            
-                            shoulder_r = [landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].x, landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].y]
-                            elbow_r = [landmarks[mp_pose.PoseLandmark.RIGHT_ELBOW.value].x, landmarks[mp_pose.PoseLandmark.RIGHT_ELBOW.value].y]
-                            wrist_r = [landmarks[mp_pose.PoseLandmark.RIGHT_WRIST.value].x, landmarks[mp_pose.PoseLandmark.RIGHT_WRIST.value].y]
-                            angle_r = calculate_angle(shoulder_r, elbow_r, wrist_r)
-
-                        elif exercise_choice in ["Squats", "Lunges", "High Knees"]:
-                            hip_l = [landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].x, landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].y]
-                            knee_l = [landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value].x, landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value].y]
-                            ankle_l = [landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value].x, landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value].y]
-                            angle_l = calculate_angle(hip_l, knee_l, ankle_l)
-                            
-                            hip_r = [landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value].x, landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value].y]
-                            knee_r = [landmarks[mp_pose.PoseLandmark.RIGHT_KNEE.value].x, landmarks[mp_pose.PoseLandmark.RIGHT_KNEE.value].y]
-                            ankle_r = [landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value].x, landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value].y]
-                            angle_r = calculate_angle(hip_r, knee_r, ankle_r)
-
-                        elif exercise_choice == "Jumping Jacks":
-                            shoulder_l = [landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x, landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-                            hip_l = [landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].x, landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].y]
-                            wrist_l = [landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].x, landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].y]
-                            angle_l = calculate_angle(hip_l, shoulder_l, wrist_l) # Arm angle
-                            
-                            hip_r = [landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value].x, landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value].y]
-                            shoulder_r = [landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].x, landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].y]
-                            wrist_r = [landmarks[mp_pose.PoseLandmark.RIGHT_WRIST.value].x, landmarks[mp_pose.PoseLandmark.RIGHT_WRIST.value].y]
-                            angle_r = calculate_angle(hip_r, shoulder_r, wrist_r) # Arm angle
-
-                        # (Thresholds mein koi change nahi)
-                        if exercise_choice == "Bicep Curls":
-                            up_threshold, down_threshold, stage_check = 160, 30, 'down'
-                        elif exercise_choice == "Squats":
-                            up_threshold, down_threshold, stage_check = 160, 90, 'up'
-                        elif exercise_choice == "Push-ups":
-                            up_threshold, down_threshold, stage_check = 160, 90, 'up'
-                        elif exercise_choice == "Overhead Press":
-                            up_threshold, down_threshold, stage_check = 160, 90, 'down'
-                        elif exercise_choice == "Lunges":
-                            up_threshold, down_threshold, stage_check = 160, 100, 'up'
-                        elif exercise_choice == "Jumping Jacks":
-                            up_threshold, down_threshold, stage_check = 160, 30, 'up' 
-                        elif exercise_choice == "High Knees":
-                            up_threshold, down_threshold, stage_check = 160, 90, 'up' 
-
-                        # Rep Counting Logic (Target ke saath)
-                        current_reps_left = st.session_state.rep_counter_left
-                        current_reps_right = st.session_state.rep_counter_right
-                        
-                        # Reps check
-                        reps_met_left = current_reps_left >= st.session_state.target_reps
-                        reps_met_right = current_reps_right >= st.session_state.target_reps
-                        reps_met_both = reps_met_left and reps_met_right
-
-                        if (side_choice == 'Left' and reps_met_left) or \
-                           (side_choice == 'Right' and reps_met_right) or \
-                           (side_choice == 'Both' and reps_met_both):
-                            
-                            feedback_msg = f"Set {st.session_state.set_counter} Complete! Stop webcam to save."
-                            if not st.session_state.workout_complete_feedback_given: # Sirf ek baar bolo
-                                safe_speak(feedback_msg)
-                                st.session_state.workout_complete_feedback_given = True
-                        
-                        elif side_choice == 'Left':
-                            if angle_l < down_threshold and st.session_state.stage_left == stage_check:
-                                st.session_state.stage_left = 'down' if stage_check == 'up' else 'up'
-                                st.session_state.rep_counter_left += 1
-                                feedback_msg = f'Rep {st.session_state.rep_counter_left}!'
-                            elif angle_l > up_threshold and st.session_state.stage_left != stage_check:
-                                st.session_state.stage_left = stage_check
-                                feedback_msg = 'Ready'
-
-                        elif side_choice == 'Right':
-                            if angle_r < down_threshold and st.session_state.stage_right == stage_check:
-                                st.session_state.stage_right = 'down' if stage_check == 'up' else 'up'
-                                st.session_state.rep_counter_right += 1
-                                feedback_msg = f'Rep {st.session_state.rep_counter_right}!'
-                            elif angle_r > up_threshold and st.session_state.stage_right != stage_check:
-                                st.session_state.stage_right = stage_check
-                                feedback_msg = 'Ready'
-                        
-                        elif side_choice == 'Both':
-                            stage_l_reached = angle_l < down_threshold
-                            stage_r_reached = angle_r < down_threshold
-                            stage_l_reset = angle_l > up_threshold
-                            stage_r_reset = angle_r > up_threshold
-
-                            if (stage_l_reached and stage_r_reached and st.session_state.stage == stage_check):
-                                st.session_state.stage = 'down' if stage_check == 'up' else 'up'
-                                if not reps_met_both:
-                                    st.session_state.rep_counter_left += 1
-                                    st.session_state.rep_counter_right += 1
-                                    feedback_msg = f'Rep {st.session_state.rep_counter_left}!'
-                            elif (stage_l_reset and stage_r_reset and st.session_state.stage != stage_check):
-                                st.session_state.stage = stage_check
-                                feedback_msg = 'Ready for next rep'
-                            elif (stage_l_reached and not stage_r_reached and st.session_state.stage == stage_check):
-                                feedback_msg = 'ERROR: Move right side too!'
-                            elif (not stage_l_reached and stage_r_reached and st.session_state.stage == stage_check):
-                                feedback_msg = 'ERROR: Move left side too!'
-                            
-                            if exercise_choice in ['Squats', 'Push-ups', 'Lunges']:
-                                if (stage_check == 'up' and 
-                                    (down_threshold < angle_l < up_threshold or down_threshold < angle_r < up_threshold) and
-                                    st.session_state.stage == 'up'):
-                                    feedback_msg = 'Go lower!'
-                        
-                        st.session_state.feedback = feedback_msg 
-
-                        # Draw landmarks
-                        mp_drawing.draw_landmarks(
-                            image_bgr, results.pose_landmarks, mp_pose.POSE_CONNECTIONS,
-                            mp_drawing.DrawingSpec(color=(245,117,66), thickness=2, circle_radius=2),
-                            mp_drawing.DrawingSpec(color=(245,66,230), thickness=2, circle_radius=2)
-                        )
-                except Exception:
-                    st.session_state.feedback = "Poora shareer camera mein dikhayein!"
-
-                # Voice Assistant Logic
-                if (st.session_state.voice_enabled and 
-                    st.session_state.feedback != st.session_state.last_spoken_feedback):
-                    st.session_state.last_spoken_feedback = st.session_state.feedback
-                    safe_speak(st.session_state.feedback)
-
-                # Frontend UI: Stats Dikhayein
-                stats_placeholder.markdown(f"""
-                    <div style="background-color: #222; padding: 15px; border-radius: 10px; font-size: 1.5rem; display: grid; grid-template-columns: 1fr 1fr 1fr; gap: 10px;">
-                        <div style="text-align: center;">
-                            <strong>LEFT REPS</strong><br><span style="color: #00FF00; font-size: 2.5rem;">{st.session_state.rep_counter_left}</span>
-                        </div>
-                        <div style="text-align: center;">
-                            <strong>TIMER</strong><br><span style="color: #00FF00; font-size: 2.5rem;">{int(elapsed_time)}s</span>
-                        </div>
-                        <div style="text-align: center;">
-                            <strong>RIGHT REPS</strong><br><span style="color: #00FF00; font-size: 2.5rem;">{st.session_state.rep_counter_right}</span>
-                        </div>
-                    </div>
-                    
-                    <div style="background-color: #222; padding: 15px; border-radius: 10px; font-size: 1.5rem; display: grid; grid-template-columns: 1fr 1fr; gap: 10px; margin-top: 10px;">
-                        <div style="text-align: center;">
-                            <strong>TARGET REPS</strong><br><span style="color: #00FFFF; font-size: 2.5rem;">{st.session_state.target_reps}</span>
-                        </div>
-                        <div style="text-align: center;">
-                            <strong>CURRENT SET</strong><br><span style="color: #00FFFF; font-size: 2.5rem;">{st.session_state.set_counter} / {st.session_state.target_sets}</span>
-                        </div>
-                    </div>
-                    
-                    <div style="font-size: 1.5rem; text-align: center; margin-top: 15px; color: #00FFFF;">
-                        <strong>FEEDBACK:</strong> {st.session_state.feedback}
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                video_placeholder.image(image_bgr, channels="BGR", width='stretch')
-                
-                # NAYA FIX 4: Garbage Collection
-                # Memory saaf karein taaki app crash na ho
-                gc.collect()
-                
-                if not st.session_state.webcam_started:
-                    break
-            
-            cap.release()
-            cv2.destroyAllWindows()
-            stats_placeholder.empty()
-            video_placeholder.empty()
-            gc.collect() # Ek baar aur saaf karein
+# Is run mein jo bhi bola gaya (rerun ke bina), woh ab bhej dein
+render_speech(speech_placeholder)
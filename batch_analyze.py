@@ -0,0 +1,206 @@
+"""
+Offline scoring of recorded workout videos.
+
+Runs the same MediaPipe pose + landmark smoothing + RepCounter pipeline as
+the live coach over video files, spread across a process pool (one Pose
+instance per worker).
+
+    python batch_analyze.py uploads/*.mp4 --exercise Squats --side Both --workers 8 --output scores.csv
+    python batch_analyze.py --manifest uploads.csv --output scores.csv --logs-json workout_logs.json
+
+A manifest is a CSV with 'path', 'exercise' and 'side' columns (and optional
+'set_number' / 'target_reps'), for batches that mix exercises.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import cv2
+import numpy as np
+
+from exercises import EXERCISE_NAMES, get_exercise
+from landmark_filters import LandmarkSmoother
+from rep_counter import RepCounter
+from utils import landmarks_to_array, calculate_angles
+
+# Same columns as public.workout_logs (minus id/user_id) and logs_to_csv in app.py
+WORKOUT_LOG_FIELDS = ["timestamp", "exercise", "side", "reps_left", "reps_right", "duration", "set_number", "target_reps"]
+RESULT_FIELDS = ["file", "frames", "processing_s", "error"] + WORKOUT_LOG_FIELDS
+
+# Har worker process ka apna Pose instance (initializer mein banta hai)
+_worker_pose = None
+
+def _init_worker(model_complexity):
+    global _worker_pose
+    import mediapipe as mp
+    # Pool already saare cores use karta hai, OpenCV ke andar threads na badhayein
+    cv2.setNumThreads(1)
+    _worker_pose = mp.solutions.pose.Pose(
+        model_complexity=model_complexity,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+def analyze_video(path, exercise_name, side, pose, set_number=1, target_reps=10, smoothing=True):
+    """
+    Counts reps in one video file. Returns a result row: the workout_logs
+    fields plus 'file', 'frames', 'processing_s' and 'error'.
+    Reps are counted without the live target cap; 'target_reps' is only logged.
+    'smoothing' matches the live "Smooth landmarks" setting (on by default).
+    """
+    started = time.perf_counter()
+    row = {
+        "file": path,
+        "frames": 0,
+        "processing_s": 0.0,
+        "error": "",
+        "exercise": exercise_name,
+        "side": side,
+        "reps_left": 0,
+        "reps_right": 0,
+        "duration": 0.0,
+        "set_number": set_number,
+        "target_reps": target_reps,
+        "timestamp": "",
+    }
+    try:
+        exercise = get_exercise(exercise_name)
+    except KeyError:
+        row["error"] = f"Unknown exercise: {exercise_name}"
+        return row
+    if side not in exercise.side_options:
+        row["error"] = f"Side '{side}' not supported for {exercise_name}"
+        return row
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        row["error"] = "Video open nahi hua"
+        return row
+
+    # Naya video = nayi tracking state
+    pose.reset()
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    counter = RepCounter(exercise, side)
+    smoother = LandmarkSmoother(smoothing)
+    landmarks = np.empty((33, 4), dtype=np.float32)
+    frames = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames += 1
+            image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            image_rgb.flags.writeable = False
+            results = pose.process(image_rgb)
+            # Live jaisa hi filter, video ke apne time par
+            t = frames / fps
+            if results.pose_landmarks:
+                landmarks_to_array(results.pose_landmarks, out=landmarks)
+                counter.update(calculate_angles(smoother(t, landmarks), exercise.joint_triples))
+            else:
+                smoother(t, None)
+    finally:
+        cap.release()
+
+    mtime = datetime.fromtimestamp(os.path.getmtime(path), tz=timezone.utc)
+    row.update({
+        "frames": frames,
+        "reps_left": counter.reps_left,
+        "reps_right": counter.reps_right,
+        "duration": round(frames / fps, 2),
+        "timestamp": mtime.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "processing_s": round(time.perf_counter() - started, 2),
+    })
+    return row
+
+def _analyze_job(job):
+    try:
+        return analyze_video(pose=_worker_pose, **job)
+    except Exception as e:
+        return {"file": job["path"], "error": str(e)}
+
+def load_manifest(path):
+    jobs = []
+    with open(path, newline="") as f:
+        for item in csv.DictReader(f):
+            jobs.append({
+                "path": item["path"],
+                "exercise_name": item["exercise"],
+                "side": item.get("side") or "Both",
+                "set_number": int(item.get("set_number") or 1),
+                "target_reps": int(item.get("target_reps") or 10),
+            })
+    return jobs
+
+def run_batch(jobs, workers=None, model_complexity=0):
+    """Yields result rows as files finish (order is not preserved)."""
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    # spawn: MediaPipe graphs fork-safe nahi hain
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(model_complexity,)) as pool:
+        for row in pool.imap_unordered(_analyze_job, jobs, chunksize=1):
+            yield row
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score recorded workout videos offline.")
+    parser.add_argument("videos", nargs="*", help="Video files to analyze")
+    parser.add_argument("--manifest", help="CSV with path, exercise, side columns")
+    parser.add_argument("--exercise", choices=EXERCISE_NAMES, help="Exercise for all positional videos")
+    parser.add_argument("--side", default="Both", choices=("Left", "Right", "Both"))
+    parser.add_argument("--set-number", type=int, default=1)
+    parser.add_argument("--target-reps", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None, help="Process count (default: all cores)")
+    parser.add_argument("--model-complexity", type=int, default=0, choices=(0, 1, 2))
+    parser.add_argument("--no-smoothing", action="store_true", help="Count on raw landmarks (live 'Smooth landmarks' off)")
+    parser.add_argument("--output", default="batch_results.csv", help="Per-file results CSV")
+    parser.add_argument("--logs-json", help="Also write successful rows as workout_logs JSON")
+    args = parser.parse_args(argv)
+
+    jobs = load_manifest(args.manifest) if args.manifest else []
+    if args.videos:
+        if not args.exercise:
+            parser.error("--exercise is required for positional videos")
+        jobs += [
+            {
+                "path": path,
+                "exercise_name": args.exercise,
+                "side": args.side,
+                "set_number": args.set_number,
+                "target_reps": args.target_reps,
+            }
+            for path in args.videos
+        ]
+    if not jobs:
+        parser.error("no videos given")
+    for job in jobs:
+        job["smoothing"] = not args.no_smoothing
+
+    started = time.perf_counter()
+    rows = []
+    with open(args.output, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for row in run_batch(jobs, args.workers, args.model_complexity):
+            writer.writerow(row)
+            rows.append(row)
+            status = row["error"] or f"L {row.get('reps_left', 0)} / R {row.get('reps_right', 0)} reps"
+            print(f"{row['file']}: {status}", file=sys.stderr)
+
+    if args.logs_json:
+        logs = [{k: row[k] for k in WORKOUT_LOG_FIELDS} for row in rows if not row["error"]]
+        with open(args.logs_json, "w") as f:
+            json.dump(logs, f, indent=2)
+
+    failed = sum(1 for row in rows if row["error"])
+    elapsed = time.perf_counter() - started
+    print(f"{len(rows)} file(s) in {elapsed:.1f}s, {failed} failed -> {args.output}", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""
+Per-stage benchmark of the live coach hot path.
+
+Times every stage of one frame of the webcam loop separately and reports
+p50/p95/p99 per stage plus the FPS the p50s add up to. Runs headless on a
+CPU-only box (no camera, display or Streamlit needed).
+
+    python benchmark.py                                  # synthetic frames + landmarks
+    python benchmark.py --video clip.mp4 --recording recordings/session.lmk
+    python benchmark.py --save-baseline bench_baseline.json
+    python benchmark.py --compare bench_baseline.json --tolerance 0.2
+    python benchmark.py --backend tasks                  # PoseLandmarker instead of mp.solutions
+
+Stages that need MediaPipe (pose_process, draw_landmarks) are skipped with a
+note when it is not installed.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from exercises import EXERCISE_NAMES, get_exercise
+from landmark_filters import OneEuroFilter
+from live_view import PreviewEncoder, diff_stats, format_stats
+from perf import summarize_samples
+from pose_backends import BACKENDS
+from recording import open_recording
+from rep_counter import RepCounter
+from utils import NUM_POSE_LANDMARKS, calculate_angle, calculate_angles, landmarks_to_array
+
+# Stages that run once per frame in the live loop; their p50s give the FPS estimate.
+# cvt_rgb2bgr, image_encode and stats_html are still measured but the loop now draws
+# on the capture buffer, sends a downscaled preview and diffs the stats panel instead.
+LOOP_STAGES = (
+    "cvt_bgr2rgb", "pose_process", "landmark_extraction", "landmark_smoothing",
+    "angles_batched", "rep_logic", "draw_landmarks", "stats_diff", "preview_encode",
+)
+
+
+def synthetic_frames(width, height, count=8, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+def load_video_frames(path, width, height, limit=120):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if width and height:
+            frame = cv2.resize(frame, (width, height))
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise SystemExit(f"No frames could be read from {path}")
+    return frames
+
+def synthetic_landmarks(count=300, seed=0):
+    """(count, 33, 4) landmarks of a squat-like motion so the rep logic does real work."""
+    rng = np.random.default_rng(seed)
+    stack = rng.uniform(0.3, 0.7, (count, NUM_POSE_LANDMARKS, 4)).astype(np.float32)
+    stack[..., 3] = 0.99
+    phase = np.sin(np.linspace(0, 12 * np.pi, count))
+    for hip, knee, ankle, x in ((23, 25, 27, 0.45), (24, 26, 28, 0.55)):
+        stack[:, hip, :2] = (x, 0.4)
+        stack[:, knee, :2] = (x, 0.6)
+        stack[:, ankle, 0] = x + 0.18 * (1 - phase) / 2
+        stack[:, ankle, 1] = 0.8 - 0.25 * (1 - phase) / 2
+    return stack
+
+def as_landmark_list(landmarks):
+    """Duck-typed stand-in for results.pose_landmarks (no MediaPipe needed)."""
+    return SimpleNamespace(landmark=[
+        SimpleNamespace(x=float(x), y=float(y), z=float(z), visibility=float(v))
+        for x, y, z, v in landmarks
+    ])
+
+def render_stats_html(reps_left, reps_right, elapsed_time, target_reps, set_number, target_sets, feedback):
+    """
+    Stats block the live loop used to re-render every frame (now StatsPanel);
+    kept only as the baseline of the stats_html stage.
+    """
+    return f"""
+        <div style="background-color: #222; padding: 15px; border-radius: 10px; font-size: 1.5rem; display: grid; grid-template-columns: 1fr 1fr 1fr; gap: 10px;">
+            <div style="text-align: center;">
+                <strong>LEFT REPS</strong><br><span style="color: #00FF00; font-size: 2.5rem;">{reps_left}</span>
+            </div>
+            <div style="text-align: center;">
+                <strong>TIMER</strong><br><span style="color: #00FF00; font-size: 2.5rem;">{int(elapsed_time)}s</span>
+            </div>
+            <div style="text-align: center;">
+                <strong>RIGHT REPS</strong><br><span style="color: #00FF00; font-size: 2.5rem;">{reps_right}</span>
+            </div>
+        </div>
+
+        <div style="background-color: #222; padding: 15px; border-radius: 10px; font-size: 1.5rem; display: grid; grid-template-columns: 1fr 1fr; gap: 10px; margin-top: 10px;">
+            <div style="text-align: center;">
+                <strong>TARGET REPS</strong><br><span style="color: #00FFFF; font-size: 2.5rem;">{target_reps}</span>
+            </div>
+            <div style="text-align: center;">
+                <strong>CURRENT SET</strong><br><span style="color: #00FFFF; font-size: 2.5rem;">{set_number} / {target_sets}</span>
+            </div>
+        </div>
+
+        <div style="font-size: 1.5rem; text-align: center; margin-top: 15px; color: #00FFFF;">
+            <strong>FEEDBACK:</strong> {feedback}
+        </div>
+    """
+
+def time_stage(fn, iterations, warmup):
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter_ns()
+        fn(i)
+        samples.append((time.perf_counter_ns() - start) / 1e6)
+    return samples
+
+
+def build_stages(frames, landmark_stack, exercise, side, model_complexity, backend="solutions"):
+    """Returns ([(name, fn(i))], {skipped_name: reason})."""
+    n_frames = len(frames)
+    n_lm = len(landmark_stack)
+    rgb_frames = [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in frames]
+    landmark_lists = [as_landmark_list(lm) for lm in landmark_stack[:64]]
+    angle_stack = calculate_angles(landmark_stack, exercise.joint_triples)
+    triples = exercise.joint_triples
+    counter = RepCounter(exercise, side)
+    smoother = OneEuroFilter()
+    preview = PreviewEncoder()
+    shown_stats = format_stats(0, 0, 0, 10, 1, 3, "Rep 0!")
+    scratch = frames[0].copy()
+    stages = []
+    skipped = {}
+
+    def legacy_angles(i):
+        lm = landmark_stack[i % n_lm]
+        for a, b, c in triples:
+            calculate_angle(lm[a, :2].tolist(), lm[b, :2].tolist(), lm[c, :2].tolist())
+
+    rgb_buffer = np.empty_like(frames[0])
+    landmark_buffer = np.empty((NUM_POSE_LANDMARKS, 4), dtype=np.float32)
+    stages.append(("cvt_bgr2rgb", lambda i: cv2.cvtColor(frames[i % n_frames], cv2.COLOR_BGR2RGB, dst=rgb_buffer)))
+
+    try:
+        import mediapipe as mp
+    except ImportError:
+        mp = None
+        skipped["pose_process"] = skipped["draw_landmarks"] = "mediapipe not installed"
+
+    if mp is not None:
+        from pose_backends import create_pose_backend
+        # Tasks backend synchronous VIDEO mode mein, taaki model ka asli time mape (async submit nahi)
+        options = {"live_stream": False} if backend == "tasks" else {}
+        pose = create_pose_backend(backend, model_complexity, **options)
+        stages.append(("pose_process", lambda i: pose.process(rgb_frames[i % n_frames])))
+
+    stages += [
+        ("cvt_rgb2bgr", lambda i: cv2.cvtColor(rgb_frames[i % n_frames], cv2.COLOR_RGB2BGR)),
+        ("landmark_extraction", lambda i: landmarks_to_array(landmark_lists[i % len(landmark_lists)], out=landmark_buffer)),
+        ("landmark_smoothing", lambda i: smoother(i / 30.0, landmark_stack[i % n_lm])),
+        ("calculate_angle", legacy_angles),
+        ("angles_batched", lambda i: calculate_angles(landmark_stack[i % n_lm], triples)),
+        ("rep_logic", lambda i: counter.update(angle_stack[i % n_lm])),
+    ]
+
+    if mp is not None:
+        from mediapipe.framework.formats import landmark_pb2
+        mp_drawing = mp.solutions.drawing_utils
+        protos = []
+        for lm in landmark_stack[:64]:
+            proto = landmark_pb2.NormalizedLandmarkList()
+            for x, y, z, v in lm:
+                proto.landmark.add(x=float(x), y=float(y), z=float(z), visibility=float(v))
+            protos.append(proto)
+        landmark_spec = mp_drawing.DrawingSpec(color=(245,117,66), thickness=2, circle_radius=2)
+        connection_spec = mp_drawing.DrawingSpec(color=(245,66,230), thickness=2, circle_radius=2)
+        stages.append(("draw_landmarks", lambda i: mp_drawing.draw_landmarks(
+            scratch, protos[i % len(protos)], mp.solutions.pose.POSE_CONNECTIONS,
+            landmark_spec, connection_spec
+        )))
+
+    stages += [
+        ("stats_html", lambda i: render_stats_html(i % 12, i % 11, i / 30, 10, 1, 3, f"Rep {i % 12}!")),
+        # StatsPanel ka per-frame kaam: strings banao aur pichle shown values se diff karo
+        ("stats_diff", lambda i: diff_stats(shown_stats, format_stats(i // 15, i // 15, i / 30, 10, 1, 3, f"Rep {i // 15}!"))),
+        # st.image BGR numpy frames ko RGB karke quality=100 JPEG banata hai
+        ("image_encode", lambda i: cv2.imencode(".jpg", frames[i % n_frames], [cv2.IMWRITE_JPEG_QUALITY, 100])),
+        # Live preview ke default settings (640px JPEG q70)
+        ("preview_encode", lambda i: preview.encode(frames[i % n_frames], i)),
+    ]
+    return stages, skipped
+
+
+def run_benchmark(args):
+    if args.video:
+        frames = load_video_frames(args.video, args.width, args.height)
+        source = args.video
+    else:
+        frames = synthetic_frames(args.width, args.height)
+        source = "synthetic"
+    if args.recording:
+        metadata, records = open_recording(args.recording)
+        landmark_stack = np.array(records["landmarks"][records["present"] == 1])
+        exercise_name = args.exercise or metadata.get("exercise", "Squats")
+        side = args.side or metadata.get("side", "Both")
+    else:
+        landmark_stack = synthetic_landmarks()
+        exercise_name = args.exercise or "Squats"
+        side = args.side or "Both"
+    if len(landmark_stack) == 0:
+        raise SystemExit("Recording has no frames with a pose")
+
+    exercise = get_exercise(exercise_name)
+    stages, skipped = build_stages(frames, landmark_stack, exercise, side, args.model_complexity, args.backend)
+    only = set(args.stages.split(",")) if args.stages else None
+
+    results = {}
+    for name, fn in stages:
+        if only and name not in only:
+            continue
+        results[name] = summarize_samples(time_stage(fn, args.iterations, args.warmup))
+
+    frame_ms = sum(results[name]["p50_ms"] for name in LOOP_STAGES if name in results)
+    return {
+        "meta": {
+            "frames": source,
+            "landmarks": args.recording or "synthetic",
+            "resolution": f"{frames[0].shape[1]}x{frames[0].shape[0]}",
+            "exercise": exercise_name,
+            "side": side,
+            "backend": args.backend,
+            "model_complexity": args.model_complexity,
+            "iterations": args.iterations,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "machine": platform.machine(),
+        },
+        "stages": results,
+        "skipped": skipped,
+        "frame_p50_ms": round(frame_ms, 4),
+        "fps_estimate": round(1000.0 / frame_ms, 1) if frame_ms else None,
+    }
+
+def print_report(report):
+    meta = report["meta"]
+    print(f"frames={meta['frames']} landmarks={meta['landmarks']} {meta['resolution']} "
+          f"{meta['exercise']} ({meta['side']}) x{meta['iterations']}")
+    print(f"{'stage':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in report["stages"].items():
+        print(f"{name:<22}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}")
+    for name, reason in report["skipped"].items():
+        print(f"{name:<22}  skipped: {reason}")
+    print(f"frame p50: {report['frame_p50_ms']:.3f} ms  ->  ~{report['fps_estimate']} FPS")
+
+def compare_to_baseline(report, baseline, tolerance, min_delta_ms):
+    """Returns the list of (stage, base_p50, new_p50) that regressed beyond 'tolerance'."""
+    regressions = []
+    print(f"\n{'stage':<22}{'base p50':>10}{'new p50':>10}{'change':>9}")
+    for name, stats in report["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if not base:
+            continue
+        old, new = base["p50_ms"], stats["p50_ms"]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > tolerance and new - old > min_delta_ms:
+            regressions.append((name, old, new))
+            flag = "  REGRESSION"
+        print(f"{name:<22}{old:>10.3f}{new:>10.3f}{change:>+9.0%}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the live coach per-frame hot path.")
+    parser.add_argument("--video", help="Video file for frame-based stages (default: synthetic noise)")
+    parser.add_argument("--recording", help="Landmark recording (.lmk) for landmark-based stages")
+    parser.add_argument("--exercise", choices=EXERCISE_NAMES)
+    parser.add_argument("--side", choices=("Left", "Right", "Both"))
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--model-complexity", type=int, default=0, choices=(0, 1, 2))
+    parser.add_argument("--backend", default="solutions", choices=BACKENDS, help="Pose backend for pose_process")
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--stages", help="Comma-separated subset of stages to run")
+    parser.add_argument("--json", help="Write the full report as JSON")
+    parser.add_argument("--save-baseline", help="Write this run as the baseline JSON")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p50 slowdown ratio (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args)
+    print_report(report)
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) regressed more than {args.tolerance:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
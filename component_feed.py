@@ -0,0 +1,25 @@
+"""
+Live data for mounted browser components (frontend/*).
+
+A declared component keeps its iframe only while its identity is stable,
+and a stable key may be rendered once per script run (a second call with
+the same key raises). The live loop still has to push several updates a
+second, so those go into a hidden html element, the "feed", rendered next
+to the component. The component iframe is same-origin with the page and
+reads the newest feed text for its channel from the parent document.
+"""
+import html
+import json
+
+FEED_ATTR = "data-feed"
+
+
+def feed_html(channel, payload):
+    """Hidden <div> carrying 'payload' as compact JSON for the component listening on 'channel'."""
+    text = html.escape(json.dumps(payload, separators=(",", ":")), quote=False)
+    return f'<div {FEED_ATTR}="{channel}" hidden>{text}</div>'
+
+
+def push_feed(placeholder, channel, payload):
+    """Replaces the feed in 'placeholder' (an st.empty()); safe to call many times per run."""
+    placeholder.html(feed_html(channel, payload))
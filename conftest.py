@@ -0,0 +1 @@
+# Repo root sys.path par aata hai, taaki tests/ top-level modules import kar sakein
@@ -0,0 +1,70 @@
+from collections import namedtuple
+
+import numpy as np
+
+# MediaPipe Pose landmark indices (same values as mp_pose.PoseLandmark.X.value).
+# Yahan hardcode kiye hain taaki registry mediapipe import kiye bina bhi chale.
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_ELBOW, RIGHT_ELBOW = 13, 14
+LEFT_WRIST, RIGHT_WRIST = 15, 16
+LEFT_HIP, RIGHT_HIP = 23, 24
+LEFT_KNEE, RIGHT_KNEE = 25, 26
+LEFT_ANKLE, RIGHT_ANKLE = 27, 28
+
+ARM_SIDE_LABEL = "Kaunsa haath track karein?"
+LEG_SIDE_LABEL = "Kaunsa pair track karein?"
+ALL_SIDES = ("Left", "Right", "Both")
+
+ExerciseSpec = namedtuple(
+    "ExerciseSpec",
+    [
+        "name",
+        "joint_triples",   # (2, 3) index array: row 0 = left joint, row 1 = right joint
+        "up_threshold",
+        "down_threshold",
+        "stage_check",     # stage jisme rep count hone ke liye hona chahiye
+        "start_stage",     # set shuru hone par stage
+        "side_label",
+        "side_options",
+        "depth_cue",       # True ho to 'Go lower!' feedback diya jata hai
+    ]
+)
+
+def _build_spec(name, left, right, up_threshold, down_threshold, stage_check,
+                side_label=ARM_SIDE_LABEL, side_options=ALL_SIDES, depth_cue=False):
+    triples = np.array([left, right], dtype=np.intp)
+    triples.flags.writeable = False
+    return ExerciseSpec(
+        name=name,
+        joint_triples=triples,
+        up_threshold=up_threshold,
+        down_threshold=down_threshold,
+        stage_check=stage_check,
+        start_stage=stage_check,
+        side_label=side_label,
+        side_options=side_options,
+        depth_cue=depth_cue,
+    )
+
+ELBOW = ((LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST), (RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST))
+KNEE = ((LEFT_HIP, LEFT_KNEE, LEFT_ANKLE), (RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE))
+SHOULDER = ((LEFT_HIP, LEFT_SHOULDER, LEFT_WRIST), (RIGHT_HIP, RIGHT_SHOULDER, RIGHT_WRIST)) # Arm angle
+
+# Naya exercise add karna ho to bas yahan ek entry daalein
+EXERCISES = {
+    spec.name: spec for spec in (
+        _build_spec("Bicep Curls", *ELBOW, 160, 30, 'down'),
+        _build_spec("Squats", *KNEE, 160, 90, 'up', side_label=LEG_SIDE_LABEL, depth_cue=True),
+        _build_spec("Push-ups", *ELBOW, 160, 90, 'up', depth_cue=True),
+        _build_spec("Overhead Press", *ELBOW, 160, 90, 'down'),
+        _build_spec("Lunges", *KNEE, 160, 100, 'up', side_label=LEG_SIDE_LABEL, depth_cue=True),
+        _build_spec("Jumping Jacks", *SHOULDER, 160, 30, 'up', side_label="Tracking:", side_options=("Both",)),
+        _build_spec("High Knees", *KNEE, 160, 90, 'up', side_label=LEG_SIDE_LABEL),
+    )
+}
+
+EXERCISE_NAMES = tuple(EXERCISES)
+
+def get_exercise(name):
+    """Returns the precompiled ExerciseSpec for 'name' (KeyError if unknown)."""
+    return EXERCISES[name]
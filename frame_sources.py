@@ -0,0 +1,297 @@
+"""
+Pluggable frame sources for the live coach.
+
+Every source looks like cv2.VideoCapture to the pipeline: read(buffer=None)
+returns (ok, bgr_frame), plus isOpened() and release().
+
+    WebcamSource     camera attached to the server (cv2.VideoCapture)
+    WebRTCSource     the user's browser camera over WebRTC (streamlit-webrtc)
+    FileSource       a local video file, paced at its own FPS
+    SyntheticSource  generated frames, for tests and demos without a camera
+
+Only the camera sources are offered in the app; file and synthetic are
+developer sources (DEV_FRAME_SOURCES setting).
+"""
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from pipeline import LatestSlot
+
+SOURCE_WEBCAM = "Server webcam"
+SOURCE_WEBRTC = "Browser camera (WebRTC)"
+SOURCE_FILE = "Video file"
+SOURCE_SYNTHETIC = "Synthetic"
+CAMERA_SOURCES = (SOURCE_WEBCAM, SOURCE_WEBRTC)
+DEV_SOURCES = (SOURCE_FILE, SOURCE_SYNTHETIC)
+FRAME_SOURCES = CAMERA_SOURCES + DEV_SOURCES
+
+
+# Requested webcam settings; the driver may grant something else (see WebcamSource.granted)
+CaptureConfig = namedtuple(
+    "CaptureConfig",
+    ["width", "height", "fps", "fourcc", "buffer_size", "drain"],
+    defaults=[640, 480, 30, "MJPG", 1, True],
+)
+
+
+class WebcamSource:
+    """
+    Server camera with a low-latency setup. MJPG is requested first
+    (many webcams only reach 30 FPS at 640x480+ in MJPG, not raw YUYV), then
+    resolution, FPS and a one-frame driver buffer.
+    With 'drain', when the driver did not grant the one-frame buffer,
+    read() grabs (without decoding) until a grab actually has to wait for
+    the sensor, so frames that sat in the driver buffer while the previous
+    frame was processed are skipped and only the freshest one is decoded.
+    """
+
+    MAX_DRAIN = 4
+
+    def __init__(self, index=0, config=None):
+        self.config = config or CaptureConfig()
+        self._cap = cv2.VideoCapture(index)
+        if self._cap.isOpened():
+            self._configure()
+        granted = self.granted() if self._cap.isOpened() else {"fps": 0, "buffer_size": 0}
+        # Buffer se aaya grab turant lautta hai; naye frame ke liye sensor ka wait hota hai
+        self._fresh_after_s = 0.3 / (granted["fps"] or self.config.fps or 30)
+        # Driver ne 1-frame buffer de diya to purana frame max ek frame purana hai, drain ki zaroorat nahi
+        self._drain = self.config.drain and granted["buffer_size"] != 1
+        self.drained = 0
+
+    def _configure(self):
+        config = self.config
+        if config.fourcc:
+            self._cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*config.fourcc))
+        if config.width and config.height:
+            self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.width)
+            self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.height)
+        if config.fps:
+            self._cap.set(cv2.CAP_PROP_FPS, config.fps)
+        if config.buffer_size:
+            self._cap.set(cv2.CAP_PROP_BUFFERSIZE, config.buffer_size)
+
+    def granted(self):
+        """What the driver actually gave us (it may silently ignore any request)."""
+        code = int(self._cap.get(cv2.CAP_PROP_FOURCC))
+        fourcc = "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\0") if code > 0 else ""
+        return {
+            "width": int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": round(self._cap.get(cv2.CAP_PROP_FPS), 1),
+            "fourcc": fourcc,
+            "buffer_size": int(self._cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+        }
+
+    def describe(self):
+        granted = self.granted()
+        buffer_size = granted["buffer_size"] if granted["buffer_size"] > 0 else "driver default"
+        return (f"Camera: {granted['width']}x{granted['height']} @ {granted['fps']} FPS, "
+                f"{granted['fourcc'] or 'unknown format'}, buffer {buffer_size}")
+
+    def isOpened(self):
+        return self._cap.isOpened()
+
+    def read(self, buffer=None):
+        if not self._drain:
+            return self._cap.read(buffer)
+        for attempt in range(self.MAX_DRAIN + 1):
+            started = time.perf_counter()
+            if not self._cap.grab():
+                return False, None
+            if time.perf_counter() - started >= self._fresh_after_s:
+                break
+        # Har pichla grab ek purana (buffered) frame tha jo decode kiye bina chhod diya
+        self.drained += attempt
+        return self._cap.retrieve(buffer)
+
+    def release(self):
+        self._cap.release()
+
+
+class FileSource:
+    """
+    Plays a video file like a camera: with 'realtime' frames are returned at
+    the file's FPS (not as fast as decoding allows), with 'loop' it restarts
+    at the end. Only opens local files: anything else (URLs, devices, which
+    cv2/FFmpeg would also accept) leaves it closed.
+    """
+
+    def __init__(self, path, realtime=True, loop=False):
+        self._cap = cv2.VideoCapture(path) if path and os.path.isfile(path) else cv2.VideoCapture()
+        self._interval = 1.0 / (self._cap.get(cv2.CAP_PROP_FPS) or 30.0) if realtime else 0.0
+        self._loop = loop
+        self._next_at = None
+
+    def isOpened(self):
+        return self._cap.isOpened()
+
+    def read(self, buffer=None):
+        ok, frame = self._cap.read(buffer)
+        if not ok and self._loop:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self._cap.read(buffer)
+        if ok and self._interval:
+            self._next_at = _pace(self._next_at, self._interval)
+        return ok, frame
+
+    def release(self):
+        self._cap.release()
+
+
+class SyntheticSource:
+    """
+    Moving test pattern at 'fps'. 'frames' limits the length (None = endless).
+    The pattern shifts every frame, so the idle gate still sees motion.
+    """
+
+    def __init__(self, width=640, height=480, fps=30, frames=None):
+        self.width = width
+        self.height = height
+        self.frames = frames
+        self._interval = 1.0 / fps if fps else 0.0
+        self._index = 0
+        self._next_at = None
+        self._opened = True
+        ramp = np.linspace(0, 255, width, dtype=np.float32)
+        self._base = np.broadcast_to(ramp, (height, width)).astype(np.uint8)
+
+    def isOpened(self):
+        return self._opened
+
+    def read(self, buffer=None):
+        if not self._opened or (self.frames is not None and self._index >= self.frames):
+            return False, None
+        if buffer is None or buffer.shape != (self.height, self.width, 3):
+            buffer = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        shifted = np.roll(self._base, self._index * 4, axis=1)
+        buffer[..., 0] = shifted
+        buffer[..., 1] = shifted[::-1]
+        buffer[..., 2] = (self._index * 8) % 256
+        self._index += 1
+        if self._interval:
+            self._next_at = _pace(self._next_at, self._interval)
+        return True, buffer
+
+    def release(self):
+        self._opened = False
+
+
+class WebRTCSource:
+    """
+    Frames from the browser camera of this session's webrtc_streamer.
+    A receiver thread (one per session) pulls decoded frames from
+    streamlit-webrtc, keeps only the newest in a single-slot mailbox and
+    drops anything older than 'max_age_s', so a slow pipeline never works on
+    a backlog. read() waits up to 'first_frame_timeout' for the stream to
+    start and returns (False, None) once it stops.
+    """
+
+    def __init__(self, webrtc_ctx, max_age_s=0.5, first_frame_timeout=15.0, frame_timeout=2.0):
+        self._ctx = webrtc_ctx
+        self.max_age_s = max_age_s
+        self._first_frame_timeout = first_frame_timeout
+        self._frame_timeout = frame_timeout
+        self._slot = LatestSlot()
+        self._running = threading.Event()
+        self._running.set()
+        self._started = False
+        self.late_dropped = 0
+        self._thread = threading.Thread(target=self._receive_loop, name="coach-webrtc", daemon=True)
+        self._thread.start()
+
+    @property
+    def dropped(self):
+        return self._slot.dropped + self.late_dropped
+
+    def isOpened(self):
+        return self._ctx is not None
+
+    def _receive_loop(self):
+        try:
+            while self._running.is_set():
+                receiver = self._ctx.video_receiver
+                if receiver is None:
+                    # Browser ne abhi stream start nahi kiya
+                    time.sleep(0.05)
+                    continue
+                try:
+                    frames = receiver.get_frames(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if not frames:
+                    continue
+                # Receiver queue mein jo purane frames pade hain, unhe skip karein
+                self.late_dropped += len(frames) - 1
+                self._slot.put((frames[-1], time.time()))
+        finally:
+            self._slot.wake()
+
+    def read(self, buffer=None):
+        timeout = self._frame_timeout if self._started else self._first_frame_timeout
+        deadline = time.time() + timeout
+        while self._running.is_set():
+            item = self._slot.take(timeout=max(0.0, deadline - time.time()))
+            if item is None:
+                if time.time() >= deadline or (self._started and not self._ctx.state.playing):
+                    return False, None
+                continue
+            frame, received_at = item
+            if time.time() - received_at > self.max_age_s:
+                self.late_dropped += 1
+                continue
+            self._started = True
+            image = frame.to_ndarray(format="bgr24")
+            if buffer is not None and buffer.shape == image.shape:
+                buffer[...] = image
+                image = buffer
+            return True, image
+        return False, None
+
+    def release(self):
+        self._running.clear()
+        self._slot.wake()
+        self._thread.join(timeout=2.0)
+
+
+def webrtc_camera(key="coach-camera"):
+    """
+    Renders the browser camera widget (send-only, no video sent back) and
+    returns its context for WebRTCSource. Call it on every script run.
+    """
+    from streamlit_webrtc import WebRtcMode, webrtc_streamer
+    return webrtc_streamer(
+        key=key,
+        mode=WebRtcMode.SENDONLY,
+        media_stream_constraints={"video": {"width": 640, "height": 480}, "audio": False},
+        rtc_configuration={"iceServers": [{"urls": ["stun:stun.l.google.com:19302"]}]},
+    )
+
+
+def create_frame_source(kind, webrtc_ctx=None, path=None, capture_config=None):
+    if kind == SOURCE_WEBCAM:
+        return WebcamSource(0, capture_config)
+    if kind == SOURCE_WEBRTC:
+        return WebRTCSource(webrtc_ctx)
+    if kind == SOURCE_FILE:
+        return FileSource(path, realtime=True, loop=True)
+    if kind == SOURCE_SYNTHETIC:
+        return SyntheticSource()
+    raise ValueError(f"Unknown frame source: {kind}")
+
+
+def _pace(next_at, interval):
+    """Sleeps until 'next_at' and returns the next deadline (keeps a steady FPS)."""
+    now = time.perf_counter()
+    if next_at is None or now - next_at > interval:
+        # Pehla frame, ya bahut peeche reh gaye: schedule yahin se dobara shuru
+        return now + interval
+    if next_at > now:
+        time.sleep(next_at - now)
+    return next_at + interval
@@ -0,0 +1,96 @@
+"""
+Adaptive quality for the live loop: picks the pose model input scale and
+model complexity from the measured per-frame work time, so fast machines get
+the more accurate models and slow ones stay real-time.
+"""
+
+# Sasta se mehenga: (input scale, model_complexity)
+QUALITY_LEVELS = (
+    (0.5, 0),
+    (0.75, 0),
+    (1.0, 0),
+    (1.0, 1),
+    (1.0, 2),
+)
+DEFAULT_LEVEL = 2 # Full resolution, complexity 0 (purana fixed setting)
+
+
+class QualityGovernor:
+    """
+    Steps through QUALITY_LEVELS against a frame budget of 1000 / target_fps ms.
+
+    observe() takes the work time of each inferred frame and returns the new
+    (input_scale, model_complexity) when the level changes, else None.
+    Hysteresis keeps it from flapping:
+      - it steps down as soon as the smoothed time is over budget, but only
+        steps up when it is below 'headroom' x budget and the current level
+        has been held for 'hold_s' seconds;
+      - a level it had to leave is blocked for 'backoff_s', doubling every
+        time that level turns out too slow again.
+    The first frames after a change are ignored (model load, warm-up).
+    """
+
+    def __init__(self, target_fps=20, levels=QUALITY_LEVELS, start_level=DEFAULT_LEVEL,
+                 headroom=0.6, hold_s=3.0, backoff_s=10.0, warmup_frames=5, settle_frames=20):
+        self.target_fps = target_fps
+        self.budget_ms = 1000.0 / target_fps
+        self.levels = tuple(levels)
+        self.level = min(start_level, len(self.levels) - 1)
+        self.max_level = len(self.levels) - 1
+        self.headroom = headroom
+        self.hold_s = hold_s
+        self.backoff_s = backoff_s
+        self.warmup_frames = warmup_frames
+        self.settle_frames = settle_frames
+        self.smoothed_ms = None
+        self.changes = 0
+        self._alpha = 2.0 / (settle_frames + 1)
+        self._samples = 0
+        self._changed_at = 0.0
+        self._blocked_until = {}
+        self._backoff = {}
+
+    @property
+    def setting(self):
+        return self.levels[self.level]
+
+    def observe(self, work_ms, now):
+        self._samples += 1
+        if self._samples <= self.warmup_frames:
+            return None
+        if self.smoothed_ms is None:
+            self.smoothed_ms = work_ms
+        else:
+            self.smoothed_ms += self._alpha * (work_ms - self.smoothed_ms)
+        if self._samples < self.warmup_frames + self.settle_frames:
+            return None
+
+        if self.smoothed_ms > self.budget_ms and self.level > 0:
+            backoff = self._backoff.get(self.level, self.backoff_s)
+            self._blocked_until[self.level] = now + backoff
+            self._backoff[self.level] = backoff * 2
+            return self._move(self.level - 1, now)
+
+        up = self.level + 1
+        if (up <= self.max_level
+                and self.smoothed_ms < self.budget_ms * self.headroom
+                and now - self._changed_at >= self.hold_s
+                and now >= self._blocked_until.get(up, 0.0)):
+            return self._move(up, now)
+        return None
+
+    def reject(self, now):
+        """
+        The current level could not be applied (e.g. the model failed to load):
+        go back one level and never try this one or anything above it again.
+        """
+        self.max_level = max(0, self.level - 1)
+        return self._move(self.max_level, now)
+
+    def _move(self, level, now):
+        self.level = level
+        self.changes += 1
+        self.smoothed_ms = None
+        self._samples = 0
+        self._changed_at = now
+        return self.levels[level]
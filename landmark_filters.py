@@ -0,0 +1,162 @@
+"""
+Streaming post-processing of (33, 4) landmark arrays between the pose model
+and the angle computation: stride extrapolation and One-Euro smoothing.
+LandmarkSmoother is the smoothing stage used by both the live pipeline and
+batch scoring, so both count reps on the same landmarks.
+"""
+import numpy as np
+
+from utils import NUM_POSE_LANDMARKS
+
+
+class LandmarkExtrapolator:
+    """
+    Fills in landmarks for frames the model did not run on (inference stride).
+    Keeps the last two model outputs and moves every landmark along its
+    velocity (constant-velocity extrapolation), x/y/z only; visibility is
+    held. Beyond 'max_gap_s' since the last model output, or when the
+    history spans a gap that long, the last landmarks are held instead.
+    """
+
+    def __init__(self, max_gap_s=0.25):
+        self.max_gap_s = max_gap_s
+        self._history = np.zeros((2, NUM_POSE_LANDMARKS, 4), dtype=np.float32)
+        self._times = [0.0, 0.0]
+        self._count = 0
+
+    def reset(self):
+        self._count = 0
+
+    def update(self, t, landmarks):
+        """Adds a model output; None (no pose) clears the history."""
+        if landmarks is None:
+            self._count = 0
+            return
+        self._history[0] = self._history[1]
+        self._times[0] = self._times[1]
+        self._history[1] = landmarks
+        self._times[1] = t
+        self._count = min(self._count + 1, 2)
+
+    def predict(self, t):
+        """Estimated (33, 4) landmarks at time 't', or None without history."""
+        if self._count == 0:
+            return None
+        last = self._history[1]
+        ahead = t - self._times[1]
+        span = self._times[1] - self._times[0]
+        if self._count < 2 or span <= 0 or span > self.max_gap_s or ahead <= 0 or ahead > self.max_gap_s:
+            return last.copy()
+        predicted = last.copy()
+        predicted[:, :3] += (last[:, :3] - self._history[0, :, :3]) * np.float32(ahead / span)
+        return predicted
+
+
+class OneEuroFilter:
+    """
+    One-Euro filter (Casiez et al.) run on all 33 landmarks at once.
+    Each x/y/z coordinate is an independent low-pass filter whose cutoff
+    rises with its own speed: still joints are smoothed hard (no jitter
+    around angle thresholds), fast ones barely lag. Visibility passes
+    through unchanged. Speeds are in normalized image units per second.
+
+    The default beta is high enough that a full-range rep every 0.4 s
+    (faster than any exercise in the registry, even at 15 fps) still
+    crosses both angle thresholds; beta=10 lost most reps at that tempo.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=100.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self._x = np.zeros((NUM_POSE_LANDMARKS, 3), dtype=np.float64)
+        self._dx = np.zeros((NUM_POSE_LANDMARKS, 3), dtype=np.float64)
+        self._t = None
+
+    def reset(self):
+        self._t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2.0 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, t, landmarks):
+        """Returns a new smoothed (33, 4) float32 array; None (no pose) resets the filter."""
+        if landmarks is None:
+            self._t = None
+            return None
+        out = np.array(landmarks, dtype=np.float32)
+        x = out[:, :3].astype(np.float64)
+        if self._t is None:
+            self._x[:] = x
+            self._dx[:] = 0.0
+            self._t = t
+            return out
+        dt = t - self._t
+        if dt <= 0:
+            # Same timestamp (reused frame): pichla estimate hi do
+            out[:, :3] = self._x
+            return out
+        self._t = t
+        self._dx += self._alpha(self.d_cutoff, dt) * ((x - self._x) / dt - self._dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        self._x += self._alpha(cutoff, dt) * (x - self._x)
+        out[:, :3] = self._x
+        return out
+
+
+class LandmarkSmoother:
+    """
+    Smoothing stage between the pose model and the angles: a OneEuroFilter
+    when enabled, else landmarks pass through unchanged. Call it for every
+    frame, with None for frames without a pose.
+    """
+
+    def __init__(self, enabled=True, **filter_kwargs):
+        self._filter = OneEuroFilter(**filter_kwargs) if enabled else None
+
+    @property
+    def enabled(self):
+        return self._filter is not None
+
+    def reset(self):
+        if self._filter is not None:
+            self._filter.reset()
+
+    def __call__(self, t, landmarks):
+        if self._filter is None:
+            return landmarks
+        return self._filter(t, landmarks)
+
+
+def smooth_stack(times, landmarks, present, smoother=None):
+    """Offline One-Euro pass over a recording's (frames, 33, 4) landmarks."""
+    smoother = smoother or OneEuroFilter()
+    out = np.array(landmarks, dtype=np.float32)
+    for i in range(len(out)):
+        smoothed = smoother(times[i], out[i] if present[i] else None)
+        if smoothed is not None:
+            out[i] = smoothed
+    return out
+
+
+def extrapolate_stride(times, landmarks, present, stride):
+    """
+    Offline version of the live stride mode for a recording: keeps the model
+    output of every 'stride'-th frame and extrapolates the frames between.
+    Returns new (landmarks, present) arrays of the same length.
+    """
+    out = np.array(landmarks, dtype=np.float32)
+    out_present = np.zeros(len(out), dtype=bool)
+    extrapolator = LandmarkExtrapolator()
+    for i in range(len(out)):
+        if i % stride == 0:
+            extrapolator.update(times[i], landmarks[i] if present[i] else None)
+            out_present[i] = bool(present[i])
+        else:
+            predicted = extrapolator.predict(times[i])
+            if predicted is not None:
+                out[i] = predicted
+                out_present[i] = True
+    return out, out_present
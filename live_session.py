@@ -0,0 +1,79 @@
+"""
+One running webcam session: the pooled Pose, frame source, pipeline and
+recorder, plus the rep counter and timers of the live loop.
+
+The live coach is a Streamlit fragment that processes frames in short
+batches (see app.py), so a session outlives a single script run and is
+kept in session_state between batches. A browser tab that is closed never
+runs the fragment again and Streamlit has no hook for it; reap_idle()
+closes such sessions so their Pose goes back to the pool.
+"""
+import threading
+import time
+
+# Is server process ke saare khule sessions (reaper ke liye)
+_lock = threading.Lock()
+_open_sessions = set()
+
+
+class LiveSession:
+    """
+    Owns a checked-out Pose from the start. The app fills in 'cap',
+    'pipeline' and 'recorder' as it opens them and the loop state
+    ('counter', 'frame_timer', ...) as it goes; close() frees whatever
+    exists. 'last_active' is refreshed by the batches (touch()).
+    """
+
+    def __init__(self, pose_pool, pose):
+        self.pose_pool = pose_pool
+        self.pose = pose
+        self.cap = None
+        self.pipeline = None
+        self.recorder = None
+        self.description = None # Driver ne asal mein kya diya (WebcamSource.describe)
+        self.counter = None
+        self.synced_version = None
+        self.frame_timer = None
+        self.preview = None
+        self.client_overlay = False
+        self.last_perf_render = 0.0
+        self.last_active = time.time()
+        self.closed = False
+        with _lock:
+            _open_sessions.add(self)
+
+    def touch(self, now=None):
+        self.last_active = time.time() if now is None else now
+
+    def close(self):
+        """
+        Stops the pipeline and frees the Pose, recorder and camera. Safe to
+        call more than once and from another session's thread (reap_idle).
+        """
+        with _lock:
+            if self.closed:
+                return
+            self.closed = True
+            _open_sessions.discard(self)
+        try:
+            stopped = self.pipeline.stop() if self.pipeline is not None else True
+            if stopped:
+                self.pose_pool.release(self.pose)
+            else:
+                # Worker thread ab bhi chal raha hai: yeh instance kisi aur session ko na mile
+                self.pose_pool.discard(self.pose)
+        finally:
+            if self.recorder is not None:
+                self.recorder.close()
+            if self.cap is not None:
+                self.cap.release()
+
+
+def reap_idle(timeout_s, now=None):
+    """Closes every session whose batches stopped 'timeout_s' ago; returns how many."""
+    now = time.time() if now is None else now
+    with _lock:
+        idle = [session for session in _open_sessions if now - session.last_active > timeout_s]
+    for session in idle:
+        session.close()
+    return len(idle)
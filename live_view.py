@@ -0,0 +1,190 @@
+import os
+
+import cv2
+import numpy as np
+
+from component_feed import push_feed
+
+# Stats panel ke cells: (field, label, value color); feedback alag full-width row mein
+STATS_LAYOUT = (
+    (("reps_left", "LEFT REPS", "#00FF00"), ("timer", "TIMER", "#00FF00"), ("reps_right", "RIGHT REPS", "#00FF00")),
+    (("target_reps", "TARGET REPS", "#00FFFF"), ("set", "CURRENT SET", "#00FFFF")),
+)
+
+def format_stats(reps_left, reps_right, elapsed_time, target_reps, set_number, target_sets, feedback):
+    """Display strings of every stats panel field."""
+    return {
+        "reps_left": str(reps_left),
+        "timer": f"{int(elapsed_time)}s",
+        "reps_right": str(reps_right),
+        "target_reps": str(target_reps),
+        "set": f"{set_number} / {target_sets}",
+        "feedback": str(feedback),
+    }
+
+def diff_stats(previous, current):
+    """Fields of 'current' whose display string differs from 'previous'."""
+    return {field: value for field, value in current.items() if previous.get(field) != value}
+
+class StatsPanel:
+    """
+    Live coach stats panel that is laid out once (labels and boxes) inside
+    'container' and afterwards only pushes the values that changed, each into
+    its own small placeholder. Updates are throttled to 'max_hz'; a frame
+    that changes nothing sends nothing to the browser.
+    """
+
+    def __init__(self, container, max_hz=5):
+        self.min_interval = 1.0 / max_hz if max_hz else 0.0
+        self.pushed = 0
+        self._shown = {}
+        self._last_push = 0.0
+        self._slots = {}
+        panel = container.container()
+        for row in STATS_LAYOUT:
+            for column, (field, label, color) in zip(panel.columns(len(row)), row):
+                box = column.container(border=True)
+                box.markdown(f"<div style='text-align: center; font-size: 1.5rem;'><strong>{label}</strong></div>",
+                             unsafe_allow_html=True)
+                self._slots[field] = (box.empty(), color)
+        self._slots["feedback"] = (panel.empty(), None)
+
+    def update(self, now, reps_left, reps_right, elapsed_time, target_reps, set_number, target_sets, feedback):
+        """Pushes changed values (at most 'max_hz' times a second); returns how many were sent."""
+        if now - self._last_push < self.min_interval:
+            return 0
+        changes = diff_stats(self._shown, format_stats(
+            reps_left, reps_right, elapsed_time, target_reps, set_number, target_sets, feedback
+        ))
+        if not changes:
+            return 0
+        for field, value in changes.items():
+            slot, color = self._slots[field]
+            if color is None:
+                slot.markdown(f"<div style='font-size: 1.5rem; text-align: center; color: #00FFFF;'>"
+                              f"<strong>FEEDBACK:</strong> {value}</div>", unsafe_allow_html=True)
+            else:
+                slot.markdown(f"<div style='text-align: center; color: {color}; font-size: 2.5rem;'>{value}</div>",
+                              unsafe_allow_html=True)
+        self._shown.update(changes)
+        self._last_push = now
+        self.pushed += len(changes)
+        return len(changes)
+
+def render_perf_markdown(summary, dropped_frames, skipped_inferences=0, quality=None, preview_kbps=None):
+    """
+    Sidebar performance panel: FPS, dropped frames, idle-skipped inferences,
+    current model input scale/complexity, preview bandwidth aur har stage ki latency.
+    """
+    lines = [
+        f"**FPS:** {summary['fps']}  |  **Dropped:** {dropped_frames}  |  **Idle skips:** {skipped_inferences}  "
+        f"|  **Frames:** {summary['frames']}",
+    ]
+    if quality is not None:
+        scale, complexity = quality
+        lines += ["", f"**Model input:** {scale:.0%}  |  **Complexity:** {complexity}"]
+    if preview_kbps is not None:
+        lines += ["", f"**Preview:** {preview_kbps:.0f} KB/s"]
+    lines += [
+        "",
+        "| Stage | mean ms | p95 ms |",
+        "|---|---:|---:|",
+    ]
+    for stage, stats in summary["stages"].items():
+        lines.append(f"| {stage} | {stats['mean_ms']:.1f} | {stats['p95_ms']:.1f} |")
+    return "\n".join(lines)
+
+
+# st.image ko encoded bytes milte hain, wo unhe bina re-encode kiye browser ko bhejta hai
+PREVIEW_FORMATS = {
+    "JPEG": (".jpg", cv2.IMWRITE_JPEG_QUALITY),
+    "WebP": (".webp", cv2.IMWRITE_WEBP_QUALITY),
+}
+
+class PreviewEncoder:
+    """
+    Compact browser preview of the annotated frame: downscaled to 'max_width'
+    (None = full size), encoded as JPEG/WebP at 'quality', and sent at most
+    'max_fps' times per second no matter how fast frames are processed.
+    Keeps a running bytes count for the performance panel.
+    """
+
+    def __init__(self, max_width=640, fmt="JPEG", quality=70, max_fps=15):
+        self.max_width = max_width
+        self.extension, quality_flag = PREVIEW_FORMATS[fmt]
+        self.params = [quality_flag, int(quality)]
+        self.interval = 1.0 / max_fps if max_fps else 0.0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self._last_sent = 0.0
+        self._started = None
+        self._scaled = None
+
+    def due(self, now):
+        """True when the next preview frame may be sent (frame rate cap)."""
+        return now - self._last_sent >= self.interval
+
+    def encode(self, image_bgr, now):
+        height, width = image_bgr.shape[:2]
+        if self.max_width and width > self.max_width:
+            size = (self.max_width, round(height * self.max_width / width))
+            if self._scaled is None or self._scaled.shape[1::-1] != size:
+                self._scaled = np.empty((size[1], size[0], 3), dtype=image_bgr.dtype)
+            image_bgr = cv2.resize(image_bgr, size, dst=self._scaled, interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode(self.extension, image_bgr, self.params)
+        if not ok:
+            raise ValueError(f"Preview encode failed ({self.extension})")
+        data = buffer.tobytes()
+        self.mark_sent(now, len(data))
+        return data
+
+    def mark_sent(self, now, nbytes=0):
+        """Counts a sent preview frame (also for non-image previews like the browser overlay)."""
+        if self._started is None:
+            self._started = now
+        self._last_sent = now
+        self.frames_sent += 1
+        self.bytes_sent += nbytes
+
+    def kbps(self, now):
+        """Average preview bandwidth in KB/s since the first frame."""
+        if self._started is None or now <= self._started:
+            return 0.0
+        return self.bytes_sent / 1024.0 / (now - self._started)
+
+
+OVERLAY_COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "pose_overlay")
+OVERLAY_FEED = "pose_overlay"
+_pose_overlay = None
+
+def compact_landmarks(landmarks, decimals=3):
+    """(33, 4) array -> flat [x, y, visibility, ...] list (~600 bytes as JSON) for the browser overlay."""
+    if landmarks is None:
+        return []
+    return np.round(landmarks[:, [0, 1, 3]].astype(np.float64), decimals).ravel().tolist()
+
+def overlay_payload(landmarks, reps_left, reps_right, feedback):
+    """One overlay update: compact landmarks plus the HUD stats (~650 bytes as JSON)."""
+    return {
+        "landmarks": compact_landmarks(landmarks),
+        "reps_left": reps_left,
+        "reps_right": reps_right,
+        "feedback": feedback,
+    }
+
+def pose_overlay(key="pose_overlay"):
+    """
+    Browser-side skeleton: the component shows the browser's own camera and
+    draws the landmarks on a canvas over it, so the server sends about a
+    kilobyte per frame instead of an image. Render it once per run with a
+    stable 'key' (the iframe and its camera stay open across reruns); the
+    per-frame data goes through push_overlay() into a feed rendered after it.
+    """
+    global _pose_overlay
+    if _pose_overlay is None:
+        import streamlit.components.v1 as components
+        _pose_overlay = components.declare_component("pose_overlay", path=OVERLAY_COMPONENT_DIR)
+    return _pose_overlay(feed=OVERLAY_FEED, key=key, default=None)
+
+def push_overlay(feed_placeholder, landmarks, reps_left, reps_right, feedback):
+    push_feed(feed_placeholder, OVERLAY_FEED, overlay_payload(landmarks, reps_left, reps_right, feedback))
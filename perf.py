@@ -0,0 +1,79 @@
+import time
+
+import numpy as np
+
+def summarize_samples(samples_ms):
+    """
+    Latency summary of a list of per-call timings in milliseconds:
+    count, mean and p50/p95/p99.
+    """
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    if samples.size == 0:
+        return {"n": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "n": int(samples.size),
+        "mean_ms": round(float(samples.mean()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+    }
+
+
+FRAME_STAGES = ("capture", "inference", "logic", "draw", "ui")
+
+class FrameTimer:
+    """
+    Per-stage timings of the last 'capacity' frames, kept in a fixed-size
+    ring buffer (no allocation per frame). Use start_frame(), then mark(stage)
+    after each stage, then end_frame(). Timings measured on other threads
+    (capture/inference in pipelined mode) are added with add(stage, ms).
+    """
+
+    def __init__(self, stages=FRAME_STAGES, capacity=300):
+        self.stages = tuple(stages)
+        self.capacity = capacity
+        self._index = {stage: i for i, stage in enumerate(self.stages)}
+        self._samples = np.zeros((capacity, len(self.stages)), dtype=np.float64)
+        self._frame_ends = np.zeros(capacity, dtype=np.float64)
+        self._row = np.zeros(len(self.stages), dtype=np.float64)
+        self._last = 0.0
+        self.count = 0
+
+    def start_frame(self):
+        self._row[:] = 0.0
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self._row[self._index[stage]] += (now - self._last) * 1000.0
+        self._last = now
+
+    def add(self, stage, ms):
+        self._row[self._index[stage]] += ms
+
+    def end_frame(self):
+        slot = self.count % self.capacity
+        self._samples[slot] = self._row
+        self._frame_ends[slot] = time.perf_counter()
+        self.count += 1
+
+    def summary(self):
+        """FPS over the buffered window plus mean/p95 ms per stage."""
+        filled = min(self.count, self.capacity)
+        if filled == 0:
+            return {"frames": 0, "fps": 0.0, "stages": {}}
+        samples = self._samples[:filled]
+        ends = self._frame_ends[:filled]
+        span = ends.max() - ends.min()
+        fps = (filled - 1) / span if filled > 1 and span > 0 else 0.0
+        p95 = np.percentile(samples, 95, axis=0)
+        means = samples.mean(axis=0)
+        return {
+            "frames": self.count,
+            "fps": round(float(fps), 1),
+            "stages": {
+                stage: {"mean_ms": round(float(means[i]), 2), "p95_ms": round(float(p95[i]), 2)}
+                for i, stage in enumerate(self.stages)
+            },
+        }
@@ -0,0 +1,416 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from governor import DEFAULT_LEVEL, QUALITY_LEVELS
+from landmark_filters import LandmarkExtrapolator, LandmarkSmoother
+from utils import landmarks_to_array
+
+
+class FramePacket:
+    """
+    One processed frame handed from the pipeline to the UI thread.
+    'image' is the BGR capture frame to draw on, 'results' is the last pose
+    model output and 'landmarks' the (33, 4) array for this frame (None = no pose).
+    'capture_ms' / 'inference_ms' are how long the read and the model took.
+    'inferred' is False when the model was skipped for this frame; then
+    'extrapolated' tells whether 'landmarks' were predicted (stride mode) or
+    simply reused from 'results' (idle gate).
+    'raw_landmarks' is the model output 'landmarks' came from, before
+    smoothing or extrapolation (the reused one on idle-gated frames, None on
+    stride-skipped frames); recordings store these.
+    'landmarks_at' is the capture time the landmarks describe: 'captured_at',
+    except with an async backend whose result belongs to an earlier frame.
+    """
+    __slots__ = ("seq", "image", "results", "landmarks", "captured_at", "processed_at",
+                 "capture_ms", "inference_ms", "inferred", "extrapolated", "raw_landmarks",
+                 "landmarks_at")
+
+    def __init__(self, seq, image, results, landmarks, captured_at, processed_at, capture_ms=0.0,
+                 inference_ms=0.0, inferred=True, extrapolated=False, raw_landmarks=None,
+                 landmarks_at=None):
+        self.seq = seq
+        self.image = image
+        self.results = results
+        self.landmarks = landmarks
+        self.raw_landmarks = raw_landmarks
+        self.landmarks_at = captured_at if landmarks_at is None else landmarks_at
+        self.captured_at = captured_at
+        self.processed_at = processed_at
+        self.capture_ms = capture_ms
+        self.inference_ms = inference_ms
+        self.inferred = inferred
+        self.extrapolated = extrapolated
+
+
+class LatestSlot:
+    """
+    Single-item mailbox: put() overwrites whatever was not consumed yet,
+    so the reader always gets the newest item and never a backlog.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify_all()
+
+    def take(self, timeout=None):
+        """Removes and returns the newest item, waiting up to 'timeout' seconds."""
+        with self._cond:
+            if self._item is None:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+
+class MotionGate:
+    """
+    Cheap check in front of pose.process for idle frames.
+    Each frame is shrunk to a tiny grayscale thumbnail and compared with the
+    thumbnail of the last frame that was actually inferred. Inference runs
+    when at least 'motion_pixels' thumbnail pixels changed by more than
+    'pixel_threshold' grey levels, and otherwise only every 'idle_interval'
+    seconds while a person is in view, or every 'absent_interval' seconds
+    while nobody is. Counting changed pixels (not the mean over the whole
+    thumbnail) keeps a single moving forearm from averaging out as idle.
+    """
+
+    def __init__(self, pixel_threshold=12, motion_pixels=3, idle_interval=0.5, absent_interval=1.0,
+                 thumb_size=(32, 24)):
+        self.pixel_threshold = pixel_threshold
+        self.motion_pixels = motion_pixels
+        self.idle_interval = idle_interval
+        self.absent_interval = absent_interval
+        self.thumb_size = thumb_size
+        self.present = False
+        self.skipped = 0
+        self._reference = None
+        self._last_run = 0.0
+
+    def should_infer(self, frame, now):
+        thumb = cv2.cvtColor(
+            cv2.resize(frame, self.thumb_size, interpolation=cv2.INTER_AREA),
+            cv2.COLOR_BGR2GRAY
+        )
+        if self._reference is None:
+            moved = True
+        else:
+            # Ek thumbnail pixel ~20x20 frame pixels: chhota haath bhi kuch pixels poore badal deta hai
+            diff = cv2.absdiff(thumb, self._reference)
+            moved = np.count_nonzero(diff > self.pixel_threshold) >= self.motion_pixels
+        interval = self.idle_interval if self.present else self.absent_interval
+        if moved or now - self._last_run >= interval:
+            self._reference = thumb
+            self._last_run = now
+            return True
+        self.skipped += 1
+        return False
+
+    def update_presence(self, results):
+        self.present = results is not None and results.pose_landmarks is not None
+
+
+class _BasePipeline:
+    # True jab inference aur UI alag threads par parallel chalte hain
+    _overlapped = False
+
+    def __init__(self, cap, pose, gate=None, governor=None, stride=1, smoothing=False, recorder=None):
+        self.cap = cap
+        self.pose = pose
+        self.gate = gate
+        self.governor = governor
+        self.recorder = recorder
+        self.stride = max(1, stride)
+        self._extrapolator = LandmarkExtrapolator() if self.stride > 1 else None
+        self._since_inference = 0
+        self._smoother = LandmarkSmoother(smoothing)
+        self.input_scale = 1.0
+        self._seq = 0
+        self._rgb = None # Model input ke liye reuse hone wala RGB buffer
+        self._scaled = None
+        self._last_results = None
+        self._last_landmarks = None
+        self._last_landmarks_at = None
+        self._pending_quality = governor.setting if governor is not None else None
+        self._consumer_ms = 0.0
+        self._returned_at = None
+
+    def _rgb_buffer(self, frame):
+        if self._rgb is None or self._rgb.shape != frame.shape:
+            self._rgb = np.empty_like(frame)
+        return self._rgb
+
+    def _model_input(self, frame):
+        """Frame ko 'input_scale' par chhota karta hai (preallocated buffer mein)."""
+        if self.input_scale == 1.0:
+            return frame
+        height, width = frame.shape[:2]
+        size = (max(1, round(width * self.input_scale)), max(1, round(height * self.input_scale)))
+        if self._scaled is None or self._scaled.shape[1::-1] != size:
+            self._scaled = np.empty((size[1], size[0], 3), dtype=frame.dtype)
+        return cv2.resize(frame, size, dst=self._scaled, interpolation=cv2.INTER_AREA)
+
+    def _apply_quality(self, setting, now):
+        """Governor ka (scale, complexity) do frames ke beech lagata hai."""
+        scale, complexity = setting
+        if complexity != getattr(self.pose, "model_complexity", complexity):
+            try:
+                self.pose.set_model_complexity(complexity)
+            except Exception:
+                # Model load nahi hua (e.g. download blocked); governor neeche wapas jaata hai
+                self._apply_quality(self.governor.reject(now), now)
+                return
+        self.input_scale = scale
+
+    def _smooth(self, t, landmarks):
+        # Angles se pehle jitter hatayein (model ka raw output extrapolator/history mein rehta hai)
+        return self._smoother(t, landmarks)
+
+    def _consumer_returned(self):
+        self._returned_at = time.perf_counter()
+
+    def _consumer_called(self):
+        # Caller ne pichle packet par kitna kaam kiya (logic, draw, UI)
+        if self._returned_at is not None:
+            self._consumer_ms = (time.perf_counter() - self._returned_at) * 1000.0
+
+    def _process_frame(self, frame, captured_at, capture_ms):
+        started = time.perf_counter()
+        self._seq += 1
+        # Idle/khaali frame par model skip karein aur pichla result reuse karein
+        if self._last_results is not None and self.gate is not None and not self.gate.should_infer(frame, captured_at):
+            landmarks = self._smooth(captured_at, self._last_landmarks)
+            inference_ms = (time.perf_counter() - started) * 1000.0
+            return FramePacket(self._seq, frame, self._last_results, landmarks, captured_at,
+                               time.time(), capture_ms, inference_ms, inferred=False,
+                               raw_landmarks=self._last_landmarks, landmarks_at=self._last_landmarks_at)
+
+        # Stride mode: beech ke frames ke landmarks history se extrapolate hote hain
+        if self._extrapolator is not None and self._last_results is not None and self._since_inference + 1 < self.stride:
+            self._since_inference += 1
+            landmarks = self._extrapolator.predict(captured_at)
+            extrapolated = landmarks is not None
+            landmarks = self._smooth(captured_at, landmarks)
+            inference_ms = (time.perf_counter() - started) * 1000.0
+            return FramePacket(self._seq, frame, self._last_results, landmarks, captured_at, time.time(),
+                               capture_ms, inference_ms, inferred=False, extrapolated=extrapolated)
+        self._since_inference = 0
+
+        if self._pending_quality is not None:
+            setting, self._pending_quality = self._pending_quality, None
+            self._apply_quality(setting, captured_at)
+
+        # Preallocated buffer mein convert karein, har frame naya array nahi
+        model_input = self._model_input(frame)
+        image_rgb = cv2.cvtColor(model_input, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer(model_input))
+        image_rgb.flags.writeable = False
+        results = self.pose.process(image_rgb, captured_at=captured_at) # Model yahaan run ho raha hai
+        image_rgb.flags.writeable = True
+        # Async backend (Tasks LIVE_STREAM) pichle frame ka result deta hai: landmarks usi frame ke time ke hain
+        landmarks_at = getattr(results, "captured_at", None)
+        if landmarks_at is None:
+            landmarks_at = captured_at
+        fresh = landmarks_at != self._last_landmarks_at
+        if fresh:
+            # Har packet ka apna array (threaded mode mein UI pichla packet abhi use kar raha ho sakta hai)
+            raw_landmarks = landmarks_to_array(results.pose_landmarks)
+            self._last_results = results
+            self._last_landmarks = raw_landmarks
+            self._last_landmarks_at = landmarks_at
+            if self._extrapolator is not None:
+                self._extrapolator.update(landmarks_at, raw_landmarks)
+            # Worker thread mein hi record: jo packets UI tak nahi pahunchte unka model output bhi
+            recorder = self.recorder
+            if recorder is not None:
+                recorder.write(landmarks_at, raw_landmarks)
+        else:
+            raw_landmarks = self._last_landmarks
+        landmarks = self._smooth(landmarks_at, raw_landmarks)
+        if self.gate is not None:
+            self.gate.update_presence(results)
+        inference_ms = (time.perf_counter() - started) * 1000.0
+
+        # Wahi async result dobara aaya to model ke baare mein kuch naya nahi pata
+        if self.governor is not None and fresh:
+            if self._overlapped:
+                work_ms = max(inference_ms, self._consumer_ms)
+            else:
+                work_ms = inference_ms + self._consumer_ms
+            model_ms = getattr(results, "inference_ms", None)
+            if model_ms is not None:
+                # Async model apne thread par chalta hai; submit ka time uski latency nahi hai
+                work_ms = max(work_ms, model_ms)
+            # Naya level agle frame se lagta hai
+            self._pending_quality = self.governor.observe(work_ms, captured_at)
+        # Drawing original BGR capture buffer par hi hoti hai (RGB -> BGR copy ki zaroorat nahi)
+        return FramePacket(self._seq, frame, results, landmarks, captured_at, time.time(), capture_ms, inference_ms,
+                           raw_landmarks=raw_landmarks, landmarks_at=landmarks_at)
+
+    @property
+    def quality(self):
+        """(input_scale, model_complexity) currently used for inference."""
+        return self.input_scale, getattr(self.pose, "model_complexity", None)
+
+    @property
+    def skipped_inferences(self):
+        return self.gate.skipped if self.gate is not None else 0
+
+    @property
+    def dropped_frames(self):
+        return 0
+
+    def start(self):
+        return self
+
+    def stop(self):
+        """Stops the pipeline; True once nothing can call the Pose anymore."""
+        self.recorder = None
+        return True
+
+
+class InlinePipeline(_BasePipeline):
+    """
+    Capture aur inference dono caller ke thread par, ek ke baad ek (purana behaviour).
+    The capture buffer is reused: the caller is done with the previous frame
+    before asking for the next one.
+    """
+
+    def __init__(self, cap, pose, gate=None, governor=None, stride=1, smoothing=False, recorder=None):
+        super().__init__(cap, pose, gate, governor, stride, smoothing, recorder)
+        self._frame = None
+
+    def next_packet(self, timeout=None):
+        self._consumer_called()
+        started = time.perf_counter()
+        ret, frame = self.cap.read(self._frame)
+        if not ret:
+            return None
+        self._frame = frame
+        capture_ms = (time.perf_counter() - started) * 1000.0
+        packet = self._process_frame(frame, time.time(), capture_ms)
+        self._consumer_returned()
+        return packet
+
+
+class ThreadedPipeline(_BasePipeline):
+    """
+    Capture thread -> inference worker -> UI thread.
+    Each hand-off keeps only the newest item, so a slow consumer drops stale
+    frames instead of letting them pile up in the camera buffer.
+    Capture frames are not reused here since the UI may still be drawing on
+    one while the next is read; only the RGB model buffer is shared.
+    """
+
+    _overlapped = True
+
+    def __init__(self, cap, pose, gate=None, governor=None, stride=1, smoothing=False, recorder=None):
+        super().__init__(cap, pose, gate, governor, stride, smoothing, recorder)
+        self._frames = LatestSlot()
+        self._packets = LatestSlot()
+        self._running = threading.Event()
+        self._capture_done = threading.Event()
+        self._worker_done = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self._running.set()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="coach-capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="coach-inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def _capture_loop(self):
+        try:
+            while self._running.is_set():
+                started = time.perf_counter()
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                capture_ms = (time.perf_counter() - started) * 1000.0
+                self._frames.put((frame, time.time(), capture_ms))
+        finally:
+            self._capture_done.set()
+            self._frames.wake()
+
+    def _inference_loop(self):
+        try:
+            while self._running.is_set():
+                item = self._frames.take(timeout=0.5)
+                if item is None:
+                    if self._capture_done.is_set():
+                        break
+                    continue
+                self._packets.put(self._process_frame(*item))
+        finally:
+            self._worker_done.set()
+            self._packets.wake()
+
+    def next_packet(self, timeout=None):
+        """
+        Returns the newest processed frame, or None once capture has ended.
+        Waits at most 'timeout' seconds per attempt while the worker is alive.
+        """
+        self._consumer_called()
+        while True:
+            packet = self._packets.take(timeout=0.5 if timeout is None else timeout)
+            if packet is not None:
+                self._consumer_returned()
+                return packet
+            if self._worker_done.is_set() or not self._running.is_set():
+                return None
+            if timeout is not None:
+                return None
+
+    @property
+    def dropped_frames(self):
+        return self._frames.dropped + self._packets.dropped
+
+    def stop(self):
+        # Atka hua worker stop ke baad band recorder par na likhe
+        self.recorder = None
+        self._running.clear()
+        self._frames.wake()
+        self._packets.wake()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        # Slow process()/model reload mein atka thread abhi bhi Pose use kar sakta hai
+        stopped = not any(thread.is_alive() for thread in self._threads)
+        self._threads = []
+        return stopped
+
+
+def create_pipeline(cap, pose, threaded=False, idle_gating=False, governor=None, stride=1, smoothing=False,
+                    recorder=None):
+    """
+    Webcam capture ke liye pipeline banata hai (threaded ya inline), optional
+    idle gating, adaptive quality governor, inference stride aur landmark
+    smoothing ke saath. 'recorder' (LandmarkRecorder) gets every new model
+    output with the capture time of its frame, written by the thread that
+    runs the model.
+    """
+    gate = MotionGate() if idle_gating else None
+    pipeline_class = ThreadedPipeline if threaded else InlinePipeline
+    pipeline = pipeline_class(cap, pose, gate, governor, stride, smoothing, recorder)
+    if governor is None:
+        # Governor ke bina default quality; pooled Pose par pichle session ki setting na rahe
+        scale, complexity = QUALITY_LEVELS[DEFAULT_LEVEL]
+        if getattr(pose, "model_complexity", complexity) != complexity:
+            pose.set_model_complexity(complexity)
+        pipeline.input_scale = scale
+    return pipeline
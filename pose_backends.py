@@ -0,0 +1,192 @@
+"""
+Pose model backends behind one interface.
+
+Every backend has process(image_rgb) -> result with a 'pose_landmarks'
+attribute (a NormalizedLandmarkList, or None), plus reset(), close() and
+set_model_complexity(), so the pipeline, the Pose pool and the benchmark do
+not care which one runs.
+
+    solutions   legacy mp.solutions.pose.Pose, synchronous
+    tasks       MediaPipe Tasks PoseLandmarker (.task bundle in models/)
+
+The Tasks backend runs in LIVE_STREAM mode by default: process() hands the
+frame to detect_async() and returns the newest result the landmarker has
+delivered so far, so the model runs on MediaPipe's own thread while the
+caller keeps capturing and rendering. The landmarks shown can lag the frame
+by about one inference; each result carries the capture time of the frame
+it belongs to and the model latency measured in the result callback.
+"""
+import os
+import threading
+import time
+
+# mediapipe classes ke andar lazily import hota hai, taaki benchmark/CLI iske bina bhi chal sakein
+BACKENDS = ("solutions", "tasks")
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+# model_complexity 0/1/2 -> Tasks bundle (setup.sh downloads the lite one)
+TASK_MODEL_FILES = {
+    0: "pose_landmarker_lite.task",
+    1: "pose_landmarker_full.task",
+    2: "pose_landmarker_heavy.task",
+}
+
+
+class PoseResult:
+    """
+    Same shape as the legacy solution output: 'pose_landmarks' is what gets
+    drawn. Async results also say which frame they belong to: 'captured_at'
+    is the capture time given to process() for that frame and 'inference_ms'
+    the model latency from submit to callback. Both are None for synchronous
+    results, which belong to the frame just passed in.
+    """
+    __slots__ = ("pose_landmarks", "captured_at", "inference_ms")
+
+    def __init__(self, pose_landmarks=None, captured_at=None, inference_ms=None):
+        self.pose_landmarks = pose_landmarks
+        self.captured_at = captured_at
+        self.inference_ms = inference_ms
+
+
+class SolutionsPoseBackend:
+    name = "solutions"
+
+    def __init__(self, model_complexity=0, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+        import mediapipe as mp
+        self.model_complexity = model_complexity
+        self._confidence = (min_detection_confidence, min_tracking_confidence)
+        self._pose = mp.solutions.pose.Pose(
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+
+    def process(self, image_rgb, captured_at=None):
+        return self._pose.process(image_rgb)
+
+    def set_model_complexity(self, model_complexity):
+        # Naya graph pehle banta hai; fail ho to purana chalta rehta hai
+        import mediapipe as mp
+        pose = mp.solutions.pose.Pose(
+            model_complexity=model_complexity,
+            min_detection_confidence=self._confidence[0],
+            min_tracking_confidence=self._confidence[1]
+        )
+        self._pose.close()
+        self._pose = pose
+        self.model_complexity = model_complexity
+
+    def reset(self):
+        self._pose.reset()
+
+    def close(self):
+        self._pose.close()
+
+
+class TasksPoseBackend:
+    """
+    PoseLandmarker wrapper. With 'live_stream' False it runs synchronously in
+    VIDEO mode (same model, used by the benchmark to time inference itself).
+    """
+    name = "tasks"
+
+    def __init__(self, model_complexity=0, model_path=None, live_stream=True,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5):
+        import mediapipe as mp
+        self._mp = mp
+        self.model_complexity = model_complexity
+        self.model_path = model_path or os.path.join(MODELS_DIR, TASK_MODEL_FILES[model_complexity])
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"PoseLandmarker model not found: {self.model_path}")
+        self.live_stream = live_stream
+        self._confidence = (min_detection_confidence, min_tracking_confidence)
+        self._lock = threading.Lock()
+        self._landmarker = None
+        self._open()
+
+    def _open(self):
+        mp = self._mp
+        vision = mp.tasks.vision
+        options = vision.PoseLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=self.model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM if self.live_stream else vision.RunningMode.VIDEO,
+            num_poses=1,
+            min_pose_detection_confidence=self._confidence[0],
+            min_tracking_confidence=self._confidence[1],
+            result_callback=self._on_result if self.live_stream else None,
+        )
+        self._landmarker = vision.PoseLandmarker.create_from_options(options)
+        self._last_ts = -1
+        self._submitted = {} # timestamp_ms -> (captured_at, submit perf_counter)
+        self._latest = PoseResult()
+
+    def _timestamp_ms(self):
+        # Tasks API ko har frame par strictly badhta hua timestamp chahiye
+        ts = max(int(time.perf_counter() * 1000), self._last_ts + 1)
+        self._last_ts = ts
+        return ts
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        done = time.perf_counter()
+        with self._lock:
+            captured_at, submitted = self._submitted.pop(timestamp_ms, (None, done))
+            # Busy landmarker ke drop kiye frames ka callback kabhi nahi aata
+            for ts in [ts for ts in self._submitted if ts < timestamp_ms]:
+                del self._submitted[ts]
+        latest = _to_result(result, captured_at, (done - submitted) * 1000.0)
+        with self._lock:
+            self._latest = latest
+
+    def process(self, image_rgb, captured_at=None):
+        """
+        VIDEO mode: the result for this frame. LIVE_STREAM: submits the frame
+        and returns the newest result so far, which belongs to an earlier
+        frame (see PoseResult.captured_at).
+        """
+        image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=image_rgb)
+        timestamp_ms = self._timestamp_ms()
+        if not self.live_stream:
+            return _to_result(self._landmarker.detect_for_video(image, timestamp_ms))
+        with self._lock:
+            self._submitted[timestamp_ms] = (time.time() if captured_at is None else captured_at, time.perf_counter())
+        self._landmarker.detect_async(image, timestamp_ms)
+        with self._lock:
+            return self._latest
+
+    def set_model_complexity(self, model_complexity):
+        model_path = os.path.join(MODELS_DIR, TASK_MODEL_FILES[model_complexity])
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"PoseLandmarker model not found: {model_path}")
+        self.close()
+        self.model_path = model_path
+        self.model_complexity = model_complexity
+        self._open()
+
+    def reset(self):
+        # PoseLandmarker mein reset() nahi hai; naya graph hi tracking state saaf karta hai
+        self.close()
+        self._open()
+
+    def close(self):
+        if self._landmarker is not None:
+            self._landmarker.close()
+            self._landmarker = None
+
+
+def _to_result(result, captured_at=None, inference_ms=None):
+    """Tasks PoseLandmarkerResult -> PoseResult with a NormalizedLandmarkList (drawable)."""
+    if not result.pose_landmarks:
+        return PoseResult(None, captured_at, inference_ms)
+    from mediapipe.framework.formats import landmark_pb2
+    proto = landmark_pb2.NormalizedLandmarkList()
+    for lm in result.pose_landmarks[0]:
+        proto.landmark.add(x=lm.x, y=lm.y, z=lm.z, visibility=lm.visibility or 0.0)
+    return PoseResult(proto, captured_at, inference_ms)
+
+
+def create_pose_backend(name="solutions", model_complexity=0, **kwargs):
+    if name == "solutions":
+        return SolutionsPoseBackend(model_complexity, **kwargs)
+    if name == "tasks":
+        return TasksPoseBackend(model_complexity, **kwargs)
+    raise ValueError(f"Unknown pose backend: {name} (choose from {', '.join(BACKENDS)})")
@@ -0,0 +1,159 @@
+import collections
+import threading
+
+# Slot mil gaya par Pose abhi bana nahi (waiter khud banayega)
+_Pending = object()
+
+
+class PoolFull(Exception):
+    """Raised when the pool and its waiting queue are both full."""
+
+
+class PoseTicket:
+    """
+    A place in the PosePool queue. wait() returns the checked-out Pose once
+    this ticket reaches the front and an instance is free. cancel() leaves
+    the queue (or hands back the Pose if it was already granted).
+    """
+
+    def __init__(self, pool):
+        self._pool = pool
+        self.pose = None
+        self.cancelled = False
+
+    @property
+    def position(self):
+        """1-based place in the queue, 0 once a Pose has been granted."""
+        return self._pool._position(self)
+
+    def wait(self, timeout=None):
+        return self._pool._wait(self, timeout)
+
+    def cancel(self):
+        self._pool._cancel(self)
+
+
+class PosePool:
+    """
+    Bounded pool of Pose instances shared by all sessions of one server.
+    Each webcam session checks out its own instance, so MediaPipe tracking
+    state is never mixed between trainees and 'process' is never called
+    concurrently on one graph. At most 'size' instances are created (lazily,
+    since each one loads the model); up to 'max_waiting' sessions can queue
+    in FIFO order behind them, anyone beyond that is turned away.
+    Released instances go back at 'model_complexity', whatever a quality
+    governor switched them to during the session.
+    """
+
+    def __init__(self, factory, size, max_waiting=0, initial=(), model_complexity=0):
+        self._factory = factory
+        self.model_complexity = model_complexity
+        self.size = max(1, size)
+        self.max_waiting = max_waiting
+        self._cond = threading.Condition()
+        self._idle = collections.deque(initial)
+        self._created = len(self._idle)
+        self._in_use = 0
+        self._queue = collections.deque()
+
+    def enqueue(self):
+        """Joins the queue; raises PoolFull if 'max_waiting' sessions are already waiting."""
+        with self._cond:
+            if len(self._queue) >= self.max_waiting and not self._has_capacity():
+                raise PoolFull(f"{self.size} active, {len(self._queue)} waiting")
+            ticket = PoseTicket(self)
+            self._queue.append(ticket)
+            self._grant()
+            return ticket
+
+    def release(self, pose):
+        """Returns a checked-out Pose; its tracking state and model complexity are reset for the next session."""
+        try:
+            if getattr(pose, "model_complexity", self.model_complexity) != self.model_complexity:
+                pose.set_model_complexity(self.model_complexity)
+            pose.reset()
+        except Exception:
+            # Kharab instance pool mein wapas na jaye, agla session naya banayega
+            self.discard(pose)
+            return
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append(pose)
+            self._grant()
+
+    def discard(self, pose):
+        """
+        Gives up a checked-out Pose without reusing it, e.g. when a worker
+        thread could not be stopped and may still be calling it. Its slot is
+        freed; a new instance is created for a later session.
+        """
+        with self._cond:
+            self._in_use -= 1
+            self._created -= 1
+            self._grant()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "waiting": len(self._queue),
+            }
+
+    def _has_capacity(self):
+        return bool(self._idle) or self._created < self.size
+
+    def _grant(self):
+        # Queue ke aage wale tickets ko free instance milta hai (FIFO)
+        while self._queue and self._has_capacity():
+            ticket = self._queue.popleft()
+            if self._idle:
+                ticket.pose = self._idle.popleft()
+            else:
+                ticket.pose = _Pending
+                self._created += 1
+            self._in_use += 1
+        self._cond.notify_all()
+
+    def _wait(self, ticket, timeout):
+        with self._cond:
+            self._cond.wait_for(lambda: ticket.pose is not None or ticket.cancelled, timeout)
+            pose = ticket.pose
+        if pose is _Pending:
+            # Model load lock ke bahar hota hai, doosre sessions ruke nahi
+            try:
+                pose = self._factory()
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._in_use -= 1
+                    ticket.pose = None
+                    self._grant()
+                raise
+            ticket.pose = pose
+        return pose
+
+    def _position(self, ticket):
+        with self._cond:
+            if ticket.pose is not None:
+                return 0
+            try:
+                return self._queue.index(ticket) + 1
+            except ValueError:
+                return 0
+
+    def _cancel(self, ticket):
+        with self._cond:
+            ticket.cancelled = True
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                return
+            pose, ticket.pose = ticket.pose, None
+        if pose is _Pending:
+            with self._cond:
+                self._created -= 1
+                self._in_use -= 1
+                self._grant()
+        elif pose is not None:
+            self.release(pose)
@@ -0,0 +1,203 @@
+"""
+Compact landmark recordings of live sessions, and deterministic replay.
+
+File layout (little-endian):
+    8 bytes   magic b"AFCLMK01"
+    uint32    header size in bytes (multiple of 16)
+    uint32    metadata JSON length
+    ...       metadata JSON (exercise, side, target_reps, ...), zero padded
+    records   RECORD_DTYPE rows, one per frame, until end of file
+
+Records are fixed size, so the file can be memory-mapped with numpy and
+replayed without a camera or MediaPipe:
+
+    python recording.py info recordings/session.lmk
+    python recording.py replay recordings/session.lmk
+    python recording.py replay recordings/session.lmk --stride 3   # stride mode vs full rate
+    python recording.py replay recordings/session.lmk --smooth     # One-Euro smoothed vs raw
+
+The stride/smooth comparison needs the raw model output of every frame, so
+it only runs on recordings whose metadata says raw, stride 1.
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+from exercises import get_exercise
+from landmark_filters import extrapolate_stride, smooth_stack
+from rep_counter import count_reps
+from utils import NUM_POSE_LANDMARKS, calculate_angles
+
+MAGIC = b"AFCLMK01"
+_PREFIX = struct.Struct("<8sII")
+
+RECORD_DTYPE = np.dtype([
+    ("t", "<f8"),            # capture time (seconds, time.time())
+    ("present", "u1"),       # 0 = is frame mein pose detect nahi hua
+    ("_pad", "V7"),
+    ("landmarks", "<f4", (NUM_POSE_LANDMARKS, 4)),
+])
+
+
+class LandmarkRecorder:
+    """Appends one record per frame; usable as a context manager."""
+
+    def __init__(self, path, metadata=None):
+        meta = json.dumps(metadata or {}).encode("utf-8")
+        header_size = -(-(_PREFIX.size + len(meta)) // 16) * 16
+        self.path = path
+        self.frames = 0
+        self._file = open(path, "wb")
+        self._file.write(_PREFIX.pack(MAGIC, header_size, len(meta)))
+        self._file.write(meta.ljust(header_size - _PREFIX.size, b"\0"))
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)
+
+    def write(self, t, landmarks):
+        """'landmarks' is a (33, 4) array, or None when no pose was found."""
+        record = self._record[0]
+        record["t"] = t
+        if landmarks is None:
+            record["present"] = 0
+            record["landmarks"] = 0
+        else:
+            record["present"] = 1
+            record["landmarks"] = landmarks
+        self._file.write(self._record.tobytes())
+        self.frames += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_recording(path):
+    """
+    Returns (metadata, records) where 'records' is a read-only memory-mapped
+    RECORD_DTYPE array. A partially written last record is ignored.
+    """
+    with open(path, "rb") as f:
+        magic, header_size, meta_len = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a landmark recording")
+        metadata = json.loads(f.read(meta_len) or b"{}")
+    count = (os.path.getsize(path) - header_size) // RECORD_DTYPE.itemsize
+    if count <= 0:
+        return metadata, np.zeros(0, dtype=RECORD_DTYPE)
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=header_size, shape=(count,))
+    return metadata, records
+
+
+class ReplaySource:
+    """
+    Iterates a recording frame by frame as (t, landmarks) pairs, with
+    landmarks None for frames without a pose. Same order every run.
+    """
+
+    def __init__(self, path):
+        self.metadata, self.records = open_recording(path)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        present = self.records["present"]
+        landmarks = self.records["landmarks"]
+        times = self.records["t"]
+        for i in range(len(self.records)):
+            yield times[i], (landmarks[i] if present[i] else None)
+
+
+def is_raw_capture(metadata):
+    """True if the recording holds unprocessed model output for every frame (raw, stride 1)."""
+    return bool(metadata.get("raw")) and metadata.get("stride", 1) == 1
+
+
+def replay_counts(path, exercise_name=None, side=None, cap_at_target=True, stride=1, smooth=False):
+    """
+    Replays a recording through a fresh RepCounter. Exercise and side default
+    to the recording's metadata; with 'cap_at_target' the recorded target
+    reps end the set just like the live loop. With 'stride' > 1 only every
+    stride-th frame is kept and the rest are extrapolated, like the live
+    stride mode; 'smooth' runs the One-Euro filter first. Both raise
+    ValueError unless the recording is a raw capture (is_raw_capture). All
+    angles are computed in one vectorized call over the whole stack. Returns
+    the finished counter.
+    """
+    metadata, records = open_recording(path)
+    if (stride > 1 or smooth) and not is_raw_capture(metadata):
+        # Pehle se smoothed/extrapolated data par dobara processing ka comparison bekaar hai
+        raise ValueError(f"{path} is not a raw stride-1 recording (stride={metadata.get('stride')}, "
+                         f"raw={metadata.get('raw', False)}); stride/smooth replay needs one")
+    exercise = get_exercise(exercise_name or metadata["exercise"])
+    landmarks, present = records["landmarks"], records["present"]
+    if stride > 1:
+        landmarks, present = extrapolate_stride(records["t"], landmarks, present, stride)
+    if smooth:
+        landmarks = smooth_stack(records["t"], landmarks, present)
+    angles = calculate_angles(landmarks, exercise.joint_triples)
+    return count_reps(
+        exercise,
+        side or metadata.get("side", "Both"),
+        angles[np.flatnonzero(present)],
+        target_reps=metadata.get("target_reps") if cap_at_target else None,
+        set_number=metadata.get("set_number", 1),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or replay landmark recordings.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="Show recording metadata and size")
+    info.add_argument("path")
+    replay = sub.add_parser("replay", help="Replay through the rep counter")
+    replay.add_argument("path")
+    replay.add_argument("--exercise", help="Override the recorded exercise")
+    replay.add_argument("--side", choices=("Left", "Right", "Both"), help="Override the recorded side")
+    replay.add_argument("--no-target", action="store_true", help="Count past the recorded target reps")
+    replay.add_argument("--stride", type=int, default=1, help="Simulate inference on every Nth frame only")
+    replay.add_argument("--smooth", action="store_true", help="Apply One-Euro smoothing (stride/smooth run only)")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        metadata, records = open_recording(args.path)
+        span = float(records["t"][-1] - records["t"][0]) if len(records) > 1 else 0.0
+        print(json.dumps(metadata, indent=2))
+        print(f"frames: {len(records)}  with pose: {int(records['present'].sum())}  span: {span:.1f}s  "
+              f"size: {os.path.getsize(args.path) / 1024:.1f} KiB")
+        return 0
+
+    compare = args.stride > 1 or args.smooth
+    if compare and not is_raw_capture(open_recording(args.path)[0]):
+        print(f"{args.path}: not a raw stride-1 recording, cannot compare --stride/--smooth against it. "
+              "Record a session at stride 1 with this version of the app.", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    counter = replay_counts(args.path, args.exercise, args.side, cap_at_target=not args.no_target)
+    elapsed = time.perf_counter() - started
+    frames = len(open_recording(args.path)[1])
+    print(f"reps left: {counter.reps_left}  right: {counter.reps_right}  feedback: {counter.feedback!r}")
+    print(f"{frames} frames in {elapsed * 1000:.1f} ms ({frames / max(elapsed, 1e-9):.0f} fps)")
+    if compare:
+        strided = replay_counts(args.path, args.exercise, args.side, cap_at_target=not args.no_target,
+                                stride=args.stride, smooth=args.smooth)
+        match = (strided.reps_left, strided.reps_right) == (counter.reps_left, counter.reps_right)
+        label = f"stride {args.stride}" + (" + smoothing" if args.smooth else "")
+        print(f"{label}: reps left: {strided.reps_left}  right: {strided.reps_right}  "
+              f"({'matches' if match else 'DIFFERS from'} full rate)")
+        return 0 if match else 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+from collections import namedtuple
+
+EVENT_REP = "rep"
+EVENT_READY = "ready"
+EVENT_ASYMMETRY = "asymmetry"
+EVENT_GO_LOWER = "go_lower"
+EVENT_SET_COMPLETE = "set_complete"
+
+RepEvent = namedtuple("RepEvent", ["kind", "message"])
+
+
+class RepCounter:
+    """
+    Rep/stage state machine for one set, independent of Streamlit.
+    Feed it the (left, right) joint angles of every frame with update();
+    it returns a RepEvent when something happened, otherwise None.
+    'version' badhta hai jab bhi koi state change hoti hai, taaki caller
+    sirf tabhi session state sync kare.
+    """
+    __slots__ = (
+        "side", "target_reps", "set_number",
+        "up_threshold", "down_threshold", "stage_check", "depth_cue",
+        "reps_left", "reps_right", "stage_left", "stage_right", "stage",
+        "feedback", "complete_announced", "version",
+    )
+
+    def __init__(self, exercise, side, target_reps=None, set_number=1, feedback=""):
+        self.side = side
+        self.target_reps = target_reps # None = koi target nahi (offline scoring)
+        self.set_number = set_number
+        self.up_threshold = exercise.up_threshold
+        self.down_threshold = exercise.down_threshold
+        self.stage_check = exercise.stage_check
+        self.depth_cue = exercise.depth_cue
+        self.reps_left = 0
+        self.reps_right = 0
+        self.stage_left = exercise.start_stage
+        self.stage_right = exercise.start_stage
+        self.stage = exercise.start_stage
+        self.feedback = feedback
+        self.complete_announced = False
+        self.version = 0
+
+    def restore(self, reps_left, reps_right, stage_left, stage_right, stage, feedback, complete_announced):
+        """Resumes a set that was already in progress (e.g. after a Streamlit rerun)."""
+        self.reps_left = reps_left
+        self.reps_right = reps_right
+        self.stage_left = stage_left
+        self.stage_right = stage_right
+        self.stage = stage
+        self.feedback = feedback
+        self.complete_announced = complete_announced
+        self.version += 1
+        return self
+
+    def set_feedback(self, message):
+        if message != self.feedback:
+            self.feedback = message
+            self.version += 1
+
+    def announce_complete(self):
+        """Marks the completion message as spoken; True only the first time."""
+        if self.complete_announced:
+            return False
+        self.complete_announced = True
+        self.version += 1
+        return True
+
+    def is_complete(self):
+        if self.target_reps is None:
+            return False
+        if self.side == 'Left':
+            return self.reps_left >= self.target_reps
+        if self.side == 'Right':
+            return self.reps_right >= self.target_reps
+        return self.reps_left >= self.target_reps and self.reps_right >= self.target_reps
+
+    def update(self, angles):
+        """
+        Processes one frame. 'angles' is a (2,) sequence of left/right joint
+        angles in degrees. Returns the RepEvent for this frame or None.
+        """
+        angle_l, angle_r = angles[0], angles[1]
+        up_threshold = self.up_threshold
+        down_threshold = self.down_threshold
+        stage_check = self.stage_check
+        next_stage = 'down' if stage_check == 'up' else 'up'
+        event = None
+
+        if self.is_complete():
+            message = f"Set {self.set_number} Complete! Stop webcam to save."
+            if self.announce_complete(): # Sirf ek baar bolo
+                event = RepEvent(EVENT_SET_COMPLETE, message)
+            self.set_feedback(message)
+            return event
+
+        if self.side == 'Left':
+            if angle_l < down_threshold and self.stage_left == stage_check:
+                self.stage_left = next_stage
+                self.reps_left += 1
+                event = RepEvent(EVENT_REP, f'Rep {self.reps_left}!')
+            elif angle_l > up_threshold and self.stage_left != stage_check:
+                self.stage_left = stage_check
+                event = RepEvent(EVENT_READY, 'Ready')
+
+        elif self.side == 'Right':
+            if angle_r < down_threshold and self.stage_right == stage_check:
+                self.stage_right = next_stage
+                self.reps_right += 1
+                event = RepEvent(EVENT_REP, f'Rep {self.reps_right}!')
+            elif angle_r > up_threshold and self.stage_right != stage_check:
+                self.stage_right = stage_check
+                event = RepEvent(EVENT_READY, 'Ready')
+
+        elif self.side == 'Both':
+            stage_l_reached = angle_l < down_threshold
+            stage_r_reached = angle_r < down_threshold
+
+            if stage_l_reached and stage_r_reached and self.stage == stage_check:
+                self.stage = next_stage
+                self.reps_left += 1
+                self.reps_right += 1
+                event = RepEvent(EVENT_REP, f'Rep {self.reps_left}!')
+            elif angle_l > up_threshold and angle_r > up_threshold and self.stage != stage_check:
+                self.stage = stage_check
+                event = RepEvent(EVENT_READY, 'Ready for next rep')
+            elif stage_l_reached and not stage_r_reached and self.stage == stage_check:
+                event = RepEvent(EVENT_ASYMMETRY, 'ERROR: Move right side too!')
+            elif not stage_l_reached and stage_r_reached and self.stage == stage_check:
+                event = RepEvent(EVENT_ASYMMETRY, 'ERROR: Move left side too!')
+
+            if (self.depth_cue and stage_check == 'up' and self.stage == 'up' and
+                    (down_threshold < angle_l < up_threshold or down_threshold < angle_r < up_threshold)):
+                event = RepEvent(EVENT_GO_LOWER, 'Go lower!')
+
+        if event is not None:
+            if event.kind in (EVENT_REP, EVENT_READY):
+                self.version += 1
+            self.set_feedback(event.message)
+        return event
+
+
+def count_reps(exercise, side, angle_frames, target_reps=None, set_number=1):
+    """
+    Runs a fresh RepCounter over a (frames, 2) sequence of left/right angles.
+    Rows that are None (no pose in that frame) are skipped.
+    Returns the finished counter.
+    """
+    counter = RepCounter(exercise, side, target_reps=target_reps, set_number=set_number)
+    for angles in angle_frames:
+        if angles is not None:
+            counter.update(angles)
+    return counter
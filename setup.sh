@@ -12,5 +12,9 @@ curl -L -o ./models/pose_landmark_lite.tflite "$MODEL_URL"
 cp ./models/pose_landmark_lite.tflite ~/.mediapipe/modules/pose_landmark/ 2>/dev/null || true
 cp ./models/pose_landmark_lite.tflite /tmp/mediapipe/modules/pose_landmark/ 2>/dev/null || true
 
+# PoseLandmarker bundle for the Tasks backend (POSE_BACKEND=tasks)
+TASK_MODEL_URL="https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_lite/float16/latest/pose_landmarker_lite.task"
+curl -L -o ./models/pose_landmarker_lite.task "$TASK_MODEL_URL"
+
 echo "✅ Model downloaded to ./models and cache paths."
 
@@ -0,0 +1,115 @@
+"""
+Voice assistant: one persistent browser speech component per session.
+
+safe_speak() no longer mounts a new iframe per utterance. Utterances go into
+a SpeechChannel (kept in session state). One speech component
+(frontend/speech) is rendered once per run under a stable key and stays
+mounted; new utterances reach it through a hidden feed (component_feed).
+The component keeps its voices loaded and speaks each utterance once.
+
+The channel debounces and coalesces rapid feedback, so "Rep 3!", "Rep 4!"
+arriving within the debounce window become just "Rep 4!". An interrupting
+utterance skips the debounce, replaces anything pending and cuts off what
+the browser is currently saying.
+"""
+import itertools
+import os
+import time
+import uuid
+
+from component_feed import push_feed
+
+SPEECH_COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "speech")
+SPEECH_FEED = "speech"
+_speech_component = None
+
+
+class SpeechChannel:
+    """
+    Server-side speech queue. say() adds an utterance; drain(now) moves it
+    to the outbox once it is due and returns True, feed(now) is the payload
+    for the speech component's feed.
+      - a normal utterance waits 'debounce_s' for a newer one to replace it
+        (but never longer than 'max_delay_s' in total);
+      - an interrupting one is due immediately and drops the pending one;
+      - the same text as the last delivered utterance within 'repeat_s' is
+        ignored.
+    The last 'history' delivered utterances are in every feed, so a feed
+    replaced before the browser read it loses nothing. Ids are unique per
+    channel ('token'); the browser keeps the last spoken id per token in
+    sessionStorage, so nothing is spoken twice, even from several feeds or
+    after the iframe remounts.
+    """
+
+    def __init__(self, debounce_s=0.35, max_delay_s=1.0, repeat_s=2.0, history=4):
+        self.debounce_s = debounce_s
+        self.max_delay_s = max_delay_s
+        self.repeat_s = repeat_s
+        self.history = history
+        self.coalesced = 0
+        self._ids = itertools.count(1)
+        self._pending = None
+        self._pending_since = 0.0
+        self._pending_at = 0.0
+        self.token = uuid.uuid4().hex[:12]
+        self._outbox = []
+
+    def say(self, text, lang="", voice="", interrupt=False, now=None):
+        text = (text or "").strip()
+        if not text:
+            return
+        now = time.time() if now is None else now
+        last = self._outbox[-1] if self._outbox else None
+        if not interrupt and last is not None and last["text"] == text and now - last["at"] < self.repeat_s:
+            return
+        if self._pending is not None:
+            if self._pending["interrupt"] and not interrupt:
+                # Zaroori message ko normal feedback replace nahi karta
+                return
+            self.coalesced += 1
+        else:
+            self._pending_since = now
+        self._pending = {"text": text, "lang": lang, "voice": voice, "interrupt": interrupt}
+        self._pending_at = now
+
+    def due(self, now):
+        if self._pending is None:
+            return False
+        if self._pending["interrupt"]:
+            return True
+        return (now - self._pending_at >= self.debounce_s
+                or now - self._pending_since >= self.max_delay_s)
+
+    def drain(self, now, force=False):
+        """
+        Moves the pending utterance to the outbox when it is due ('force'
+        skips the debounce, e.g. at the start or end of a run). Returns True
+        if something new was added.
+        """
+        if not (self.due(now) or (force and self._pending is not None)):
+            return False
+        item = dict(self._pending, id=next(self._ids), at=now)
+        self._pending = None
+        self._outbox = (self._outbox + [item])[-self.history:]
+        return True
+
+    def feed(self, now):
+        return {"token": self.token, "utterances": self._outbox, "now": now}
+
+
+def speech_component(key="speech"):
+    """
+    Zero-height component that speaks the utterances pushed with
+    push_speech() through the browser's speechSynthesis. Render it once per
+    run at a fixed place; the stable 'key' keeps the iframe mounted.
+    """
+    global _speech_component
+    if _speech_component is None:
+        import streamlit.components.v1 as components
+        _speech_component = components.declare_component("speech", path=SPEECH_COMPONENT_DIR)
+    return _speech_component(feed=SPEECH_FEED, key=key, default=None)
+
+
+def push_speech(feed_placeholder, channel, now):
+    """Writes the channel's outbox to a feed placeholder (any st.empty(), also inside a fragment)."""
+    push_feed(feed_placeholder, SPEECH_FEED, channel.feed(now))
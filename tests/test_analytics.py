@@ -0,0 +1,197 @@
+import math
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from analytics import WorkoutAggregate, calculate_analytics, parse_timestamp
+
+EXERCISES = ["Squats", "Bicep Curls", "Push-ups", "Lunges", "Overhead Press"]
+IST = timezone(timedelta(hours=5, minutes=30))
+PDT = timezone(timedelta(hours=-7))
+
+
+def baseline_analytics(logs):
+    """calculate_analytics() as the per-log loop it replaced (reference for the columnar code)."""
+    if not logs:
+        return None
+    parsed_logs = []
+    for log in logs:
+        ts = parse_timestamp(log.get("timestamp", ""))
+        total_reps = log.get("reps_left", 0) + log.get("reps_right", 0)
+        parsed_logs.append({
+            **log,
+            "timestamp_dt": ts,
+            "total_reps": total_reps,
+            "intensity": round(total_reps / max(log.get("duration", 1), 1), 2)
+        })
+
+    total_sessions = len(parsed_logs)
+    total_reps_all = sum(item["total_reps"] for item in parsed_logs)
+    total_duration = sum(item.get("duration", 0) for item in parsed_logs)
+    avg_intensity = round(sum(item["intensity"] for item in parsed_logs) / total_sessions, 2)
+
+    exercise_summary = defaultdict(lambda: {"sessions": 0, "reps": 0, "duration": 0})
+    daily_reps = defaultdict(int)
+    for item in parsed_logs:
+        ex = item.get("exercise", "Unknown")
+        exercise_summary[ex]["sessions"] += 1
+        exercise_summary[ex]["reps"] += item["total_reps"]
+        exercise_summary[ex]["duration"] += item.get("duration", 0)
+        if item["timestamp_dt"]:
+            day_key = item["timestamp_dt"].date().isoformat()
+            daily_reps[day_key] += item["total_reps"]
+
+    active_days = sorted(daily_reps.keys())
+    streak = 0
+    if active_days:
+        day_objs = [datetime.fromisoformat(d).date() for d in active_days]
+        streak = 1
+        for i in range(len(day_objs) - 1, 0, -1):
+            if (day_objs[i] - day_objs[i-1]).days == 1:
+                streak += 1
+            else:
+                break
+
+    summary_df = pd.DataFrame([
+        {
+            "Exercise": ex,
+            "Sessions": data["sessions"],
+            "Total Reps": data["reps"],
+            "Total Duration (s)": round(data["duration"], 1),
+            "Avg Reps / Session": round(data["reps"] / max(data["sessions"], 1), 1)
+        }
+        for ex, data in exercise_summary.items()
+    ]).sort_values(by="Total Reps", ascending=False)
+
+    trend_df = pd.DataFrame([
+        {"Date": day, "Total Reps": reps}
+        for day, reps in sorted(daily_reps.items())
+    ])
+
+    return {
+        "total_sessions": total_sessions,
+        "total_reps_all": total_reps_all,
+        "total_duration": total_duration,
+        "avg_intensity": avg_intensity,
+        "streak": streak,
+        "summary_df": summary_df,
+        "trend_df": trend_df
+    }
+
+
+def random_timestamp(rng, dt):
+    r = rng.random()
+    if r < 0.05:
+        return ""
+    if r < 0.08:
+        return "not a date"
+    if r < 0.3:
+        return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    if r < 0.5:
+        return dt.isoformat()
+    if r < 0.7:
+        return dt.astimezone(IST).isoformat() # Local offset par din badal sakta hai
+    if r < 0.85:
+        return dt.strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
+    return dt.astimezone(PDT).strftime("%Y-%m-%dT%H:%M:%S%z")
+
+
+def random_logs(rng, count):
+    """Newest-first logs over ~2 weeks: mixed offsets, bad/missing timestamps, int, zero and fractional durations."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    logs = []
+    for _ in range(count):
+        log = {
+            "exercise": rng.choice(EXERCISES),
+            "side": "Both",
+            "reps_left": rng.randint(0, 6),
+            "reps_right": rng.randint(0, 6),
+            "duration": rng.choice([rng.uniform(0.3, 90), 30.0, 0.0, rng.randint(1, 90)]),
+            "timestamp": random_timestamp(rng, start + timedelta(hours=rng.randint(0, 24 * 15))),
+        }
+        if rng.random() < 0.05:
+            del log["duration"]
+        logs.append(log)
+    return logs
+
+
+def intensity_is_tie(logs):
+    """True when the exact average intensity ends in a 5 at the third decimal (round() may go either way)."""
+    hundredths = sum(
+        round(round((log.get("reps_left", 0) + log.get("reps_right", 0)) / max(log.get("duration", 1), 1), 2) * 100)
+        for log in logs
+    )
+    twice = 2 * hundredths
+    return twice % len(logs) == 0 and (twice // len(logs)) % 2 == 1
+
+
+def assert_same_analytics(expected, actual, logs, incremental=False):
+    if expected is None:
+        assert actual is None
+        return
+    assert actual.keys() == expected.keys()
+    for key in ("total_sessions", "total_reps_all", "streak"):
+        assert actual[key] == expected[key] and type(actual[key]) is type(expected[key]), key
+    assert type(actual["total_duration"]) is type(expected["total_duration"])
+    if incremental:
+        # Aggregate front se jodta hai, float sum ka order alag: ~1 ulp
+        assert math.isclose(actual["total_duration"], expected["total_duration"], rel_tol=4 * 2 ** -52, abs_tol=1e-12)
+    else:
+        assert actual["total_duration"] == expected["total_duration"]
+    if intensity_is_tie(logs):
+        assert abs(actual["avg_intensity"] - expected["avg_intensity"]) < 0.0100001
+    else:
+        assert actual["avg_intensity"] == expected["avg_intensity"]
+    # Row order, index, dtypes aur values sab exact
+    pd.testing.assert_frame_equal(actual["summary_df"], expected["summary_df"], check_exact=True)
+    pd.testing.assert_frame_equal(actual["trend_df"], expected["trend_df"], check_exact=True)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_calculate_analytics_matches_baseline(seed):
+    rng = random.Random(seed)
+    for _ in range(40):
+        logs = random_logs(rng, rng.randint(0, 60))
+        expected = baseline_analytics(logs)
+        assert_same_analytics(expected, calculate_analytics(logs), logs)
+        assert_same_analytics(expected, WorkoutAggregate.from_logs(logs).result(), logs)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_incremental_add_matches_full_rescan(seed):
+    rng = random.Random(100 + seed)
+    for _ in range(8):
+        logs = random_logs(rng, rng.randint(1, 40))
+        split = rng.randint(0, len(logs))
+        current = logs[split:]
+        aggregate = WorkoutAggregate.from_logs(current)
+        # App ki tarah: naya set newest-first log ke aage
+        for log in reversed(logs[:split]):
+            current.insert(0, log)
+            aggregate.add(log)
+            result = aggregate.result()
+            assert_same_analytics(baseline_analytics(current), result, current, incremental=True)
+            assert_same_analytics(calculate_analytics(current), result, current, incremental=True)
+
+
+def test_streak_backfill_and_gaps():
+    def log(day):
+        return {"exercise": "Squats", "reps_left": 3, "reps_right": 2, "duration": 20.0,
+                "timestamp": f"2024-03-{day:02d}T10:00:00Z"}
+
+    # Newest-first: 10, 9, 7 -> streak 2; phir 8 backfill hone par 4
+    logs = [log(10), log(9), log(7)]
+    aggregate = WorkoutAggregate.from_logs(logs)
+    assert aggregate.result()["streak"] == baseline_analytics(logs)["streak"] == 2
+    aggregate.add(log(8))
+    assert aggregate.result()["streak"] == baseline_analytics([log(8)] + logs)["streak"] == 4
+    aggregate.add(log(12))
+    assert aggregate.result()["streak"] == baseline_analytics([log(12), log(8)] + logs)["streak"] == 1
+
+
+def test_empty_log():
+    assert calculate_analytics([]) is None
+    assert WorkoutAggregate.from_logs([]).result() is None
@@ -0,0 +1,24 @@
+import cv2
+import numpy as np
+
+from frame_sources import CAMERA_SOURCES, DEV_SOURCES, FRAME_SOURCES, SOURCE_FILE, create_frame_source
+
+
+def test_app_sources_are_cameras_only():
+    assert set(CAMERA_SOURCES).isdisjoint(DEV_SOURCES)
+    assert FRAME_SOURCES == CAMERA_SOURCES + DEV_SOURCES
+    assert SOURCE_FILE not in CAMERA_SOURCES
+
+
+def test_file_source_opens_local_files_only(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for _ in range(3):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+    source = create_frame_source(SOURCE_FILE, path=path)
+    assert source.isOpened() and source.read()[0]
+    source.release()
+    # URLs/devices cv2 (FFmpeg) tak nahi jaate
+    for path in ("http://127.0.0.1:9/clip.mp4", "rtsp://127.0.0.1/stream", "/dev/video0", ""):
+        assert not create_frame_source(SOURCE_FILE, path=path).isOpened()
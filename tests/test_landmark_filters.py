@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from exercises import EXERCISES
+from landmark_filters import LandmarkSmoother
+from rep_counter import count_reps
+from utils import NUM_POSE_LANDMARKS, calculate_angles
+
+REPS = 10
+LIMB = 0.15 # Chhota limb = dheemi speed = filter ka zyada lag (worst case)
+
+
+def rep_clip(spec, period_s, fps, reps=REPS, noise=0.004, seed=0):
+    """
+    Both joints of 'spec' swing 10 degrees past each threshold once per
+    'period_s', with jitter on every landmark like the pose model output.
+    """
+    t = np.arange(int((reps * period_s + 2.0) * fps)) / fps
+    phase = np.clip(t - 1.0, 0.0, reps * period_s)
+    low, high = spec.down_threshold - 10.0, min(spec.up_threshold + 10.0, 178.0)
+    angle = np.radians((high + low) / 2 + (high - low) / 2 * np.cos(2 * np.pi * phase / period_s))
+    frames = np.zeros((len(t), NUM_POSE_LANDMARKS, 4), dtype=np.float32)
+    frames[:, :, 3] = 1.0
+    for (first, joint, last), x in zip(spec.joint_triples, (0.4, 0.6)):
+        frames[:, joint, :2] = (x, 0.5)
+        frames[:, first, :2] = (x, 0.5 - LIMB)
+        frames[:, last, 0] = x + LIMB * np.sin(angle)
+        frames[:, last, 1] = 0.5 - LIMB * np.cos(angle)
+    frames[:, :, :2] += np.random.default_rng(seed).normal(0, noise, frames[:, :, :2].shape)
+    return 1000.0 + t, frames
+
+
+def reps(spec, times, frames, smoother):
+    landmarks = np.stack([smoother(t, frame) for t, frame in zip(times, frames)])
+    counter = count_reps(spec, "Both", calculate_angles(landmarks, spec.joint_triples))
+    return counter.reps_left, counter.reps_right
+
+
+@pytest.mark.parametrize("name", sorted(EXERCISES))
+@pytest.mark.parametrize("fps", [15, 30])
+@pytest.mark.parametrize("period_s", [0.4, 1.0, 2.0])
+def test_default_smoothing_keeps_fast_reps(name, fps, period_s):
+    spec = EXERCISES[name]
+    times, frames = rep_clip(spec, period_s, fps)
+    raw = reps(spec, times, frames, LandmarkSmoother(enabled=False))
+    assert raw == (REPS, REPS)
+    assert reps(spec, times, frames, LandmarkSmoother()) == raw
+
+
+def test_default_smoothing_reduces_still_jitter():
+    spec = EXERCISES["Bicep Curls"]
+    times, frames = rep_clip(spec, 1.0, 30, reps=0)
+    times = 1000.0 + np.arange(300) / 30
+    frames = np.repeat(frames[:1], len(times), axis=0)
+    frames[:, :, :2] += np.random.default_rng(1).normal(0, 0.004, frames[:, :, :2].shape)
+    smoother = LandmarkSmoother()
+    smoothed = np.stack([smoother(t, frame) for t, frame in zip(times, frames)])
+    raw_angles = calculate_angles(frames, spec.joint_triples)[30:]
+    smooth_angles = calculate_angles(smoothed, spec.joint_triples)[30:]
+    assert smooth_angles.std(axis=0).max() < 0.75 * raw_angles.std(axis=0).min()
@@ -0,0 +1,62 @@
+from live_session import LiveSession, reap_idle
+from pose_pool import PosePool
+
+
+class FakePose:
+    model_complexity = 0
+
+    def set_model_complexity(self, model_complexity):
+        self.model_complexity = model_complexity
+
+    def reset(self):
+        pass
+
+
+class FakePart:
+    def __init__(self, stops=True):
+        self.stops = stops
+        self.closed = 0
+
+    def stop(self):
+        return self.stops
+
+    def close(self):
+        self.closed += 1
+
+    release = close
+
+
+def open_session(pool, stops=True):
+    session = LiveSession(pool, pool.enqueue().wait(0))
+    session.pipeline = FakePart(stops)
+    session.recorder = FakePart()
+    session.cap = FakePart()
+    return session
+
+
+def test_close_returns_the_pose_once():
+    pool = PosePool(FakePose, 1)
+    session = open_session(pool)
+    session.close()
+    session.close()
+    assert session.closed and session.recorder.closed == 1 and session.cap.closed == 1
+    assert pool.stats()["in_use"] == 0 and pool.stats()["created"] == 1
+
+
+def test_close_discards_the_pose_of_a_stuck_pipeline():
+    pool = PosePool(FakePose, 1)
+    session = open_session(pool, stops=False)
+    session.close()
+    assert session.cap.closed == 1
+    assert pool.stats()["in_use"] == 0 and pool.stats()["created"] == 0
+
+
+def test_reap_idle_closes_only_abandoned_sessions():
+    pool = PosePool(FakePose, 2)
+    active, abandoned = open_session(pool), open_session(pool)
+    active.touch(1000.0)
+    abandoned.touch(900.0)
+    assert reap_idle(60, now=1010.0) == 1
+    assert abandoned.closed and not active.closed
+    active.close()
+    assert reap_idle(60, now=2000.0) == 0
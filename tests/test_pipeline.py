@@ -0,0 +1,227 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from exercises import LEFT_ELBOW, LEFT_SHOULDER, LEFT_WRIST, get_exercise
+from pipeline import InlinePipeline, MotionGate, ThreadedPipeline
+from rep_counter import count_reps
+from utils import NUM_POSE_LANDMARKS, calculate_angles
+
+WIDTH, HEIGHT, FPS = 640, 480, 30
+
+
+class FakeLandmark:
+    __slots__ = ("x", "y", "z", "visibility")
+
+    def __init__(self, x, y, z, visibility):
+        self.x, self.y, self.z, self.visibility = x, y, z, visibility
+
+
+class FakeLandmarkList:
+    def __init__(self, array):
+        self.landmark = [FakeLandmark(*row) for row in array.tolist()]
+
+
+class FakeResults:
+    def __init__(self, array):
+        self.pose_landmarks = None if array is None else FakeLandmarkList(array)
+
+
+class ScriptedPose:
+    """Stands in for the model: returns the known landmarks of the frame being processed."""
+
+    def __init__(self, landmarks):
+        self.landmarks = landmarks
+        self.index = 0
+        self.calls = 0
+
+    def process(self, image_rgb, captured_at=None):
+        self.calls += 1
+        return FakeResults(self.landmarks[self.index])
+
+
+def curl_clip(period_s, seconds=6.0, seed=0):
+    """
+    Left-arm curls in front of a still body: only the forearm moves, the rest
+    of the frame changes by sensor noise alone. Returns (frames, landmarks).
+    """
+    rng = np.random.default_rng(seed)
+    background = rng.integers(60, 100, size=(HEIGHT, WIDTH, 3), dtype=np.uint8)
+    cv2.rectangle(background, (250, 120), (390, 400), (140, 120, 110), -1) # Torso
+    shoulder = np.array([250.0, 140.0])
+    elbow = np.array([250.0, 250.0])
+    cv2.line(background, tuple(int(v) for v in shoulder), tuple(int(v) for v in elbow), (200, 180, 170), 14)
+    count = int(seconds * FPS)
+    # Sensor noise: kuch precomputed frames baar baar (har frame naya noise slow hai)
+    noise = rng.normal(0, 3, size=(4, HEIGHT, WIDTH, 3)).astype(np.int16)
+    frames = np.empty((count, HEIGHT, WIDTH, 3), dtype=np.uint8)
+    landmarks = np.zeros((count, NUM_POSE_LANDMARKS, 4), dtype=np.float32)
+    landmarks[:, :, 3] = 1.0
+    for i in range(count):
+        # Elbow angle 170 -> 20 -> 170 har period mein
+        angle = np.radians(95.0 + 75.0 * np.cos(2 * np.pi * (i / FPS) / period_s))
+        wrist = elbow + 100.0 * np.array([np.sin(angle), -np.cos(angle)])
+        frame = background.copy()
+        cv2.line(frame, tuple(int(v) for v in elbow), tuple(int(v) for v in wrist), (200, 180, 170), 14)
+        frames[i] = np.clip(frame + noise[i % len(noise)], 0, 255).astype(np.uint8)
+        for index, point in ((LEFT_SHOULDER, shoulder), (LEFT_ELBOW, elbow), (LEFT_WRIST, wrist)):
+            landmarks[i, index, 0] = point[0] / WIDTH
+            landmarks[i, index, 1] = point[1] / HEIGHT
+    return frames, landmarks
+
+
+def gated_reps(frames, landmarks, gate):
+    pose = ScriptedPose(landmarks)
+    pipeline = InlinePipeline(None, pose, gate=gate)
+    exercise = get_exercise("Bicep Curls")
+    angles = []
+    for i, frame in enumerate(frames):
+        pose.index = i
+        packet = pipeline._process_frame(frame, 1000.0 + i / FPS, 0.0)
+        angles.append(calculate_angles(packet.landmarks, exercise.joint_triples))
+    return count_reps(exercise, "Left", angles).reps_left, pose.calls
+
+
+@pytest.mark.parametrize("period_s", [1.0, 1.2, 1.5, 2.0])
+def test_idle_gate_keeps_localized_limb_motion(period_s):
+    frames, landmarks = curl_clip(period_s)
+    exercise = get_exercise("Bicep Curls")
+    expected = count_reps(exercise, "Left", calculate_angles(landmarks, exercise.joint_triples)).reps_left
+    assert expected >= 3
+    reps, inferred = gated_reps(frames, landmarks, MotionGate())
+    assert reps == expected
+    assert inferred > len(frames) // 2
+
+
+def test_idle_gate_skips_still_frames():
+    frames, landmarks = curl_clip(1.5, seconds=3.0)
+    # Arm kabhi nahi hilta: sirf noise, model sirf idle interval par
+    still = np.repeat(frames[:1], len(frames), axis=0)
+    rng = np.random.default_rng(1)
+    still = np.clip(still + rng.normal(0, 3, size=still.shape), 0, 255).astype(np.uint8)
+    gate = MotionGate()
+    _, inferred = gated_reps(still, np.repeat(landmarks[:1], len(frames), axis=0), gate)
+    assert inferred <= 8
+    assert gate.skipped == len(frames) - inferred
+
+
+class EndlessSource:
+    def read(self, buffer=None):
+        return True, np.zeros((48, 64, 3), dtype=np.uint8)
+
+
+class BlockingPose:
+    """process() hangs until released, like a slow inference or model reload."""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def process(self, image_rgb, captured_at=None):
+        self.entered.set()
+        self.release.wait(10)
+        return FakeResults(np.zeros((NUM_POSE_LANDMARKS, 4), dtype=np.float32))
+
+
+def test_threaded_stop_reports_a_stuck_worker():
+    pose = BlockingPose()
+    pipeline = ThreadedPipeline(EndlessSource(), pose).start()
+    assert pose.entered.wait(5)
+    try:
+        # Worker abhi process() mein hai: Pose pool mein wapas nahi jaana chahiye
+        assert pipeline.stop() is False
+    finally:
+        pose.release.set()
+    assert ThreadedPipeline(EndlessSource(), ScriptedPose([None])).stop() is True
+    assert InlinePipeline(None, None).stop() is True
+
+
+class LaggingPose:
+    """
+    Like the Tasks LIVE_STREAM backend: returns the newest finished result,
+    which belongs to a frame submitted two calls earlier and only changes
+    every other call, tagged with that frame's capture time.
+    """
+
+    def __init__(self, landmarks, inference_ms=80.0):
+        self.landmarks = landmarks
+        self.inference_ms = inference_ms
+        self.submitted = []
+
+    def process(self, image_rgb, captured_at=None):
+        self.submitted.append(captured_at)
+        done = (len(self.submitted) - 3) // 2 * 2
+        if done < 0:
+            # Pehla callback aane tak khaali result
+            return FakeResults(None)
+        results = FakeResults(self.landmarks[done])
+        results.captured_at = self.submitted[done]
+        results.inference_ms = self.inference_ms
+        return results
+
+
+class GovernorSpy:
+    setting = (1.0, 0)
+
+    def __init__(self):
+        self.observed = []
+
+    def observe(self, work_ms, now):
+        self.observed.append(work_ms)
+
+
+def test_async_results_keep_their_own_capture_time():
+    landmarks = np.random.default_rng(0).random((12, NUM_POSE_LANDMARKS, 4)).astype(np.float32)
+    pose = LaggingPose(landmarks)
+    governor = GovernorSpy()
+    pipeline = InlinePipeline(None, pose, governor=governor)
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    packets = [pipeline._process_frame(frame, 1000.0 + i / FPS, 0.0) for i in range(len(landmarks))]
+
+    for packet in packets[2:]:
+        index = pose.submitted.index(packet.landmarks_at)
+        assert index < packet.seq - 1
+        np.testing.assert_array_equal(packet.raw_landmarks, landmarks[index])
+    # Governor ko har naye result par ek baar callback ki latency milti hai, submit ka time nahi
+    times = [packet.landmarks_at for packet in packets]
+    fresh = 1 + sum(before != after for before, after in zip(times, times[1:]))
+    assert len(governor.observed) == fresh
+    assert all(work_ms >= pose.inference_ms for work_ms in governor.observed[2:])
+
+
+class FiniteSource:
+    def __init__(self, count):
+        self.left = count
+
+    def read(self, buffer=None):
+        if self.left == 0:
+            return False, None
+        self.left -= 1
+        time.sleep(0.002)
+        return True, np.zeros((48, 64, 3), dtype=np.uint8)
+
+
+class ListRecorder:
+    def __init__(self):
+        self.times = []
+
+    def write(self, t, landmarks):
+        self.times.append(t)
+
+
+def test_threaded_stride_records_every_inference():
+    pose = ScriptedPose(np.ones((1, NUM_POSE_LANDMARKS, 4), dtype=np.float32))
+    recorder = ListRecorder()
+    pipeline = ThreadedPipeline(FiniteSource(120), pose, stride=3, recorder=recorder).start()
+    try:
+        # Slow UI: extrapolated packets inferred ones ko slot mein overwrite karte hain
+        while pipeline.next_packet() is not None:
+            time.sleep(0.02)
+    finally:
+        assert pipeline.stop()
+    assert pose.calls > 10
+    assert len(recorder.times) == pose.calls
+    assert recorder.times == sorted(recorder.times)
@@ -0,0 +1,116 @@
+import itertools
+
+import pytest
+
+from pose_pool import PoolFull, PosePool
+
+
+class FakePose:
+    def __init__(self, name, fail_reset=False):
+        self.name = name
+        self.model_complexity = 0
+        self.resets = 0
+        self.fail_reset = fail_reset
+
+    def set_model_complexity(self, model_complexity):
+        self.model_complexity = model_complexity
+
+    def reset(self):
+        if self.fail_reset:
+            raise RuntimeError("graph broken")
+        self.resets += 1
+
+
+def make_pool(size, max_waiting=0):
+    names = itertools.count(1)
+    return PosePool(lambda: FakePose(next(names)), size, max_waiting=max_waiting)
+
+
+def test_waiters_are_served_in_fifo_order():
+    pool = make_pool(1, max_waiting=3)
+    first = pool.enqueue().wait(0)
+    tickets = [pool.enqueue() for _ in range(3)]
+    assert [ticket.position for ticket in tickets] == [1, 2, 3]
+    for ticket in tickets:
+        assert ticket.wait(0) is None
+
+    pool.release(first)
+    # Sirf queue ka pehla ticket instance paata hai, wahi instance
+    assert tickets[0].wait(0) is first
+    assert [ticket.position for ticket in tickets] == [0, 1, 2]
+    pool.release(tickets[0].wait(0))
+    assert tickets[1].wait(0) is first
+    assert tickets[2].position == 1
+
+
+def test_full_queue_turns_sessions_away():
+    pool = make_pool(1, max_waiting=1)
+    pool.enqueue().wait(0)
+    pool.enqueue()
+    with pytest.raises(PoolFull):
+        pool.enqueue()
+    assert pool.stats() == {"size": 1, "created": 1, "in_use": 1, "waiting": 1}
+
+
+def test_instances_are_created_lazily_up_to_size():
+    pool = make_pool(2, max_waiting=1)
+    a = pool.enqueue().wait(0)
+    b = pool.enqueue().wait(0)
+    assert a is not b
+    waiting = pool.enqueue()
+    assert waiting.wait(0) is None
+    assert pool.stats()["created"] == 2
+    pool.release(b)
+    assert waiting.wait(0) is b
+
+
+def test_release_resets_tracking_and_complexity():
+    pool = make_pool(1)
+    pose = pool.enqueue().wait(0)
+    pose.set_model_complexity(2) # Governor ne badhaya
+    pool.release(pose)
+    assert pose.model_complexity == 0 and pose.resets == 1
+    assert pool.stats() == {"size": 1, "created": 1, "in_use": 0, "waiting": 0}
+    assert pool.enqueue().wait(0) is pose
+
+
+def test_broken_or_discarded_instances_are_not_reused():
+    pool = make_pool(1, max_waiting=1)
+    pose = pool.enqueue().wait(0)
+    waiting = pool.enqueue()
+    pose.fail_reset = True
+    pool.release(pose)
+    replacement = waiting.wait(0)
+    assert replacement is not pose
+    # Zombie worker wala instance: discard ke baad slot free, naya instance banta hai
+    pool.discard(replacement)
+    assert pool.stats() == {"size": 1, "created": 0, "in_use": 0, "waiting": 0}
+    fresh = pool.enqueue().wait(0)
+    assert fresh is not replacement and fresh is not pose
+
+
+def test_cancel_leaves_queue_or_returns_granted_instance():
+    pool = make_pool(1, max_waiting=2)
+    first_ticket = pool.enqueue()
+    pose = first_ticket.wait(0)
+    second, third = pool.enqueue(), pool.enqueue()
+    second.cancel()
+    assert third.position == 1
+    first_ticket.cancel() # Granted instance pool mein wapas
+    assert third.wait(0) is pose
+
+
+def test_failed_factory_frees_the_slot():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("model download blocked")
+        return FakePose(len(calls))
+
+    pool = PosePool(factory, 1)
+    with pytest.raises(RuntimeError):
+        pool.enqueue().wait(0)
+    assert pool.stats()["created"] == 0 and pool.stats()["in_use"] == 0
+    assert pool.enqueue().wait(0).name == 2
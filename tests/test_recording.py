@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from exercises import LEFT_ELBOW, LEFT_SHOULDER, LEFT_WRIST, RIGHT_ELBOW, RIGHT_SHOULDER, RIGHT_WRIST
+from recording import LandmarkRecorder, main, open_recording, replay_counts
+from utils import NUM_POSE_LANDMARKS
+
+FPS = 30
+REPS = 5
+PERIOD_S = 2.0
+
+
+def curl_frames(reps=REPS, fps=FPS, period_s=PERIOD_S):
+    """
+    Synthetic bicep curls: both elbow angles swing 170 -> 20 -> 170 degrees
+    once per 'period_s', with a second of straight arms before and after.
+    """
+    t = np.arange(int((reps * period_s + 2.0) * fps)) / fps
+    phase = np.clip(t - 1.0, 0.0, reps * period_s)
+    angle = np.radians(95.0 + 75.0 * np.cos(2 * np.pi * phase / period_s))
+    frames = np.zeros((len(t), NUM_POSE_LANDMARKS, 4), dtype=np.float32)
+    frames[:, :, 3] = 1.0
+    for shoulder, elbow, wrist, x in ((LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST, 0.6),
+                                      (RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST, 0.4)):
+        frames[:, shoulder, :2] = (x, 0.3)
+        frames[:, elbow, :2] = (x, 0.5)
+        # Upper arm seedha neeche, forearm elbow ke around ghoomta hai
+        frames[:, wrist, 0] = x + 0.2 * np.sin(angle)
+        frames[:, wrist, 1] = 0.5 - 0.2 * np.cos(angle)
+    return 1000.0 + t, frames
+
+
+def write_recording(path, **metadata):
+    times, frames = curl_frames()
+    meta = {"exercise": "Bicep Curls", "side": "Both", "target_reps": None, "set_number": 1,
+            "raw": True, "stride": 1, "smooth_landmarks": False}
+    meta.update(metadata)
+    # None = key hi nahi (purani recordings mein raw/stride nahi hote)
+    meta = {key: value for key, value in meta.items() if value is not None}
+    with LandmarkRecorder(str(path), meta) as recorder:
+        for i, (t, landmarks) in enumerate(zip(times, frames)):
+            # Beech mein pose kuch frames ke liye gaayab
+            recorder.write(t, None if 100 <= i < 103 else landmarks)
+    return path
+
+
+def test_recording_round_trip(tmp_path):
+    path = write_recording(tmp_path / "curls.lmk")
+    metadata, records = open_recording(str(path))
+    times, frames = curl_frames()
+    assert metadata["exercise"] == "Bicep Curls" and metadata["raw"] is True
+    assert len(records) == len(frames)
+    assert records["present"].sum() == len(frames) - 3
+    np.testing.assert_array_equal(records["landmarks"][0], frames[0])
+    np.testing.assert_array_equal(records["t"], times)
+
+
+@pytest.mark.parametrize("stride", [2, 3, 4])
+def test_stride_replay_matches_full_rate(tmp_path, stride):
+    path = str(write_recording(tmp_path / "curls.lmk"))
+    full = replay_counts(path)
+    assert (full.reps_left, full.reps_right) == (REPS, REPS)
+    strided = replay_counts(path, stride=stride)
+    assert (strided.reps_left, strided.reps_right) == (REPS, REPS)
+    smoothed = replay_counts(path, stride=stride, smooth=True)
+    assert (smoothed.reps_left, smoothed.reps_right) == (REPS, REPS)
+    assert main(["replay", path, "--stride", str(stride), "--smooth"]) == 0
+
+
+@pytest.mark.parametrize("metadata", [{"raw": False}, {"stride": 3}, {"raw": None, "stride": None}])
+def test_processed_recording_refuses_comparison(tmp_path, metadata):
+    path = str(write_recording(tmp_path / "processed.lmk", **metadata))
+    # Plain replay chalta hai, sirf stride/smooth comparison mana hai
+    assert replay_counts(path).reps_left == REPS
+    with pytest.raises(ValueError):
+        replay_counts(path, stride=3)
+    with pytest.raises(ValueError):
+        replay_counts(path, smooth=True)
+    assert main(["replay", path, "--stride", "3"]) == 2
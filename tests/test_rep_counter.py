@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from exercises import EXERCISES, get_exercise
+from rep_counter import RepCounter, count_reps
+
+# Purane app.py loop ki hardcoded tables
+BASELINE_THRESHOLDS = {
+    "Bicep Curls": (160, 30, 'down'),
+    "Squats": (160, 90, 'up'),
+    "Push-ups": (160, 90, 'up'),
+    "Overhead Press": (160, 90, 'down'),
+    "Lunges": (160, 100, 'up'),
+    "Jumping Jacks": (160, 30, 'up'),
+    "High Knees": (160, 90, 'up'),
+}
+BASELINE_UP_START = ['Squats', 'Push-ups', 'Lunges', 'Jumping Jacks', 'High Knees']
+BASELINE_DEPTH_CUE = ['Squats', 'Push-ups', 'Lunges']
+
+
+def baseline_frames(exercise_choice, side_choice, angle_frames, target_reps, set_counter=1):
+    """
+    The inline rep logic of the old live loop (session state -> dict),
+    yielding (reps_left, reps_right, stage_left, stage_right, stage, feedback) per frame.
+    """
+    initial_stage = 'up' if exercise_choice in BASELINE_UP_START else 'down'
+    state = {"rep_counter_left": 0, "rep_counter_right": 0, "stage_left": initial_stage,
+             "stage_right": initial_stage, "stage": initial_stage, "feedback": "",
+             "workout_complete_feedback_given": False}
+    up_threshold, down_threshold, stage_check = BASELINE_THRESHOLDS[exercise_choice]
+    for angle_l, angle_r in angle_frames:
+        feedback_msg = state["feedback"]
+        reps_met_left = state["rep_counter_left"] >= target_reps
+        reps_met_right = state["rep_counter_right"] >= target_reps
+        reps_met_both = reps_met_left and reps_met_right
+
+        if (side_choice == 'Left' and reps_met_left) or \
+           (side_choice == 'Right' and reps_met_right) or \
+           (side_choice == 'Both' and reps_met_both):
+            feedback_msg = f"Set {set_counter} Complete! Stop webcam to save."
+            state["workout_complete_feedback_given"] = True
+
+        elif side_choice == 'Left':
+            if angle_l < down_threshold and state["stage_left"] == stage_check:
+                state["stage_left"] = 'down' if stage_check == 'up' else 'up'
+                state["rep_counter_left"] += 1
+                feedback_msg = f'Rep {state["rep_counter_left"]}!'
+            elif angle_l > up_threshold and state["stage_left"] != stage_check:
+                state["stage_left"] = stage_check
+                feedback_msg = 'Ready'
+
+        elif side_choice == 'Right':
+            if angle_r < down_threshold and state["stage_right"] == stage_check:
+                state["stage_right"] = 'down' if stage_check == 'up' else 'up'
+                state["rep_counter_right"] += 1
+                feedback_msg = f'Rep {state["rep_counter_right"]}!'
+            elif angle_r > up_threshold and state["stage_right"] != stage_check:
+                state["stage_right"] = stage_check
+                feedback_msg = 'Ready'
+
+        elif side_choice == 'Both':
+            stage_l_reached = angle_l < down_threshold
+            stage_r_reached = angle_r < down_threshold
+            stage_l_reset = angle_l > up_threshold
+            stage_r_reset = angle_r > up_threshold
+
+            if stage_l_reached and stage_r_reached and state["stage"] == stage_check:
+                state["stage"] = 'down' if stage_check == 'up' else 'up'
+                if not reps_met_both:
+                    state["rep_counter_left"] += 1
+                    state["rep_counter_right"] += 1
+                    feedback_msg = f'Rep {state["rep_counter_left"]}!'
+            elif stage_l_reset and stage_r_reset and state["stage"] != stage_check:
+                state["stage"] = stage_check
+                feedback_msg = 'Ready for next rep'
+            elif stage_l_reached and not stage_r_reached and state["stage"] == stage_check:
+                feedback_msg = 'ERROR: Move right side too!'
+            elif not stage_l_reached and stage_r_reached and state["stage"] == stage_check:
+                feedback_msg = 'ERROR: Move left side too!'
+
+            if exercise_choice in BASELINE_DEPTH_CUE:
+                if (stage_check == 'up' and
+                        (down_threshold < angle_l < up_threshold or down_threshold < angle_r < up_threshold) and
+                        state["stage"] == 'up'):
+                    feedback_msg = 'Go lower!'
+
+        state["feedback"] = feedback_msg
+        yield (state["rep_counter_left"], state["rep_counter_right"], state["stage_left"],
+               state["stage_right"], state["stage"], state["feedback"])
+
+
+def random_angle_frames(rng, count):
+    """Left/right angles drifting across 0-180 with jumps, so every threshold and asymmetry is crossed."""
+    angles = np.empty((count, 2))
+    current = rng.uniform(0, 180, size=2)
+    for i in range(count):
+        if rng.random() < 0.05:
+            current = rng.uniform(0, 180, size=2)
+        current = np.clip(current + rng.normal(0, 12, size=2), 0, 180)
+        angles[i] = current
+    return angles
+
+
+@pytest.mark.parametrize("name", sorted(EXERCISES))
+def test_rep_counter_matches_old_inline_loop(name):
+    exercise = get_exercise(name)
+    rng = np.random.default_rng(sorted(EXERCISES).index(name))
+    for side in exercise.side_options:
+        for target_reps in (3, 12, 1000):
+            frames = random_angle_frames(rng, 600)
+            counter = RepCounter(exercise, side, target_reps=target_reps)
+            for angles, expected in zip(frames, baseline_frames(name, side, frames, target_reps)):
+                counter.update(angles)
+                actual = (counter.reps_left, counter.reps_right, counter.stage_left,
+                          counter.stage_right, counter.stage, counter.feedback)
+                assert actual == expected, (name, side, target_reps)
+            final = count_reps(exercise, side, frames, target_reps=target_reps)
+            assert (final.reps_left, final.reps_right) == expected[:2]
+
+
+def test_count_reps_skips_missing_frames():
+    exercise = get_exercise("Bicep Curls")
+    frames = [(170, 170), None, (20, 20), None, (170, 170), (20, 20)]
+    counter = count_reps(exercise, "Both", frames)
+    assert (counter.reps_left, counter.reps_right) == (2, 2)
@@ -0,0 +1,19 @@
+import numpy as np
+
+from exercises import EXERCISES
+from utils import calculate_angle, calculate_angles
+
+
+def test_calculate_angles_matches_scalar_within_rounding():
+    rng = np.random.default_rng(0)
+    stack = rng.random((200, 33, 4)).astype(np.float32)
+    for spec in EXERCISES.values():
+        angles = calculate_angles(stack, spec.joint_triples)
+        expected = [
+            [calculate_angle(lm[a, :2].tolist(), lm[b, :2].tolist(), lm[c, :2].tolist())
+             for a, b, c in spec.joint_triples]
+            for lm in stack
+        ]
+        # Bit-exact nahi (sum ka order alag), sirf float rounding tak barabar
+        np.testing.assert_allclose(angles, expected, rtol=1e-12, atol=1e-9)
+        np.testing.assert_allclose(calculate_angles(stack[0], spec.joint_triples), expected[0], rtol=1e-12, atol=1e-9)
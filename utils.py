@@ -1,32 +1,89 @@
-
-import numpy as np
-
-def calculate_angle(a, b, c):
-    """
-    Calculates the angle between three 3D points.
-    'b' is the vertex of the angle.
-    """
-    a = np.array(a) # First point
-    b = np.array(b) # Mid point (vertex)
-    c = np.array(c) # End point
-    
-    # Calculate vectors
-    ba = a - b
-    bc = c - b
-    
-    # Calculate dot product and magnitudes
-    dot_product = np.dot(ba, bc)
-    magnitude_ba = np.linalg.norm(ba)
-    magnitude_bc = np.linalg.norm(bc)
-    
-    # Add a small epsilon to avoid division by zero
-    epsilon = 1e-7
-    cosine_angle = dot_product / (magnitude_ba * magnitude_bc + epsilon)
-    
-    # Clip value to be between -1 and 1 to avoid acos domain errors
-    cosine_angle = np.clip(cosine_angle, -1.0, 1.0)
-    
-    angle_rad = np.arccos(cosine_angle)
-    angle_deg = np.degrees(angle_rad)
-    
-    return angle_deg
\ No newline at end of file
+
+import numpy as np
+
+def calculate_angle(a, b, c):
+    """
+    Calculates the angle between three 3D points.
+    'b' is the vertex of the angle.
+    """
+    a = np.array(a) # First point
+    b = np.array(b) # Mid point (vertex)
+    c = np.array(c) # End point
+    
+    # Calculate vectors
+    ba = a - b
+    bc = c - b
+    
+    # Calculate dot product and magnitudes
+    dot_product = np.dot(ba, bc)
+    magnitude_ba = np.linalg.norm(ba)
+    magnitude_bc = np.linalg.norm(bc)
+    
+    # Add a small epsilon to avoid division by zero
+    epsilon = 1e-7
+    cosine_angle = dot_product / (magnitude_ba * magnitude_bc + epsilon)
+    
+    # Clip value to be between -1 and 1 to avoid acos domain errors
+    cosine_angle = np.clip(cosine_angle, -1.0, 1.0)
+    
+    angle_rad = np.arccos(cosine_angle)
+    angle_deg = np.degrees(angle_rad)
+    
+    return angle_deg
+
+NUM_POSE_LANDMARKS = 33
+
+def landmarks_to_array(pose_landmarks, out=None):
+    """
+    Converts MediaPipe 'results.pose_landmarks' into a (33, 4) float32 array
+    of [x, y, z, visibility] rows, indexed by PoseLandmark value.
+    Pass a preallocated (33, 4) array as 'out' to reuse it across frames.
+    Returns None when no pose was detected.
+    """
+    if pose_landmarks is None:
+        return None
+    landmarks = pose_landmarks.landmark
+    if out is None:
+        out = np.empty((len(landmarks), 4), dtype=np.float32)
+    out[:] = [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks]
+    return out
+
+def calculate_angles(points, triples, dims=2):
+    """
+    Vectorized version of calculate_angle for many joints at once.
+    'points' is a (33, 4) landmark array or a (frames, 33, 4) stack.
+    'triples' is a (K, 3) array of landmark indices (first, vertex, end).
+    Only the first 'dims' coordinates are used (2 = x, y like the live loop).
+    Returns (K,) angles in degrees, or (frames, K) for a stack.
+    """
+    # float32 landmarks are exact copies of MediaPipe's values; float64 math
+    # keeps results equal to calculate_angle within float rounding (~1 ulp,
+    # einsum/norm sum in a different order), so thresholds must not rely on bit-exact angles
+    points = np.asarray(points)[..., :dims].astype(np.float64, copy=False)
+    triples = np.asarray(triples, dtype=np.intp)
+
+    a = points[..., triples[:, 0], :]
+    b = points[..., triples[:, 1], :]
+    c = points[..., triples[:, 2], :]
+
+    ba = a - b
+    bc = c - b
+
+    dot_product = np.einsum('...i,...i->...', ba, bc)
+    magnitudes = np.linalg.norm(ba, axis=-1) * np.linalg.norm(bc, axis=-1)
+
+    epsilon = 1e-7
+    cosine_angle = np.clip(dot_product / (magnitudes + epsilon), -1.0, 1.0)
+
+    return np.degrees(np.arccos(cosine_angle))
+
+def array_to_landmark_list(landmarks):
+    """
+    Inverse of landmarks_to_array: (33, 4) array -> NormalizedLandmarkList,
+    for drawing landmarks that did not come straight from the model.
+    """
+    from mediapipe.framework.formats import landmark_pb2
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z, visibility in landmarks.tolist():
+        landmark_list.landmark.add(x=x, y=y, z=z, visibility=visibility)
+    return landmark_list